@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,13 +83,150 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'app'),
+            'USER': os.environ.get('DB_USER', 'postgres'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Keep connections open between requests.
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        }
+    }
+
+# Whether core.db makes sure a kept connection still works before a request
+# uses it. Django 3.2 has no CONN_HEALTH_CHECKS database option, so this is a
+# project setting; a server can drop idle connections, a SQLite file cannot.
+DB_CONN_HEALTH_CHECKS = os.environ.get(
+    'DB_CONN_HEALTH_CHECKS',
+    '1' if DB_ENGINE == 'postgresql' else '0',
+) == '1'
+
+# Pragmas run on every new SQLite connection by core.db. NORMAL syncs less
+# often than FULL. The journal mode is stored in the database file itself,
+# so it is only set when configured: SQLITE_JOURNAL_MODE=wal lets readers
+# work while a write is in progress, on a database the server owns.
+SQLITE_PRAGMAS = {
+    'synchronous': 'normal',
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+}
+if os.environ.get('SQLITE_JOURNAL_MODE'):
+    SQLITE_PRAGMAS['journal_mode'] = os.environ['SQLITE_JOURNAL_MODE']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
+# Seconds a serialized public post is kept in the cache.
+PUBLIC_POST_CACHE_TIMEOUT = int(os.environ.get('PUBLIC_POST_CACHE_TIMEOUT', 300))
+
+
+# Maximum number of posts accepted by one bulk request.
+POST_BULK_MAX_ITEMS = int(os.environ.get('POST_BULK_MAX_ITEMS', 100))
+
+# Posts loaded per query, and per authors prefetch, by the NDJSON export.
+POST_EXPORT_CHUNK_SIZE = int(os.environ.get('POST_EXPORT_CHUNK_SIZE', 500))
+
+# Render post authors from the denormalized Post.authors_snapshot column
+# (post.snapshots) instead of joining the author tables on every read.
+POST_AUTHORS_SNAPSHOT = os.environ.get('POST_AUTHORS_SNAPSHOT', '1') == '1'
+
+# Rows deleted per transaction when an account is deleted (user.deletion),
+# and whether DELETE /api/user/me/ runs the deletion in a background thread.
+ACCOUNT_DELETION_BATCH_SIZE = int(os.environ.get('ACCOUNT_DELETION_BATCH_SIZE', 500))
+ACCOUNT_DELETION_IN_BACKGROUND = os.environ.get('ACCOUNT_DELETION_IN_BACKGROUND', '1') == '1'
+
+# Token authentication cache used by core.authentication. SHARED_CACHE names
+# a CACHES alias shared between processes; leave it empty to keep the cache
+# in-process only.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000)),
+    'TTL': int(os.environ.get('TOKEN_AUTH_CACHE_TTL', 30)),
+    'SHARED_CACHE': os.environ.get('TOKEN_AUTH_SHARED_CACHE', ''),
+    'SHARED_TTL': int(os.environ.get('TOKEN_AUTH_SHARED_CACHE_TTL', 300)),
+}
+
+# Record per-view latency, query counts and render time, serve them at
+# /metrics and add a Server-Timing header (core.middleware).
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+
+# Run the ORM work of the async views on Django's single sync thread instead
+# of asgiref's thread pool. Pooled threads hold their own connections.
+ASYNC_ORM_THREAD_SENSITIVE = (
+    os.environ.get('ASYNC_ORM_THREAD_SENSITIVE', '0') == '1'
+)
+
+
+# Password hashing. PASSWORD_HASHER picks the algorithm new hashes use:
+# pbkdf2, argon2 (needs argon2-cffi) or bcrypt (needs bcrypt). Existing
+# hashes keep working and are upgraded on the next login, as are hashes
+# made with a different cost. Logins hash on a pool of WORKERS threads with
+# room for QUEUE_SIZE waiting checks (core.hashers).
+PASSWORD_HASHING = {
+    'PBKDF2_ITERATIONS': int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 260000)),
+    'BCRYPT_ROUNDS': int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12)),
+    'ARGON2_TIME_COST': int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2)),
+    'ARGON2_MEMORY_COST': int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400)),
+    'ARGON2_PARALLELISM': int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', 8)),
+    'WORKERS': int(os.environ.get('PASSWORD_HASHING_WORKERS', 2)),
+    'QUEUE_SIZE': int(os.environ.get('PASSWORD_HASHING_QUEUE_SIZE', 32)),
+}
+
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'core.hashers.PBKDF2PasswordHasher',
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'bcrypt': 'core.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f'Unknown PASSWORD_HASHER {PASSWORD_HASHER!r}; '
+        f'expected one of: {", ".join(_PASSWORD_HASHERS)}.'
+    )
+PASSWORD_HASHERS = [
+    _PASSWORD_HASHERS.pop(PASSWORD_HASHER),
+    *_PASSWORD_HASHERS.values(),
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+AUTHENTICATION_BACKENDS = ['core.backends.PooledModelBackend']
+
+# Store for the API throttles (core.throttling). The local store keeps token
+# buckets in process for a single node; set THROTTLE_STORE_BACKEND to
+# core.throttling.CacheWindowStore to share fixed-window counters through the
+# CACHE alias, which lets up to twice a rate through around a window boundary.
+THROTTLE_STORE = {
+    'BACKEND': os.environ.get(
+        'THROTTLE_STORE_BACKEND',
+        'core.throttling.LocalBucketStore',
+    ),
+    'CACHE': os.environ.get('THROTTLE_STORE_CACHE', 'default'),
+    'MAX_KEYS': int(os.environ.get('THROTTLE_STORE_MAX_KEYS', 100000)),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -133,4 +274,23 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'core.User'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': ['core.throttling.ReadWriteThrottle'],
+    # Proxies in front of the app whose X-Forwarded-For entries are trusted
+    # when throttling by IP address; 0 uses REMOTE_ADDR alone.
+    'NUM_PROXIES': int(os.environ.get('THROTTLE_NUM_PROXIES', 0)),
+    # Requests per client; an empty rate turns that budget off.
+    'DEFAULT_THROTTLE_RATES': {
+        'read': os.environ.get('THROTTLE_READ_RATE', '1200/min') or None,
+        'write': os.environ.get('THROTTLE_WRITE_RATE', '300/min') or None,
+        'login': os.environ.get('THROTTLE_LOGIN_RATE', '30/min') or None,
+    },
 }
\ No newline at end of file
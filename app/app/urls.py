@@ -21,6 +21,8 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+from core import views as core_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name = 'api-schema'),
@@ -31,4 +33,5 @@ urlpatterns = [
     ),
     path('api/user/', include('user.urls')),
     path('post/', include('post.urls')),
+    path('metrics', core_views.metrics, name = 'metrics'),
 ]
\ No newline at end of file
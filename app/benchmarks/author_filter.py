@@ -0,0 +1,108 @@
+"""
+Benchmark listing posts filtered by author, ?authors= on /post/posts/.
+
+Seeds one user with --posts posts (100k by default) through
+benchmarks.factories, then prints the query plan and latency of three ways
+to find the first page of posts by some of the user's authors:
+
+- exists: the EXISTS on core_post_authors the endpoint uses,
+- join: a join on core_post_authors deduplicated with DISTINCT,
+- python: every post id and link loaded and filtered client side.
+
+It finishes with the endpoint itself through Django's WSGI handler::
+
+    python -m benchmarks.author_filter --posts 100000
+"""
+import argparse
+
+from benchmarks.common import measure, setup_django
+
+
+def strategies(user_id, author_ids):
+    """Return a function loading the first page of ids for each strategy"""
+    from core.models import Post
+    from post.pagination import PostCursorPagination
+    from post.serializers import filter_posts_by_authors
+
+    size = PostCursorPagination.page_size + 1
+    posts = Post.objects.filter(user_id = user_id).order_by('-id')
+    exists = filter_posts_by_authors(posts, author_ids).values_list('id', flat = True)
+    join = posts.filter(authors__in = author_ids).distinct().values_list('id', flat = True)
+
+    def python():
+        linked = set(Post.authors.through.objects.filter(
+            post__user_id = user_id,
+            author_id__in = author_ids,
+        ).values_list('post_id', flat = True))
+        ids = posts.values_list('id', flat = True)
+        return [post_id for post_id in ids if post_id in linked][:size]
+
+    return {
+        'exists': (exists[:size], lambda: list(exists[:size])),
+        'join': (join[:size], lambda: list(join[:size])),
+        'python': (None, python),
+    }
+
+
+def explain(queryset):
+    """Return the query plan of queryset on one line"""
+    if queryset is None:
+        return '-'
+    return ' '.join(queryset.explain().split())
+
+
+def run(user_id, author_ids, repeat):
+    """Print the plan and latency of every strategy for author_ids"""
+    print(f'\n== authors {",".join(map(str, author_ids))}')
+    for name, (queryset, load) in strategies(user_id, author_ids).items():
+        timing = measure(load, repeat)
+        print(
+            f'{name:<8} p50 {timing["p50"]:8.3f} ms  '
+            f'p95 {timing["p95"]:8.3f} ms  plan: {explain(queryset)}'
+        )
+
+
+def run_endpoint(account, author_ids, repeat):
+    """Print the latency of listing posts by author_ids through the API"""
+    from django.urls import reverse
+    from benchmarks.suite import run_in_process, summarize
+
+    path = reverse('post:post-list') + '?authors=' + ','.join(map(str, author_ids))
+    requests = [('GET', path, account.token, None)] * repeat
+    result = summarize(*run_in_process(requests), 1)
+    print(
+        f'endpoint p50 {result["p50_ms"]} ms  p95 {result["p95_ms"]} ms  '
+        f'{result["queries_per_request"]} queries  {result["errors"]} errors'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--posts', type = int, default = 100_000)
+    parser.add_argument('--authors-per-post', type = int, default = 3)
+    parser.add_argument('--repeat', type = int, default = 20)
+    parser.add_argument('--db', help = 'SQLite file to use (default: temporary)')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from django.core.management import call_command
+    from django.db import connection
+    from core.models import Author
+    from benchmarks.factories import seed
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity = 0)
+    account, = seed(1, args.posts, args.authors_per_post)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    author_ids = list(Author.objects.filter(
+        user_id = account.user_id,
+    ).order_by('id').values_list('id', flat = True))
+
+    for selected in (author_ids[:1], author_ids[:3]):
+        run(account.user_id, selected, args.repeat)
+        run_endpoint(account, selected, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
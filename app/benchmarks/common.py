@@ -0,0 +1,59 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks run against their own SQLite database so they never touch the
+development database. Run them from the ``app`` directory, for example::
+
+    python -m benchmarks.indexes --posts 1000000
+"""
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+
+def setup_django(db_path = None):
+    """Configure Django to use a scratch SQLite database and return its path.
+
+    Other engines, selected with DB_ENGINE, use the configured database.
+    Throttling is off unless the THROTTLE_*_RATE variables are set, and the
+    scratch database runs in WAL mode, as a served one would.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    os.environ.setdefault('SQLITE_JOURNAL_MODE', 'wal')
+    for scope in ('READ', 'WRITE', 'LOGIN'):
+        os.environ.setdefault(f'THROTTLE_{scope}_RATE', '')
+    if db_path is None:
+        handle, db_path = tempfile.mkstemp(prefix = 'bench-', suffix = '.sqlite3')
+        os.close(handle)
+        os.unlink(db_path)
+
+    from django.conf import settings
+    if settings.DATABASES['default']['ENGINE'].endswith('sqlite3'):
+        settings.DATABASES['default']['NAME'] = Path(db_path)
+
+    import django
+    django.setup()
+    return db_path
+
+
+def percentiles(samples):
+    """Return the p50, p95, p99 and max of samples"""
+    samples = sorted(samples)
+    return {
+        'p50': statistics.median(samples),
+        'p95': samples[max(int(len(samples) * 0.95) - 1, 0)],
+        'p99': samples[max(int(len(samples) * 0.99) - 1, 0)],
+        'max': samples[-1],
+    }
+
+
+def measure(func, repeat = 50):
+    """Call func repeat times and return latency percentiles in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
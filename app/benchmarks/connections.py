@@ -0,0 +1,94 @@
+"""
+Benchmark the cost of opening a database connection per request.
+
+Sends ``GET /post/posts/`` through the WSGI handler, so the request signals
+that open, check and close connections all run. It compares CONN_MAX_AGE=0,
+where every request connects and, on SQLite, runs SQLITE_PRAGMAS, against
+persistent connections. Set DB_ENGINE=postgresql and the DB_* variables to
+measure a PostgreSQL server, where connecting costs far more. That run uses
+the configured database, not a scratch one.
+"""
+import argparse
+import uuid
+
+from benchmarks.common import measure, setup_django
+
+
+def seed(posts):
+    """Create a user with posts and return their token key"""
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+    from core.models import Post
+
+    user = get_user_model().objects.create_user(
+        email = f'bench-{uuid.uuid4().hex}@example.com',
+        password = 'benchpassword123',
+    )
+    Post.objects.bulk_create([
+        Post(
+            user = user,
+            title = f'Post {i}',
+            description = 'Sample description',
+            img_description = 'http://placehold.it',
+            slug = f'post-{i}',
+        )
+        for i in range(posts)
+    ])
+    return Token.objects.create(user = user).key
+
+
+def make_request(handler, environ):
+    """Run one request through handler and return the status code"""
+    statuses = []
+    response = handler(dict(environ), lambda status, headers: statuses.append(status))
+    b''.join(response)
+    # Closing the response sends request_finished, like a WSGI server does.
+    response.close()
+    return statuses[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--posts', type = int, default = 20)
+    parser.add_argument('--repeat', type = int, default = 500)
+    parser.add_argument('--db', help = 'SQLite file to use (default: temporary)')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.management import call_command
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from django.test import RequestFactory
+
+    print(f'Database: {connection.vendor} {db_path}')
+    call_command('migrate', verbosity = 0)
+    token = seed(args.posts)
+    connection.close()
+
+    handler = WSGIHandler()
+    environ = RequestFactory()._base_environ(
+        PATH_INFO = '/post/posts/',
+        HTTP_HOST = 'localhost',
+        HTTP_AUTHORIZATION = f'Token {token}',
+        HTTP_ACCEPT = 'application/json',
+    )
+    opened = []
+    connection_created.connect(lambda **kwargs: opened.append(1), weak = False)
+
+    for max_age in (0, 600):
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        status = make_request(handler, environ)
+        if not status.startswith('200'):
+            raise SystemExit(f'GET /post/posts/ returned {status}')
+        opened.clear()
+        timing = measure(lambda: make_request(handler, environ), args.repeat)
+        print(
+            f'CONN_MAX_AGE={max_age:<4} p50 {timing["p50"]:7.3f} ms  '
+            f'p95 {timing["p95"]:7.3f} ms  '
+            f'connections opened {len(opened)}/{args.repeat}'
+        )
+
+
+if __name__ == '__main__':
+    main()
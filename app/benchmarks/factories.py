@@ -0,0 +1,128 @@
+"""
+Factories seeding benchmark data in bulk.
+
+Rows are inserted with bulk_create, which skips model signals, so the
+factories also build what the signals would: author snapshots and search
+documents. Every user shares one password hash, computed once.
+"""
+import uuid
+from collections import namedtuple
+
+Account = namedtuple('Account', ['user_id', 'email', 'token'])
+
+BATCH_SIZE = 1000
+PASSWORD = 'benchpassword123'
+
+
+def _batches(items, size = BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def create_users(count, password = PASSWORD):
+    """Create count users with tokens and return their accounts"""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.authtoken.models import Token
+
+    User = get_user_model()
+    run = uuid.uuid4().hex[:8]
+    encoded = make_password(password)
+    emails = [f'bench-{run}-{i}@example.com' for i in range(count)]
+    User.objects.bulk_create(
+        [User(email = email, name = email, password = encoded) for email in emails],
+        batch_size = BATCH_SIZE,
+    )
+    ids = dict(User.objects.filter(
+        email__startswith = f'bench-{run}-',
+    ).values_list('email', 'id'))
+    accounts = [Account(ids[email], email, Token.generate_key()) for email in emails]
+    Token.objects.bulk_create(
+        [Token(key = account.token, user_id = account.user_id) for account in accounts],
+        batch_size = BATCH_SIZE,
+    )
+    return accounts
+
+
+def create_authors(user_ids, per_user):
+    """Create per_user authors for each user and return their ids by user"""
+    from core.authors import author_identity
+    from core.models import Author
+
+    Author.objects.bulk_create(
+        [
+            Author(
+                user_id = user_id,
+                name = f'Author {n}',
+                link = f'http://www.author{n}.com',
+                identity = author_identity(f'Author {n}', f'http://www.author{n}.com'),
+                profile_picture = 'http://www.profile.com',
+                description = 'Sample description',
+            )
+            for user_id in user_ids
+            for n in range(per_user)
+        ],
+        batch_size = BATCH_SIZE,
+    )
+    authors = {user_id: [] for user_id in user_ids}
+    for user_id, author_id in Author.objects.filter(
+        user_id__in = user_ids,
+    ).order_by('id').values_list('user_id', 'id'):
+        authors[user_id].append(author_id)
+    return authors
+
+
+def create_posts(user_ids, per_user, authors_per_post):
+    """Create per_user posts for each user, each with authors_per_post authors.
+
+    Every user gets authors_per_post * 2 authors to pick from. Return the
+    number of posts created.
+    """
+    from core.models import Post
+    from post import search
+    from post.snapshots import refresh_snapshots
+
+    authors = create_authors(user_ids, authors_per_post * 2)
+    Post.objects.bulk_create(
+        [
+            Post(
+                user_id = user_id,
+                title = f'Post {n}',
+                description = 'Sample description',
+                img_description = 'http://placehold.it',
+                slug = f'post-{n}',
+            )
+            for user_id in user_ids
+            for n in range(per_user)
+        ],
+        batch_size = BATCH_SIZE,
+    )
+    posts = list(Post.objects.filter(user_id__in = user_ids).values_list('id', 'user_id'))
+    links = [
+        Post.authors.through(
+            post_id = post_id,
+            author_id = authors[user_id][(post_id + n) % len(authors[user_id])],
+        )
+        for post_id, user_id in posts
+        for n in range(authors_per_post)
+    ]
+    Post.authors.through.objects.bulk_create(links, batch_size = BATCH_SIZE)
+    post_ids = [post_id for post_id, user_id in posts]
+    refresh_snapshots(post_ids)
+    for batch in _batches(post_ids):
+        search.index_posts(batch)
+    return len(post_ids)
+
+
+def seed(users, posts_per_user, authors_per_post):
+    """Create users with posts and authors and return their accounts"""
+    from django.db import transaction
+
+    with transaction.atomic():
+        accounts = create_users(users)
+        create_posts(
+            [account.user_id for account in accounts],
+            posts_per_user,
+            authors_per_post,
+        )
+    return accounts
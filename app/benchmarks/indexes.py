@@ -0,0 +1,137 @@
+"""
+Benchmark the per-user access patterns before and after the composite
+indexes added in core migration 0006.
+
+Seeds a scratch SQLite database with posts and authors, then prints the
+query plan and latency of the hot queries with and without the indexes.
+"""
+import argparse
+import random
+
+from benchmarks.common import measure, setup_django
+
+BEFORE = '0005_post_authors'
+AFTER = '0006_post_author_indexes'
+
+
+def seed(users, posts, authors_per_user):
+    """Insert users, posts and authors with raw bulk inserts"""
+    from django.db import connection, transaction
+    from core.models import Author, Post, User
+
+    posts_per_user = posts // users
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {User._meta.db_table} '
+            '(id, password, is_superuser, email, name, is_active, is_staff) '
+            'VALUES (%s, \'\', 0, %s, %s, 1, 0)',
+            [(i, f'user{i}@example.com', f'User {i}') for i in range(1, users + 1)],
+        )
+        # Interleave users so every user's posts are spread over the table.
+        cursor.executemany(
+            f'INSERT INTO {Post._meta.db_table} '
+            '(user_id, title, description, img_description, slug) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            (
+                (
+                    user_id,
+                    f'Post {n}',
+                    'Sample description',
+                    'http://placehold.it',
+                    f'post-{n}',
+                )
+                for n in range(posts_per_user)
+                for user_id in range(1, users + 1)
+            ),
+        )
+        cursor.executemany(
+            f'INSERT INTO {Author._meta.db_table} '
+            '(user_id, name, link, profile_picture, description) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            (
+                (
+                    user_id,
+                    f'Author {random.randrange(authors_per_user * 10)}',
+                    'http://www.author.com',
+                    'http://www.profile.com',
+                    'Sample description',
+                )
+                for n in range(authors_per_user)
+                for user_id in range(1, users + 1)
+            ),
+        )
+        cursor.execute('ANALYZE')
+
+
+# Columns that exist both before and after the indexes; later migrations
+# add columns the live models select, which the BEFORE schema lacks.
+POST_COLUMNS = ['id', 'user_id', 'title', 'description', 'img_description', 'slug']
+AUTHOR_COLUMNS = ['id', 'user_id', 'name', 'link', 'profile_picture', 'description']
+
+
+def hot_queries(user_id):
+    """Return the querysets issued by the post and author endpoints"""
+    from core.models import Author, Post
+
+    posts = Post.objects.filter(user_id = user_id)
+    middle = posts.order_by('-id').values_list('id', flat = True)[
+        posts.count() // 2
+    ]
+    authors = Author.objects.filter(user_id = user_id)
+    name = authors.values_list('name', flat = True).first()
+    posts = posts.values(*POST_COLUMNS)
+    authors = authors.values(*AUTHOR_COLUMNS)
+    return {
+        'post list': posts.order_by('-id')[:21],
+        'post page (cursor)': posts.filter(id__lt = middle).order_by('-id')[:21],
+        'post by slug': posts.filter(slug = 'post-42'),
+        'author list': authors.order_by('-name', 'id')[:21],
+        'author lookup': authors.filter(name__in = [name]),
+    }
+
+
+def run(label, user_id, repeat):
+    """Print the plan and latency of every hot query"""
+    from django.db import connection
+
+    print(f'\n== {label}')
+    for name, queryset in hot_queries(user_id).items():
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = '; '.join(row[-1] for row in cursor.fetchall())
+        timing = measure(lambda: list(queryset.all()), repeat)
+        print(
+            f'{name:<20} p50 {timing["p50"]:8.3f} ms  '
+            f'p95 {timing["p95"]:8.3f} ms  plan: {plan}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--posts', type = int, default = 1_000_000)
+    parser.add_argument('--users', type = int, default = 100)
+    parser.add_argument('--authors-per-user', type = int, default = 500)
+    parser.add_argument('--repeat', type = int, default = 50)
+    parser.add_argument('--db', help = 'SQLite file to use (default: temporary)')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from django.core.management import call_command
+    from django.db import connection
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity = 0)
+    call_command('migrate', 'core', BEFORE, verbosity = 0)
+    seed(args.users, args.posts, args.authors_per_user)
+    user_id = args.users // 2 or 1
+
+    run(f'before ({BEFORE})', user_id, args.repeat)
+    call_command('migrate', 'core', AFTER, verbosity = 0)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    run(f'after ({AFTER})', user_id, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
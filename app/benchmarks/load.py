@@ -0,0 +1,163 @@
+"""
+Load test running servers with a plain asyncio HTTP client.
+
+Every URL is hit in turn by --concurrency keep-alive clients for --duration
+seconds, and the throughput and latency percentiles are printed, so a WSGI
+and an ASGI deployment can be compared side by side::
+
+    gunicorn -c gunicorn.conf.py app.asgi:application
+    GUNICORN_WORKER_CLASS=gthread gunicorn -c gunicorn.conf.py \\
+        -b 0.0.0.0:8001 app.wsgi:application
+    python -m benchmarks.load --token <key> \\
+        http://localhost:8000/post/async/posts/ \\
+        http://localhost:8001/post/posts/
+
+Start the servers with an empty THROTTLE_READ_RATE so the read budget
+does not turn the run into a stream of 429 responses.
+
+--slow-clients adds connections that send their request one byte at a
+time, the way a slow network does, and never finish it. On synchronous
+workers each of them holds a worker or thread hostage.
+"""
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.common import percentiles
+
+
+def build_request(url, token, method = 'GET', body = None):
+    """Return the raw bytes of a keep-alive request for url.
+
+    A body is sent as JSON.
+    """
+    parts = urlsplit(url)
+    target = parts.path or '/'
+    if parts.query:
+        target += '?' + parts.query
+    lines = [
+        f'{method} {target} HTTP/1.1',
+        f'Host: {parts.netloc}',
+        'Accept: application/json',
+        'Connection: keep-alive',
+    ]
+    if token:
+        lines.append(f'Authorization: Token {token}')
+    payload = b''
+    if body is not None:
+        payload = json.dumps(body).encode('utf-8')
+        lines.append('Content-Type: application/json')
+        lines.append(f'Content-Length: {len(payload)}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + payload
+
+
+async def read_response(reader):
+    """Read one response and return its status code and lowercased headers"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    status_line, *header_lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in header_lines:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(status_line.split()[1]), headers
+
+
+async def open_connection(url):
+    parts = urlsplit(url)
+    return await asyncio.open_connection(parts.hostname, parts.port or 80)
+
+
+async def client(url, request, deadline, samples, errors):
+    """Send requests over one connection until the deadline"""
+    reader, writer = await open_connection(url)
+    try:
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            try:
+                status, headers = await read_response(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                errors.append('disconnected')
+                writer.close()
+                reader, writer = await open_connection(url)
+                continue
+            if status == 200:
+                samples.append((time.perf_counter() - start) * 1000)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def slow_client(url, request, deadline, interval):
+    """Trickle a request one byte at a time until the deadline"""
+    reader, writer = await open_connection(url)
+    try:
+        for byte in request[:-1]:
+            if time.monotonic() >= deadline:
+                break
+            writer.write(bytes([byte]))
+            await writer.drain()
+            await asyncio.sleep(interval)
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run(url, args):
+    """Load url and return the successful latencies and the errors"""
+    request = build_request(url, args.token)
+    deadline = time.monotonic() + args.duration
+    samples, errors = [], []
+    slow = [
+        asyncio.ensure_future(slow_client(url, request, deadline, args.slow_interval))
+        for _ in range(args.slow_clients)
+    ]
+    # Give the slow clients time to occupy the workers first.
+    await asyncio.sleep(min(args.slow_interval * 2, args.duration / 10))
+    await asyncio.gather(*[
+        client(url, request, deadline, samples, errors)
+        for _ in range(args.concurrency)
+    ])
+    await asyncio.gather(*slow)
+    return samples, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('urls', nargs = '+')
+    parser.add_argument('--token', help = 'API token sent with every request')
+    parser.add_argument('--concurrency', type = int, default = 50)
+    parser.add_argument('--duration', type = float, default = 30)
+    parser.add_argument('--slow-clients', type = int, default = 0)
+    parser.add_argument('--slow-interval', type = float, default = 0.5)
+    args = parser.parse_args()
+
+    for url in args.urls:
+        samples, errors = asyncio.run(run(url, args))
+        print(f'\n== {url}')
+        if not samples:
+            print(f'no successful responses, {len(errors)} errors')
+            continue
+        timing = percentiles(samples)
+        print(
+            f'{len(samples) / args.duration:10.1f} req/s  '
+            f'p50 {timing["p50"]:8.2f} ms  p99 {timing["p99"]:8.2f} ms  '
+            f'max {timing["max"]:8.2f} ms  errors {len(errors)}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark API latency during a login storm.
+
+Runs --login-threads threads posting credentials to /api/user/token/ and
+--api-threads threads reading /post/posts/, all through one in-process WSGI
+handler, for --duration seconds per hashing pool size in --workers. A pool
+size of 0 hashes on the request threads, as Django does by default.
+Reports logins/s, rejected logins and the API's latency percentiles.
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+
+from benchmarks.common import percentiles, setup_django
+from benchmarks.connections import make_request
+
+
+def environ(factory, method, path, token = None, body = None):
+    """Return a WSGI environ for a JSON request"""
+    extra = {'HTTP_HOST': 'localhost', 'HTTP_ACCEPT': 'application/json'}
+    if token:
+        extra['HTTP_AUTHORIZATION'] = f'Token {token}'
+    if body is None:
+        return factory.generic(method, path, **extra).environ
+    return factory.generic(
+        method,
+        path,
+        json.dumps(body),
+        'application/json',
+        **extra,
+    ).environ
+
+
+def storm(handler, login, api, duration, login_threads, api_threads, backoff):
+    """Run both kinds of clients and return their results"""
+    deadline = time.monotonic() + duration
+    logins, rejected, latencies = [], [], []
+
+    def log_in():
+        while time.monotonic() < deadline:
+            status = make_request(handler, login())
+            if status.startswith('200'):
+                logins.append(status)
+            else:
+                rejected.append(status)
+                time.sleep(backoff)
+
+    def read():
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            make_request(handler, api())
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target = log_in) for _ in range(login_threads)]
+    threads += [threading.Thread(target = read) for _ in range(api_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return logins, rejected, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--workers', type = int, nargs = '+', default = [0, 1, 2])
+    parser.add_argument('--queue-size', type = int, default = 4)
+    parser.add_argument('--login-threads', type = int, default = 16)
+    parser.add_argument('--api-threads', type = int, default = 2)
+    parser.add_argument('--duration', type = float, default = 10)
+    parser.add_argument(
+        '--backoff',
+        type = float,
+        default = 0.1,
+        help = 'seconds a rejected login waits before retrying',
+    )
+    parser.add_argument('--db', help = 'SQLite file to use (default: temporary)')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.management import call_command
+    from django.test import RequestFactory
+    from rest_framework.authtoken.models import Token
+
+    # Rejected logins are expected here; keep them out of the output.
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    print(f'Database: {db_path}')
+    print(f'Hasher: {settings.PASSWORD_HASHERS[0]}')
+    call_command('migrate', verbosity = 0)
+    credentials = {'email': 'bench@example.com', 'password': 'benchpassword123'}
+    user = get_user_model().objects.create_user(**credentials)
+    token = Token.objects.create(user = user).key
+
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    login_environ = environ(factory, 'POST', '/api/user/token/', body = credentials)
+    body = login_environ['wsgi.input'].read()
+    api_environ = environ(factory, 'GET', '/post/posts/', token)
+
+    def login():
+        request = dict(login_environ)
+        request['wsgi.input'] = type(login_environ['wsgi.input'])(body)
+        return request
+
+    for workers in args.workers:
+        settings.PASSWORD_HASHING = {
+            **settings.PASSWORD_HASHING,
+            'WORKERS': workers,
+            'QUEUE_SIZE': args.queue_size,
+        }
+        logins, rejected, latencies = storm(
+            handler,
+            login,
+            lambda: dict(api_environ),
+            args.duration,
+            args.login_threads,
+            args.api_threads,
+            args.backoff,
+        )
+        timing = percentiles(latencies)
+        print(
+            f'workers={workers}  {len(logins) / args.duration:7.1f} logins/s  '
+            f'rejected {len(rejected):5}  '
+            f'API {len(latencies) / args.duration:7.1f} req/s  '
+            f'p50 {timing["p50"]:8.2f} ms  p99 {timing["p99"]:8.2f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
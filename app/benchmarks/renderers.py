@@ -0,0 +1,72 @@
+"""
+Benchmark JSON encoding and decoding of post payloads.
+
+Builds a page of PostSerializer output from seeded posts, then times
+rendering it with JSONRenderer and ORJSONRenderer and parsing the result
+with JSONParser and ORJSONParser.
+"""
+import argparse
+import io
+import time
+
+from benchmarks.common import setup_django
+from benchmarks.serializers import seed
+
+
+def throughput(func, payload_size, repeat):
+    """Return calls per second and MB per second of func's best run"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return 1 / best, payload_size / best / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--posts', type = int, default = 100)
+    parser.add_argument('--authors-per-post', type = int, default = 3)
+    parser.add_argument('--repeat', type = int, default = 200)
+    parser.add_argument('--db', help = 'SQLite file to use (default: temporary)')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from django.core.management import call_command
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from core.models import Post
+    from core.parsers import ORJSONParser
+    from core.renderers import ORJSONRenderer, orjson
+    from post.serializers import PostSerializer, authors_prefetch
+
+    print(f'Database: {db_path}')
+    print(f'orjson: {orjson.__version__ if orjson else "not installed"}')
+    call_command('migrate', verbosity = 0)
+    user = seed(args.posts, args.authors_per_post)
+    posts = Post.objects.filter(user = user).prefetch_related(authors_prefetch())
+    data = {
+        'next': 'http://localhost:8000/post/posts/?cursor=cD0xMjM0',
+        'previous': None,
+        'results': PostSerializer(posts.order_by('-id'), many = True).data,
+    }
+    body = JSONRenderer().render(data)
+    if ORJSONRenderer().render(data) != body:
+        raise SystemExit('ORJSONRenderer output differs from JSONRenderer')
+    context = {'encoding': 'utf-8'}
+
+    print(f'Payload: {args.posts} posts, {len(body)} bytes')
+    cases = [
+        ('encode', 'JSONRenderer', lambda: JSONRenderer().render(data)),
+        ('encode', 'ORJSONRenderer', lambda: ORJSONRenderer().render(data)),
+        ('decode', 'JSONParser', lambda: JSONParser().parse(io.BytesIO(body), None, context)),
+        ('decode', 'ORJSONParser', lambda: ORJSONParser().parse(io.BytesIO(body), None, context)),
+    ]
+    for kind, name, func in cases:
+        per_second, mb_per_second = throughput(func, len(body), args.repeat)
+        print(f'{kind} {name:<15} {per_second:10.0f} payloads/s  {mb_per_second:8.1f} MB/s')
+
+
+if __name__ == '__main__':
+    main()
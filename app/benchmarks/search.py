@@ -0,0 +1,118 @@
+"""
+Benchmark post search as the table grows.
+
+Seeds a scratch SQLite database in steps up to --posts, and after each step
+times the full-text search used by ``GET /post/posts/?q=`` against the
+icontains scan it replaces. Search latency should stay roughly flat while
+the scan grows with the table; ranked search costs grow with the number
+of matching posts instead, so the queries use words from a large random
+vocabulary rather than a handful of words every post contains.
+"""
+import argparse
+import random
+
+from benchmarks.common import measure, setup_django
+
+VOCABULARY = 20_000
+
+
+def vocabulary(rng, size):
+    """Return size distinct random lowercase words"""
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(4, 9))))
+    return sorted(words)
+
+
+def seed(user_ids, words, start, count, rng):
+    """Insert count posts with random titles and descriptions"""
+    from django.db import connection, transaction
+    from core.models import Post
+    from post.search import get_backend
+
+    def text(length):
+        return ' '.join(rng.choice(words) for _ in range(length))
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {Post._meta.db_table} '
+            '(user_id, title, description, img_description, slug) '
+            'VALUES (%s, %s, %s, %s, %s)',
+            (
+                (
+                    user_ids[n % len(user_ids)],
+                    text(4) + f' {n}',
+                    text(30),
+                    'http://placehold.it',
+                    f'post-{n}',
+                )
+                for n in range(start, start + count)
+            ),
+        )
+        # Raw inserts skip the signals, so index the new rows directly.
+        cursor.execute(get_backend().index_sql('WHERE p.id > %s'), [start])
+
+
+def create_users(count):
+    """Insert count users and return their ids"""
+    from core.models import User
+
+    return [
+        User.objects.create(email = f'user{i}@example.com', name = f'User {i}').pk
+        for i in range(count)
+    ]
+
+
+def run(size, user, queries, repeat):
+    """Print search and scan latency for every query"""
+    from core.models import Post
+    from post.search import FallbackSearchBackend, search_post_ids
+
+    scan = FallbackSearchBackend()
+    for query in queries:
+        indexed = measure(lambda: search_post_ids(user, query, 21), repeat)
+        scanned = measure(lambda: scan.search(None, user.pk, query, 21, 0), repeat)
+        print(
+            f'{size:>9} posts  q={query!r:<24} '
+            f'fts p50 {indexed["p50"]:8.3f} ms  p95 {indexed["p95"]:8.3f} ms  '
+            f'scan p50 {scanned["p50"]:8.3f} ms'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--posts', type = int, default = 1_000_000)
+    parser.add_argument('--steps', type = int, default = 3)
+    parser.add_argument('--users', type = int, default = 10)
+    parser.add_argument('--repeat', type = int, default = 20)
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('--db', help = 'SQLite file to use (default: temporary)')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from django.core.management import call_command
+    from core.models import User
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity = 0)
+    rng = random.Random(args.seed)
+    user_ids = create_users(args.users)
+    user = User.objects.get(pk = user_ids[0])
+    words = vocabulary(rng, VOCABULARY)
+    queries = [
+        words[0],
+        f'{words[1]} {words[2]}',
+        words[3][:3],
+    ]
+
+    sizes = [args.posts // 10 ** step for step in reversed(range(args.steps))]
+    seeded = 0
+    for size in sizes:
+        seed(user_ids, words, seeded, size - seeded, rng)
+        seeded = size
+        run(size, user, queries, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark serializing post listings.
+
+Seeds posts with a few authors each, then renders all of them to JSON with
+PostSerializer over prefetched model instances, and with the value-row
+path behind the post list, both joining the author tables and reading
+the posts' author snapshots. All outputs are checked to be byte-identical
+before the throughput of each is printed.
+"""
+import argparse
+import time
+
+from benchmarks.common import setup_django
+
+
+def seed(posts, authors_per_post):
+    """Insert posts for one user, each linked to authors_per_post authors"""
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from core.authors import author_identity
+    from core.models import Author, Post
+    from post.snapshots import refresh_snapshots
+
+    user = get_user_model().objects.create_user(
+        email = 'bench@example.com',
+        password = 'benchpassword123',
+    )
+    with transaction.atomic():
+        Author.objects.bulk_create([
+            Author(
+                user = user,
+                name = f'Author {i}',
+                link = 'http://www.author.com',
+                identity = author_identity(f'Author {i}', 'http://www.author.com'),
+                profile_picture = 'http://www.profile.com',
+                description = 'Sample description',
+            )
+            for i in range(50)
+        ])
+        authors = list(Author.objects.filter(user = user).order_by('id'))
+        Post.objects.bulk_create([
+            Post(
+                user = user,
+                title = f'Post {i}',
+                description = 'Sample description',
+                img_description = 'http://placehold.it',
+                slug = f'post-{i}',
+            )
+            for i in range(posts)
+        ])
+        post_ids = list(Post.objects.filter(user = user).values_list('id', flat = True))
+        Post.authors.through.objects.bulk_create([
+            Post.authors.through(
+                post_id = post_id,
+                author_id = authors[(post_id + n) % len(authors)].id,
+            )
+            for post_id in post_ids
+            for n in range(authors_per_post)
+        ])
+        refresh_snapshots(post_ids)
+    return user
+
+
+def timed(func, repeat):
+    """Return the output of func and its best time in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return output, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--posts', type = int, default = 10_000)
+    parser.add_argument('--authors-per-post', type = int, default = 3)
+    parser.add_argument('--repeat', type = int, default = 5)
+    parser.add_argument('--db', help = 'SQLite file to use (default: temporary)')
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from django.core.management import call_command
+    from django.test import override_settings
+    from rest_framework.renderers import JSONRenderer
+    from core.models import Post
+    from post.serializers import (
+        PostSerializer,
+        authors_prefetch,
+        post_rows,
+        serialize_post_rows,
+    )
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity = 0)
+    user = seed(args.posts, args.authors_per_post)
+    posts = Post.objects.filter(user = user).order_by('-id')
+    renderer = JSONRenderer()
+
+    def with_serializer():
+        queryset = posts.prefetch_related(authors_prefetch())
+        return renderer.render(PostSerializer(queryset, many = True).data)
+
+    def with_rows():
+        return renderer.render(serialize_post_rows(list(post_rows(posts))))
+
+    def with_joined_rows():
+        with override_settings(POST_AUTHORS_SNAPSHOT = False):
+            return with_rows()
+
+    expected, serializer_time = timed(with_serializer, args.repeat)
+    timings = [('PostSerializer', serializer_time)]
+    for name, func in (('value rows', with_joined_rows), ('snapshots', with_rows)):
+        output, seconds = timed(func, args.repeat)
+        if output != expected:
+            raise SystemExit(f'{name} output differs from PostSerializer output')
+        timings.append((name, seconds))
+
+    for name, seconds in timings:
+        print(
+            f'{name:<15} {seconds * 1000:9.1f} ms  '
+            f'{args.posts / seconds:10.0f} rows/s  '
+            f'speedup {serializer_time / seconds:4.1f}x'
+        )
+    print('output identical')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Benchmark suite for the post and user APIs.
+
+Seeds --users users with --posts-per-user posts of --authors-per-post
+authors each through benchmarks.factories. Every scenario then gets
+--requests requests, spread over the users; logins are few because hashing
+is slow on purpose. The suite reports req/s, latency percentiles and SQL
+queries per request as JSON::
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json
+
+Requests run in process through Django's WSGI handler, one at a time, with
+queries counted on the connection. With --url they go over HTTP to a running
+server, --concurrency at a time. The server must use the same database
+(--db or the DB_* variables) and have throttling off. Queries per request
+come from its Server-Timing header, so start it with METRICS_ENABLED=1.
+
+--compare fails with exit status 1 when a scenario loses more than
+--tolerance of its req/s, its p95 or p99 grow by more than --tolerance,
+or it makes more queries per request than the baseline.
+"""
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import sys
+import time
+
+from benchmarks.common import percentiles, setup_django
+
+SCENARIOS = ['posts', 'authors', 'me', 'token']
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def scenario_requests(name, accounts, count):
+    """Return count (method, path, token, body) requests of a scenario"""
+    from django.urls import reverse
+    from benchmarks.factories import PASSWORD
+
+    paths = {
+        'posts': reverse('post:post-list'),
+        'authors': reverse('post:author-list'),
+        'me': reverse('user:me'),
+        'token': reverse('user:token'),
+    }
+    requests = []
+    for n in range(count):
+        account = accounts[n % len(accounts)]
+        if name == 'token':
+            body = {'email': account.email, 'password': PASSWORD}
+            requests.append(('POST', paths[name], None, body))
+        else:
+            requests.append(('GET', paths[name], account.token, None))
+    return requests
+
+
+def run_in_process(requests):
+    """Send requests through the WSGI handler; return latencies, errors and queries"""
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.test import RequestFactory
+    from benchmarks.connections import make_request
+    from benchmarks.logins import environ
+
+    handler = WSGIHandler()
+    factory = RequestFactory()
+    latencies, errors, queries = [], [], []
+    executed = []
+
+    def count(execute, sql, params, many, context):
+        executed.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        for method, path, token, body in requests:
+            request = environ(factory, method, path, token, body)
+            executed.clear()
+            start = time.perf_counter()
+            status = make_request(handler, request)
+            elapsed = (time.perf_counter() - start) * 1000
+            if status.startswith('2'):
+                latencies.append(elapsed)
+                queries.append(len(executed))
+            else:
+                errors.append(status)
+    return latencies, errors, queries
+
+
+async def _http_client(base_url, requests, latencies, errors, queries):
+    from benchmarks.load import build_request, open_connection, read_response
+
+    reader, writer = await open_connection(base_url)
+    try:
+        for method, path, token, body in requests:
+            raw = build_request(base_url.rstrip('/') + path, token, method, body)
+            start = time.perf_counter()
+            writer.write(raw)
+            status, headers = await read_response(reader)
+            elapsed = (time.perf_counter() - start) * 1000
+            if 200 <= status < 300:
+                latencies.append(elapsed)
+                match = QUERIES.search(headers.get('server-timing', ''))
+                if match:
+                    queries.append(int(match.group(1)))
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def run_http(base_url, requests, concurrency):
+    """Send requests over concurrency connections; return latencies, errors and queries"""
+    latencies, errors, queries = [], [], []
+
+    async def run():
+        await asyncio.gather(*[
+            _http_client(base_url, requests[n::concurrency], latencies, errors, queries)
+            for n in range(concurrency)
+        ])
+
+    asyncio.run(run())
+    return latencies, errors, queries
+
+
+def summarize(latencies, errors, queries, seconds):
+    """Return the report of one scenario"""
+    report = {
+        'requests': len(latencies) + len(errors),
+        'errors': len(errors),
+        'req_per_s': round(len(latencies) / seconds, 1),
+        'p50_ms': None,
+        'p95_ms': None,
+        'p99_ms': None,
+        'queries_per_request': round(statistics.mean(queries), 2) if queries else None,
+    }
+    if latencies:
+        timing = percentiles(latencies)
+        for name in ('p50', 'p95', 'p99'):
+            report[f'{name}_ms'] = round(timing[name], 2)
+    return report
+
+
+def compare(baseline, current, tolerance):
+    """Return a description of every regression of current against baseline"""
+    regressions = []
+    for name, base in baseline['results'].items():
+        now = current['results'].get(name)
+        if now is None:
+            continue
+        if now['req_per_s'] < base['req_per_s'] * (1 - tolerance):
+            regressions.append(
+                f'{name}: {now["req_per_s"]} req/s, baseline {base["req_per_s"]}'
+            )
+        for key in ('p95_ms', 'p99_ms'):
+            if None not in (now[key], base[key]) and now[key] > base[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {now[key]}, baseline {base[key]}')
+        queries = (now['queries_per_request'], base['queries_per_request'])
+        if None not in queries and queries[0] > queries[1]:
+            regressions.append(
+                f'{name}: {queries[0]} queries per request, baseline {queries[1]}'
+            )
+        if now['errors'] > base['errors']:
+            regressions.append(f'{name}: {now["errors"]} errors, baseline {base["errors"]}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description = __doc__,
+        formatter_class = argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--users', type = int, default = 20)
+    parser.add_argument('--posts-per-user', type = int, default = 100)
+    parser.add_argument('--authors-per-post', type = int, default = 3)
+    parser.add_argument('--scenarios', nargs = '+', choices = SCENARIOS, default = SCENARIOS)
+    parser.add_argument('--requests', type = int, default = 500)
+    parser.add_argument('--login-requests', type = int, default = 20)
+    parser.add_argument('--warmup', type = int, default = 10)
+    parser.add_argument('--url', help = 'base URL of a running server to load over HTTP')
+    parser.add_argument('--concurrency', type = int, default = 10)
+    parser.add_argument('--db', help = 'SQLite file to use (default: temporary)')
+    parser.add_argument('--output', help = 'write the JSON report to this file')
+    parser.add_argument('--compare', help = 'baseline JSON report to check against')
+    parser.add_argument('--tolerance', type = float, default = 0.2)
+    args = parser.parse_args()
+
+    db_path = setup_django(args.db)
+    from django.core.management import call_command
+    from django.db import connection
+    from benchmarks.factories import seed
+
+    call_command('migrate', verbosity = 0)
+    accounts = seed(args.users, args.posts_per_user, args.authors_per_post)
+    if args.url:
+        # Let the server see the seed and keep this process off the database.
+        connection.close()
+
+    report = {
+        'config': {
+            'mode': 'http' if args.url else 'in-process',
+            'database': connection.vendor,
+            'users': args.users,
+            'posts_per_user': args.posts_per_user,
+            'authors_per_post': args.authors_per_post,
+            'concurrency': args.concurrency if args.url else 1,
+        },
+        'results': {},
+    }
+    for name in args.scenarios:
+        count = args.login_requests if name == 'token' else args.requests
+        warmup = scenario_requests(name, accounts, min(args.warmup, count))
+        requests = scenario_requests(name, accounts, count)
+        if args.url:
+            run_http(args.url, warmup, args.concurrency)
+            start = time.perf_counter()
+            results = run_http(args.url, requests, args.concurrency)
+        else:
+            run_in_process(warmup)
+            start = time.perf_counter()
+            results = run_in_process(requests)
+        result = report['results'][name] = summarize(*results, time.perf_counter() - start)
+        print(
+            f'{name:<8} {result["req_per_s"]:8.1f} req/s  p50 {result["p50_ms"]} ms  '
+            f'p99 {result["p99_ms"]} ms  {result["queries_per_request"]} queries  '
+            f'{result["errors"]} errors',
+            file = sys.stderr,
+        )
+
+    output = json.dumps(report, indent = 2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+    print(f'Database: {db_path}', file = sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        if baseline['config'] != report['config']:
+            print('warning: baseline was taken with a different config', file = sys.stderr)
+        regressions = compare(baseline, report, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file = sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+        print('No regressions against the baseline.', file = sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Helpers for the async API views
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+from rest_framework import exceptions
+
+from core.authentication import CachedTokenAuthentication
+from core.renderers import ORJSONRenderer
+
+
+def _pooled(func):
+    """Wrap func to manage the connection of the pool thread it runs on"""
+    def run(*args):
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return run
+
+
+def run_sync(func, *args):
+    """Run blocking ORM work off the event loop"""
+    if settings.ASYNC_ORM_THREAD_SENSITIVE:
+        return sync_to_async(func)(*args)
+    return sync_to_async(_pooled(func), thread_sensitive = False)(*args)
+
+
+def render_json(data, status = 200):
+    """Return data rendered as a JSON response"""
+    return HttpResponse(
+        ORJSONRenderer().render(data),
+        status = status,
+        content_type = 'application/json',
+    )
+
+
+def error_response(exc):
+    """Return the response DRF's exception handler gives for exc"""
+    if isinstance(exc.detail, (list, dict)):
+        response = render_json(exc.detail, exc.status_code)
+    else:
+        response = render_json({'detail': exc.detail}, exc.status_code)
+    if isinstance(exc, exceptions.NotAuthenticated):
+        response.status_code = exceptions.AuthenticationFailed.status_code
+        response['WWW-Authenticate'] = CachedTokenAuthentication().authenticate_header(None)
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = '%d' % exc.wait
+    return response
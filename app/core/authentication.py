@@ -0,0 +1,128 @@
+"""
+Authentication classes shared by the APIs.
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """Thread-safe LRU mapping token keys to (user, token) with a TTL."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the live entry for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, max_size):
+        """Store value under key, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last = False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+_stats = {'local': 0, 'shared': 0, 'miss': 0}
+_stats_lock = threading.Lock()
+
+
+def token_cache_stats():
+    """Return the process-wide count of local hits, shared hits and misses"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _shared_key(key):
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return f'auth:token:{digest}'
+
+
+def _shared_cache():
+    alias = settings.TOKEN_AUTH_CACHE['SHARED_CACHE']
+    return caches[alias] if alias else None
+
+
+def invalidate_token(key):
+    """Forget a token key in both tiers once the transaction commits"""
+    def forget():
+        token_cache.delete(key)
+        shared = _shared_cache()
+        if shared is not None:
+            shared.delete(_shared_key(key))
+
+    transaction.on_commit(forget)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token to user lookup.
+
+    Lookups hit an in-process LRU first and then, when SHARED_CACHE names a
+    cache alias, a tier shared between processes. Entries are dropped when
+    the token is deleted or its user is saved. Other processes forget their
+    local copy within TTL seconds.
+
+    The outcome of the lookup ('local', 'shared' or 'miss') is stored on
+    the underlying HttpRequest as ``token_cache_result``.
+    """
+
+    def authenticate(self, request):
+        self.cache_result = None
+        try:
+            return super().authenticate(request)
+        finally:
+            if self.cache_result is not None:
+                request._request.token_cache_result = self.cache_result
+                with _stats_lock:
+                    _stats[self.cache_result] += 1
+
+    def authenticate_credentials(self, key):
+        options = settings.TOKEN_AUTH_CACHE
+        entry = token_cache.get(key)
+        if entry is not None:
+            self.cache_result = 'local'
+        else:
+            shared = _shared_cache()
+            if shared is not None:
+                entry = shared.get(_shared_key(key))
+            if entry is not None:
+                self.cache_result = 'shared'
+            else:
+                self.cache_result = 'miss'
+                entry = super().authenticate_credentials(key)
+                if shared is not None:
+                    shared.set(_shared_key(key), entry, options['SHARED_TTL'])
+            token_cache.set(key, entry, options['TTL'], options['MAX_SIZE'])
+
+        user, token = entry
+        # Hand out a copy so views mutating request.user never touch the cache.
+        return (copy.copy(user), token)
@@ -0,0 +1,101 @@
+"""
+Author identity and the merging of duplicate authors.
+
+A user's authors are told apart by their name and link alone, normalized
+so that case, spacing, the URL scheme, a www. prefix and a trailing slash
+do not make a second author. The other fields are details of the same
+author and are updated in place.
+"""
+import hashlib
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.db import transaction
+from django.db.models import Count, Min
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_name(name):
+    """Return name casefolded with runs of whitespace collapsed"""
+    return ' '.join((name or '').split()).casefold()
+
+
+def normalize_link(link):
+    """Return link without scheme, default port, www. or trailing slash"""
+    parts = urlsplit((link or '').strip())
+    host = parts.hostname or ''
+    if host.startswith('www.'):
+        host = host[len('www.'):]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f'{host}:{port}'
+    path = parts.path.rstrip('/')
+    query = f'?{parts.query}' if parts.query else ''
+    return f'{host}{path}{query}'
+
+
+def author_identity(name, link):
+    """Return the key identifying an author among a user's authors"""
+    key = f'{normalize_name(name)}\n{normalize_link(link)}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def merge_duplicate_authors(author_model, link_model, batch_size = 500, on_merge = None):
+    """Merge each user's authors sharing an identity into the oldest of them.
+
+    Works through batch_size duplicate groups per transaction. Links to the
+    duplicates move to the kept author, or are dropped when the post already
+    links it, and the duplicates are deleted. on_merge, if given, is called
+    in each transaction with the ids of the posts whose links changed.
+    Takes the models as arguments so migrations can pass historical ones.
+    Return the number of authors deleted.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            groups = list(
+                author_model.objects.values('user_id', 'identity').annotate(
+                    count = Count('id'),
+                    keep = Min('id'),
+                ).filter(count__gt = 1).order_by('keep')[:batch_size]
+            )
+            if not groups:
+                return deleted
+            keep = {(group['user_id'], group['identity']): group['keep'] for group in groups}
+            targets = {}
+            for author_id, user_id, identity in author_model.objects.filter(
+                user_id__in = {group['user_id'] for group in groups},
+                identity__in = {group['identity'] for group in groups},
+            ).values_list('id', 'user_id', 'identity'):
+                kept = keep.get((user_id, identity))
+                if kept is not None and author_id != kept:
+                    targets[author_id] = kept
+
+            linked = set(link_model.objects.filter(
+                author_id__in = set(targets.values()),
+            ).values_list('post_id', 'author_id'))
+            moves = defaultdict(list)
+            drops = []
+            post_ids = set()
+            for link_id, post_id, author_id in link_model.objects.filter(
+                author_id__in = targets,
+            ).order_by('id').values_list('id', 'post_id', 'author_id'):
+                pair = (post_id, targets[author_id])
+                if pair in linked:
+                    drops.append(link_id)
+                else:
+                    moves[pair[1]].append(link_id)
+                    linked.add(pair)
+                post_ids.add(post_id)
+
+            link_model.objects.filter(id__in = drops).delete()
+            for author_id, link_ids in moves.items():
+                link_model.objects.filter(id__in = link_ids).update(author_id = author_id)
+            author_model.objects.filter(id__in = targets).delete()
+            if on_merge is not None and post_ids:
+                on_merge(sorted(post_ids))
+            deleted += len(targets)
@@ -0,0 +1,37 @@
+"""
+Authentication backends
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+
+from core.hashers import hashing_pool, verify_password
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend that checks passwords on the hashing pool.
+
+    The user is loaded, and an outdated hash replaced, on the calling
+    thread; only the hashing itself moves to the pool.
+    """
+
+    def authenticate(self, request, username = None, password = None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            hashing_pool.run(make_password, password)
+            return None
+
+        valid, rehashed = hashing_pool.run(verify_password, password, user.password)
+        if not valid:
+            return None
+        if rehashed is not None:
+            user.password = rehashed
+            user.save(update_fields = ['password'])
+        return user if self.user_can_authenticate(user) else None
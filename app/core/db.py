@@ -0,0 +1,34 @@
+"""
+Database connection setup and health checks
+"""
+from django.conf import settings
+from django.db import connections
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to a new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def check_connections(**kwargs):
+    """Close persistent connections that stopped working.
+
+    Django closes connections that are past CONN_MAX_AGE, or that raised an
+    error, when a request starts. A connection the server dropped while it
+    sat idle goes unnoticed until a query fails. When DB_CONN_HEALTH_CHECKS
+    is set, ping each kept connection so the request opens a fresh one
+    instead.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    for conn in connections.all():
+        if (
+            conn.connection is not None
+            and not conn.in_atomic_block
+            and not conn.is_usable()
+        ):
+            conn.close()
@@ -0,0 +1,121 @@
+"""
+Password hashers with a configurable cost, and the pool logins hash on.
+
+The hashers read their cost from settings.PASSWORD_HASHING. Django
+rehashes a stored password on the next successful login whenever its
+algorithm or cost no longer matches the preferred hasher.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+def _cost(name):
+    return settings.PASSWORD_HASHING[name]
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with PBKDF2_ITERATIONS iterations"""
+
+    @property
+    def iterations(self):
+        return _cost('PBKDF2_ITERATIONS')
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    """bcrypt over SHA-256 with BCRYPT_ROUNDS rounds"""
+
+    @property
+    def rounds(self):
+        return _cost('BCRYPT_ROUNDS')
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with ARGON2_TIME_COST, ARGON2_MEMORY_COST and ARGON2_PARALLELISM"""
+
+    @property
+    def time_cost(self):
+        return _cost('ARGON2_TIME_COST')
+
+    @property
+    def memory_cost(self):
+        return _cost('ARGON2_MEMORY_COST')
+
+    @property
+    def parallelism(self):
+        return _cost('ARGON2_PARALLELISM')
+
+
+def verify_password(password, encoded):
+    """Check password against encoded.
+
+    Return whether it matches, and a fresh hash of it when encoded uses an
+    outdated algorithm or cost, else None.
+    """
+    rehashed = []
+    valid = hashers.check_password(
+        password,
+        encoded,
+        setter = lambda raw: rehashed.append(hashers.make_password(raw)),
+    )
+    return valid, rehashed[0] if rehashed else None
+
+
+class HashingUnavailable(APIException):
+    """The hashing pool has no room for another password check"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins in progress, try again shortly.'
+    default_code = 'hashing_unavailable'
+    wait = 1
+
+
+class HashingPool:
+    """Run password hashing on a few threads and refuse work past a queue.
+
+    Hashing releases the GIL, so WORKERS bounds the cores logins may take.
+    Up to QUEUE_SIZE more checks wait their turn; beyond that run() raises
+    HashingUnavailable rather than letting a login burst pile up threads.
+    With WORKERS set to 0 hashing runs inline on the calling thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._config = None
+        self._executor = None
+        self._slots = None
+
+    def _start(self, workers, queue_size):
+        with self._lock:
+            if self._config != (workers, queue_size):
+                if self._executor is not None:
+                    self._executor.shutdown(wait = False)
+                self._executor = ThreadPoolExecutor(
+                    max_workers = workers,
+                    thread_name_prefix = 'password-hashing',
+                )
+                self._slots = threading.BoundedSemaphore(workers + queue_size)
+                self._config = (workers, queue_size)
+            return self._executor, self._slots
+
+    def run(self, func, *args):
+        """Return func(*args), computed on the pool"""
+        options = settings.PASSWORD_HASHING
+        if not options['WORKERS']:
+            return func(*args)
+        executor, slots = self._start(options['WORKERS'], options['QUEUE_SIZE'])
+        if not slots.acquire(blocking = False):
+            raise HashingUnavailable()
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda future: slots.release())
+        return future.result()
+
+
+hashing_pool = HashingPool()
@@ -0,0 +1,133 @@
+"""
+In-process request metrics rendered in the Prometheus text format.
+
+Each process keeps its own histograms, so with several gunicorn workers
+every scrape sees one worker only.
+"""
+import bisect
+import threading
+from collections import defaultdict
+
+from core.authentication import token_cache_stats
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    """Bucketed observations, one series per label value"""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = defaultdict(lambda: [[0] * len(self.buckets), 0, 0.0])
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series[view]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            series = sorted(
+                (view, list(counts), count, total)
+                for view, (counts, count, total) in self._series.items()
+            )
+        for view, counts, count, total in series:
+            label = f'view="{_escape(view)}"'
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, counts):
+                cumulative += bucket
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label}}} {_number(total)}')
+            lines.append(f'{self.name}_count{{{label}}} {count}')
+        return lines
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_duration = Histogram(
+    'http_request_duration_seconds',
+    'Time from the request reaching Django to the response leaving it.',
+    SECONDS_BUCKETS,
+)
+db_queries = Histogram(
+    'http_request_db_queries',
+    'SQL queries run per request.',
+    QUERY_BUCKETS,
+)
+db_duration = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent executing SQL per request.',
+    SECONDS_BUCKETS,
+)
+render_duration = Histogram(
+    'http_request_render_duration_seconds',
+    'Time spent rendering the response body per request.',
+    SECONDS_BUCKETS,
+)
+serialize_duration = Histogram(
+    'http_request_serialize_duration_seconds',
+    'Time spent building response data per request, its queries included.',
+    SECONDS_BUCKETS,
+)
+
+HISTOGRAMS = (
+    request_duration,
+    db_queries,
+    db_duration,
+    render_duration,
+    serialize_duration,
+)
+
+
+def observe(view, duration, queries, db_time, render_time, serialize_time = 0.0):
+    """Record the costs of one request to view"""
+    request_duration.observe(view, duration)
+    db_queries.observe(view, queries)
+    db_duration.observe(view, db_time)
+    render_duration.observe(view, render_time)
+    serialize_duration.observe(view, serialize_time)
+
+
+def reset():
+    """Forget every observation"""
+    for histogram in HISTOGRAMS:
+        histogram.reset()
+
+
+def render():
+    """Return all metrics in the Prometheus text exposition format"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    lines.extend([
+        '# HELP token_auth_cache_lookups_total Token lookups by cache outcome.',
+        '# TYPE token_auth_cache_lookups_total counter',
+    ])
+    for result, count in sorted(token_cache_stats().items()):
+        lines.append(f'token_auth_cache_lookups_total{{result="{result}"}} {count}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,104 @@
+"""
+Middleware shared by the APIs
+"""
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.deprecation import MiddlewareMixin
+
+from core import metrics
+
+
+class QueryTimer:
+    """Database execute wrapper counting queries and the time they take"""
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.queries += 1
+
+
+@contextmanager
+def serialization_timer(request):
+    """Add the time spent in the block to the serialize time of request.
+
+    Does nothing unless MetricsMiddleware instruments the request.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        request = getattr(request, '_request', request)
+        if hasattr(request, '_metrics_serialize'):
+            request._metrics_serialize += time.perf_counter() - start
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """Record the latency, SQL queries, serialize and render time of every request.
+
+    Observations are labelled with the resolved view name and served by the
+    metrics view. Each response also gets a Server-Timing header. When
+    METRICS_ENABLED is off the middleware removes itself from the chain, so
+    it costs nothing. Queries are counted on the request's own connections.
+    ORM work the async views hand to pool threads is not included.
+    Serialization is timed where views use serialization_timer, and
+    streamed bodies serialized after the response leaves are not.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        request._metrics_start = time.perf_counter()
+        request._metrics_render = 0.0
+        request._metrics_serialize = 0.0
+        request._metrics_timer = timer = QueryTimer()
+        for conn in connections.all():
+            conn.execute_wrappers.append(timer)
+
+    def process_template_response(self, request, response):
+        def rendered(response):
+            request._metrics_render = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response.add_post_render_callback(rendered)
+        return response
+
+    def process_response(self, request, response):
+        timer = getattr(request, '_metrics_timer', None)
+        if timer is None:
+            return response
+        for conn in connections.all():
+            if timer in conn.execute_wrappers:
+                conn.execute_wrappers.remove(timer)
+
+        duration = time.perf_counter() - request._metrics_start
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.observe(
+            view,
+            duration,
+            timer.queries,
+            timer.duration,
+            request._metrics_render,
+            request._metrics_serialize,
+        )
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={timer.duration * 1000:.2f};desc="{timer.queries} queries"',
+            f'serialize;dur={request._metrics_serialize * 1000:.2f}',
+            f'render;dur={request._metrics_render * 1000:.2f}',
+            f'total;dur={duration * 1000:.2f}',
+        ])
+        return response
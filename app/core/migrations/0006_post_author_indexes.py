@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-17 02:56
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def dedupe_post_slugs(apps, schema_editor):
+    """Suffix repeated slugs with the post id so (user, slug) is unique."""
+    Post = apps.get_model('core', 'Post')
+    duplicates = (
+        Post.objects.values('user_id', 'slug')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for duplicate in duplicates:
+        posts = Post.objects.filter(
+            user_id=duplicate['user_id'],
+            slug=duplicate['slug'],
+        ).order_by('id')
+        for post in posts[1:]:
+            suffix = f'-{post.id}'
+            post.slug = post.slug[:255 - len(suffix)] + suffix
+            post.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_post_authors'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['user', 'name'], name='author_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['user', '-id'], name='post_user_id_idx'),
+        ),
+        migrations.RunPython(dedupe_post_slugs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='post',
+            constraint=models.UniqueConstraint(fields=('user', 'slug'), name='post_unique_user_slug'),
+        ),
+    ]
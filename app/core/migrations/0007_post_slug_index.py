@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_post_author_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='slug',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
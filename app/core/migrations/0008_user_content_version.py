@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-17 02:59
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_post_slug_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='content_modified_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='content_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-17 03:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_user_content_version'),
+    ]
+
+    # Existing posts are added with a null snapshot, which readers treat as
+    # missing, rather than an empty author list; new posts start empty.
+    # Build the snapshots with the rebuild_author_snapshots command.
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='authors_snapshot',
+            field=models.JSONField(editable=False, null=True),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='authors_snapshot',
+            field=models.JSONField(default=list, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+from core.authors import author_identity
+
+BATCH_SIZE = 1000
+
+
+def fill_identities(apps, schema_editor):
+    Author = apps.get_model('core', 'Author')
+    last_id = 0
+    while True:
+        authors = list(Author.objects.filter(id__gt = last_id).order_by('id')[:BATCH_SIZE])
+        if not authors:
+            return
+        for author in authors:
+            author.identity = author_identity(author.name, author.link)
+        Author.objects.bulk_update(authors, ['identity'])
+        last_id = authors[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_post_authors_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='identity',
+            field=models.CharField(default='', editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_identities, migrations.RunPython.noop),
+    ]
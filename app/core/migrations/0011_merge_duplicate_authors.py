@@ -0,0 +1,30 @@
+from django.db import migrations
+
+from core.authors import merge_duplicate_authors
+
+
+def merge_duplicates(apps, schema_editor):
+    Author = apps.get_model('core', 'Author')
+    Post = apps.get_model('core', 'Post')
+    PostAuthor = Post.authors.through
+
+    def forget_snapshots(post_ids):
+        # Readers fall back to the author tables; rebuild_author_snapshots
+        # fills them in again.
+        Post.objects.filter(id__in = post_ids).update(authors_snapshot = None)
+
+    merge_duplicate_authors(Author, PostAuthor, on_merge = forget_snapshots)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_author_identity'),
+    ]
+
+    # Merges the authors that would break the unique identity constraint.
+    # On a large table run 'migrate core 0010' and the batched
+    # merge_duplicate_authors command first; this then has nothing to do.
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
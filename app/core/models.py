@@ -1,15 +1,20 @@
 import profile
+import uuid
+
 from django.db import models
 
 # Create your models here.
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin
 )
 
+from core.authors import author_identity
+
 
 class UserManager(BaseUserManager):
     """Manager for users."""
@@ -34,6 +39,13 @@ class UserManager(BaseUserManager):
 
         return user
 
+    def bump_content_version(self, user_id):
+        """Mark the posts and authors of a user as changed."""
+        return self.filter(pk = user_id).update(
+            content_version = models.F('content_version') + 1,
+            content_modified_at = timezone.now(),
+        )
+
 class User(AbstractBaseUser, PermissionsMixin):
     """User in the system."""
 
@@ -43,6 +55,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_active  = models.BooleanField(default=True)
 
+    # Bumped whenever one of the user's posts or authors changes.
+    content_version = models.PositiveBigIntegerField(default=0)
+    content_modified_at = models.DateTimeField(default=timezone.now)
+
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
@@ -56,9 +72,23 @@ class Post(models.Model):
     title = models.CharField(max_length=255)
     description = models.CharField(max_length=255)
     img_description = models.URLField()
-    slug = models.CharField(max_length=255)
+    slug = models.CharField(max_length=255, db_index=True)
 
     authors = models.ManyToManyField('Author')
+    # The post's authors as serialized, kept in sync by post.snapshots so
+    # listings need no join. Null until first built for older posts.
+    authors_snapshot = models.JSONField(default = list, null = True, editable = False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields = ['user', '-id'], name = 'post_user_id_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields = ['user', 'slug'],
+                name = 'post_unique_user_slug',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -74,7 +104,58 @@ class Author(models.Model):
     link = models.URLField()
     profile_picture = models.URLField()
     description = models.CharField(max_length=255)
+    # Hash of the normalized name and link, unique per user (core.authors).
+    identity = models.CharField(max_length=64, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields = ['user', 'name'], name = 'author_user_name_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields = ['user', 'identity'],
+                name = 'author_unique_user_identity',
+            ),
+        ]
 
     def __str__(self):
         return self.name
- 
\ No newline at end of file
+
+    def save(self, *args, **kwargs):
+        """Save the author with its identity computed from name and link"""
+        self.identity = author_identity(self.name, self.link)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'identity'}
+        super().save(*args, **kwargs)
+ 
+
+
+class AccountDeletion(models.Model):
+    """Progress of the batched deletion of a user and their content."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Not a foreign key: the record outlives the user it reports on.
+    user_id = models.BigIntegerField(db_index=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    posts_total = models.PositiveIntegerField(default=0)
+    posts_deleted = models.PositiveIntegerField(default=0)
+    authors_total = models.PositiveIntegerField(default=0)
+    authors_deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'Deletion of user {self.user_id}: {self.status}'
@@ -0,0 +1,39 @@
+"""
+Renderers shared by the APIs
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    The output matches JSONRenderer: compact, UTF-8, with U+2028 and U+2029
+    escaped. Datetimes and any type orjson does not know are formatted by
+    DRF's encoder. Only NaN and infinity differ: they render as null instead
+    of raising. Indented output, as the browsable API asks for, and
+    installs without orjson use JSONRenderer itself.
+    """
+
+    def render(self, data, accepted_media_type = None, renderer_context = None):
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        ret = orjson.dumps(
+            data,
+            default = self.encoder_class().default,
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        # Escaped by JSONRenderer as well, for the benefit of JavaScript.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028')
+            ret = ret.replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,35 @@
+"""
+Signal handlers for core models.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import invalidate_token
+from core.models import Author, Post
+
+
+@receiver(post_save, sender = Post)
+@receiver(post_delete, sender = Post)
+@receiver(post_save, sender = Author)
+@receiver(post_delete, sender = Author)
+def bump_user_content_version(sender, instance, **kwargs):
+    """Invalidate the validators of the owner's post and author listings."""
+    get_user_model().objects.bump_content_version(instance.user_id)
+
+
+@receiver(post_save, sender = Token)
+@receiver(post_delete, sender = Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """Forget a token as soon as it is deleted or replaced."""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender = get_user_model())
+def invalidate_cached_user_tokens(sender, instance, created, **kwargs):
+    """Forget the tokens of a user whose state, e.g. is_active, changed."""
+    if created:
+        return
+    for key in Token.objects.filter(user = instance).values_list('key', flat = True):
+        invalidate_token(key)
@@ -0,0 +1,195 @@
+"""
+Tests for the cached token authentication
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import authentication
+
+ME_URL = reverse('user:me')
+POST_URL = reverse('post:post-list')
+
+
+def token_cache_settings(**options):
+    """Return TOKEN_AUTH_CACHE settings with options applied"""
+    defaults = {
+        'MAX_SIZE': 100,
+        'TTL': 30,
+        'SHARED_CACHE': '',
+        'SHARED_TTL': 300,
+    }
+    defaults.update(options)
+    return defaults
+
+
+@override_settings(TOKEN_AUTH_CACHE = token_cache_settings())
+class CachedTokenAuthenticationTests(TestCase):
+    """Test caching of token lookups"""
+
+    def setUp(self):
+        authentication.token_cache.clear()
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email = 'test@example.com',
+            password = 'testpassword123',
+            name = 'Test Name',
+        )
+        self.token = Token.objects.create(user = self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION = f'Token {self.token.key}')
+
+    def test_second_request_skips_token_query(self):
+        """Test a cached token is authenticated without a query"""
+        with self.assertNumQueries(1):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.wsgi_request.token_cache_result, 'miss')
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+        self.assertEqual(res.wsgi_request.token_cache_result, 'local')
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is still rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION = 'Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_invalidated(self):
+        """Test deleting a token stops it authenticating"""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_regenerated_token_invalidated(self):
+        """Test replacing a token stops the old key authenticating"""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.token.delete()
+            new_token = Token.objects.create(user = self.user)
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION = f'Token {new_token.key}')
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_inactive_user_invalidated(self):
+        """Test deactivating a user stops their cached token working"""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.user.is_active = False
+            self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_visible(self):
+        """Test updating the profile is reflected on the next request"""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.client.patch(ME_URL, {'name': 'New Name'})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['name'], 'New Name')
+
+    def test_profile_update_keeps_content_version(self):
+        """Test updating the cached user does not roll back its content version"""
+        res = self.client.get(POST_URL)
+        etag = res['ETag']
+        self.client.post(POST_URL, {
+            'title' : 'Post Title',
+            'description' : 'Post description',
+            'img_description' : 'http://placehold.it',
+            'slug' : 'post',
+        })
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.client.patch(ME_URL, {'name': 'New Name'})
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH = etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.content_version, 1)
+
+    def test_entries_expire(self):
+        """Test local entries are dropped after the TTL"""
+        self.client.get(ME_URL)
+
+        with patch('core.authentication.time.monotonic', return_value = 1e12):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.wsgi_request.token_cache_result, 'miss')
+
+    @override_settings(TOKEN_AUTH_CACHE = token_cache_settings(MAX_SIZE = 1))
+    def test_least_recently_used_evicted(self):
+        """Test the local tier keeps at most MAX_SIZE entries"""
+        other = get_user_model().objects.create_user(
+            email = 'other@example.com',
+            password = 'testpassword123',
+        )
+        other_client = APIClient()
+        other_client.credentials(
+            HTTP_AUTHORIZATION = f'Token {Token.objects.create(user = other).key}'
+        )
+        self.client.get(ME_URL)
+        other_client.get(ME_URL)
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.wsgi_request.token_cache_result, 'miss')
+
+    @override_settings(TOKEN_AUTH_CACHE = token_cache_settings(SHARED_CACHE = 'default'))
+    def test_shared_tier(self):
+        """Test another process can reuse a lookup through the shared tier"""
+        self.client.get(ME_URL)
+        authentication.token_cache.clear()
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.wsgi_request.token_cache_result, 'shared')
+
+    @override_settings(TOKEN_AUTH_CACHE = token_cache_settings(SHARED_CACHE = 'default'))
+    def test_shared_tier_invalidated(self):
+        """Test deleting a token also drops it from the shared tier"""
+        self.client.get(ME_URL)
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_stats_count_hits_and_misses(self):
+        """Test the process-wide counters track each lookup"""
+        before = authentication.token_cache_stats()
+
+        self.client.get(ME_URL)
+        self.client.get(ME_URL)
+        self.client.get(ME_URL)
+
+        after = authentication.token_cache_stats()
+        self.assertEqual(after['miss'] - before['miss'], 1)
+        self.assertEqual(after['local'] - before['local'], 2)
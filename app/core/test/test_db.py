@@ -0,0 +1,54 @@
+"""
+Tests for database connection setup
+"""
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core import db
+
+
+class SQLitePragmaTests(TestCase):
+    """Test new SQLite connections are tuned"""
+
+    def test_pragmas_applied(self):
+        """Test synchronous is relaxed to NORMAL on the connection"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class HealthCheckTests(SimpleTestCase):
+    """Test persistent connections are checked when a request starts"""
+
+    def run_check(self, usable, health_checks = True):
+        closed = []
+
+        class Connection:
+            alias = 'default'
+            connection = object()
+            in_atomic_block = False
+
+            def is_usable(self):
+                return usable
+
+            def close(self):
+                closed.append(self.alias)
+
+        with override_settings(DB_CONN_HEALTH_CHECKS = health_checks):
+            with patch.object(db.connections, 'all', return_value = [Connection()]):
+                db.check_connections()
+        return closed
+
+    def test_unusable_connection_closed(self):
+        """Test a dropped connection is closed before the request uses it"""
+        self.assertEqual(self.run_check(usable = False), ['default'])
+
+    def test_usable_connection_kept(self):
+        """Test a working connection is reused"""
+        self.assertEqual(self.run_check(usable = True), [])
+
+    def test_health_checks_disabled(self):
+        """Test connections are not pinged unless DB_CONN_HEALTH_CHECKS is set"""
+        self.assertEqual(self.run_check(usable = False, health_checks = False), [])
@@ -0,0 +1,146 @@
+"""
+Tests for password hashing
+"""
+import os
+import runpy
+import threading
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.hashers import HashingPool, HashingUnavailable
+
+TOKEN_URL = reverse('user:token')
+
+
+def hashing(**options):
+    """Return PASSWORD_HASHING with options changed"""
+    return {**settings.PASSWORD_HASHING, **options}
+
+
+@override_settings(PASSWORD_HASHING = hashing(PBKDF2_ITERATIONS = 1000))
+class RehashTests(TestCase):
+    """Test stored hashes follow the configured hasher and cost"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+
+    def login(self, password = 'testpassword123'):
+        return authenticate(username = 'user@example.com', password = password)
+
+    def stored_hash(self):
+        self.user.refresh_from_db()
+        return self.user.password
+
+    def test_hash_uses_configured_cost(self):
+        """Test new hashes use the configured iterations"""
+        self.assertTrue(self.stored_hash().startswith('pbkdf2_sha256$1000$'))
+
+    def test_rehash_on_cost_change(self):
+        """Test a login upgrades a hash made with an old cost"""
+        with override_settings(PASSWORD_HASHING = hashing(PBKDF2_ITERATIONS = 2000)):
+            self.assertEqual(self.login(), self.user)
+
+        self.assertTrue(self.stored_hash().startswith('pbkdf2_sha256$2000$'))
+
+    def test_wrong_password_keeps_hash(self):
+        """Test a failed login neither authenticates nor rehashes"""
+        with override_settings(PASSWORD_HASHING = hashing(PBKDF2_ITERATIONS = 2000)):
+            self.assertIsNone(self.login('wrongpassword'))
+
+        self.assertTrue(self.stored_hash().startswith('pbkdf2_sha256$1000$'))
+
+    @override_settings(PASSWORD_HASHERS = [
+        'core.hashers.BCryptSHA256PasswordHasher',
+        'core.hashers.PBKDF2PasswordHasher',
+    ])
+    def test_rehash_on_algorithm_change(self):
+        """Test a login moves the hash to the preferred algorithm"""
+        with override_settings(PASSWORD_HASHING = hashing(
+            PBKDF2_ITERATIONS = 1000,
+            BCRYPT_ROUNDS = 4,
+        )):
+            self.assertEqual(self.login(), self.user)
+
+        self.assertTrue(self.stored_hash().startswith('bcrypt_sha256$$2b$04$'))
+
+
+class HashingPoolTests(SimpleTestCase):
+    """Test the bounded hashing pool"""
+
+    @override_settings(PASSWORD_HASHING = hashing(WORKERS = 1, QUEUE_SIZE = 0))
+    def test_full_pool_rejects_work(self):
+        """Test work beyond the workers and queue is refused"""
+        pool = HashingPool()
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        # The only worker is busy and there is no room to queue.
+        thread = threading.Thread(target = pool.run, args = [block])
+        thread.start()
+        started.wait(5)
+        try:
+            with self.assertRaises(HashingUnavailable):
+                pool.run(lambda: None)
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(pool.run(lambda: 42), 42)
+
+    @override_settings(PASSWORD_HASHING = hashing(WORKERS = 0))
+    def test_inline_without_workers(self):
+        """Test hashing runs on the calling thread with no workers"""
+        self.assertEqual(
+            HashingPool().run(threading.current_thread),
+            threading.current_thread(),
+        )
+
+
+class LoginBackPressureTests(TestCase):
+    """Test logins are refused while the hashing pool is full"""
+
+    def test_token_unavailable_when_pool_full(self):
+        """Test the token endpoint answers 503 with Retry-After"""
+        get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+
+        with patch('core.backends.hashing_pool.run', side_effect = HashingUnavailable):
+            res = APIClient().post(TOKEN_URL, {
+                'email': 'user@example.com',
+                'password': 'testpassword123',
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res['Retry-After'], '1')
+
+
+class PasswordHasherSettingTests(SimpleTestCase):
+    """Test the PASSWORD_HASHER setting is checked"""
+
+    def test_unknown_hasher_rejected(self):
+        """Test an unknown hasher names the supported ones"""
+        path = os.path.join(settings.BASE_DIR, 'app', 'settings.py')
+
+        with patch.dict(os.environ, {'PASSWORD_HASHER': 'md5'}):
+            with self.assertRaisesMessage(
+                ImproperlyConfigured,
+                "Unknown PASSWORD_HASHER 'md5'; expected one of: pbkdf2, argon2, bcrypt.",
+            ):
+                runpy.run_path(path)
@@ -0,0 +1,86 @@
+"""
+Tests for request metrics
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import metrics
+
+METRICS_URL = reverse('metrics')
+POST_URL = reverse('post:post-list')
+
+
+class HistogramTests(SimpleTestCase):
+    """Test the Prometheus histogram"""
+
+    def test_render_cumulative_buckets(self):
+        """Test buckets are cumulative and sum and count are kept"""
+        histogram = metrics.Histogram('test_seconds', 'Test.', (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe('view', value)
+
+        self.assertEqual(histogram.render(), [
+            '# HELP test_seconds Test.',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{view="view",le="0.1"} 2',
+            'test_seconds_bucket{view="view",le="1.0"} 3',
+            'test_seconds_bucket{view="view",le="+Inf"} 4',
+            'test_seconds_sum{view="view"} 2.65',
+            'test_seconds_count{view="view"} 4',
+        ])
+
+
+class MetricsMiddlewareTests(TestCase):
+    """Test per-request instrumentation"""
+
+    def setUp(self):
+        metrics.reset()
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+
+    def make_client(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client
+
+    def test_disabled_by_default(self):
+        """Test nothing is recorded or exposed when metrics are off"""
+        client = self.make_client()
+
+        res = client.get(POST_URL)
+
+        self.assertNotIn('Server-Timing', res)
+        self.assertEqual(client.get(METRICS_URL).status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(METRICS_ENABLED = True)
+    def test_records_queries_per_view(self):
+        """Test the query count of a view is recorded and exposed"""
+        client = self.make_client()
+
+        with CaptureQueriesContext(connection) as queries:
+            res = client.get(POST_URL)
+        count = len(queries)
+
+        self.assertIn(f'desc="{count} queries"', res['Server-Timing'])
+        self.assertIn('render;dur=', res['Server-Timing'])
+        self.assertIn('serialize;dur=', res['Server-Timing'])
+        body = client.get(METRICS_URL).content.decode()
+        self.assertIn('http_request_db_queries_count{view="post:post-list"} 1', body)
+        self.assertIn(
+            f'http_request_db_queries_sum{{view="post:post-list"}} {count}',
+            body,
+        )
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn(
+            'http_request_serialize_duration_seconds_count{view="post:post-list"} 1',
+            body,
+        )
+        self.assertIn('token_auth_cache_lookups_total{result="miss"}', body)
@@ -0,0 +1,98 @@
+"""
+Tests for the orjson renderer and parser
+"""
+import datetime
+import decimal
+import io
+import uuid
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import parsers, renderers
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+
+PAYLOAD = {
+    'id': 1,
+    'title': 'Título con ñ y emoji 🚀',
+    'description': 'Line\u2028separator\u2029and "quotes"',
+    'img_description': 'http://placehold.it',
+    'slug': None,
+    'authors': [
+        {'id': 2, 'name': 'Ada', 'ratio': 0.1, 'active': True},
+    ],
+    'created': datetime.datetime(2021, 5, 4, 3, 2, 1, 123456, tzinfo = datetime.timezone.utc),
+    'day': datetime.date(2021, 5, 4),
+    'price': decimal.Decimal('1.50'),
+    'key': uuid.UUID('12345678123456781234567812345678'),
+}
+
+
+@skipIf(renderers.orjson is None, 'orjson is not installed')
+class ORJSONRendererTests(SimpleTestCase):
+    """Test the orjson renderer matches JSONRenderer"""
+
+    def test_same_bytes_as_json_renderer(self):
+        """Test a post payload renders to the same bytes"""
+        self.assertEqual(
+            ORJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+    def test_indent_uses_json_renderer(self):
+        """Test indented output is left to JSONRenderer"""
+        media_type = 'application/json; indent=4'
+
+        self.assertEqual(
+            ORJSONRenderer().render(PAYLOAD, media_type),
+            JSONRenderer().render(PAYLOAD, media_type),
+        )
+
+    def test_none_renders_empty(self):
+        """Test no data renders an empty body"""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+    def test_fallback_without_orjson(self):
+        """Test JSONRenderer is used when orjson is missing"""
+        with patch.object(renderers, 'orjson', None):
+            self.assertEqual(
+                ORJSONRenderer().render(PAYLOAD),
+                JSONRenderer().render(PAYLOAD),
+            )
+
+
+@skipIf(parsers.orjson is None, 'orjson is not installed')
+class ORJSONParserTests(SimpleTestCase):
+    """Test the orjson parser matches JSONParser"""
+
+    def parse(self, parser, body, encoding = 'utf-8'):
+        return parser.parse(io.BytesIO(body), parser_context = {'encoding': encoding})
+
+    def test_same_data_as_json_parser(self):
+        """Test a rendered payload parses back to the same data"""
+        body = JSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(
+            self.parse(ORJSONParser(), body),
+            self.parse(JSONParser(), body),
+        )
+
+    def test_invalid_json(self):
+        """Test malformed and non-standard JSON is rejected"""
+        for body in (b'{"title": ', b'{"ratio": NaN}'):
+            with self.assertRaises(ParseError):
+                self.parse(ORJSONParser(), body)
+
+    def test_other_encoding_uses_json_parser(self):
+        """Test bodies not in UTF-8 are left to JSONParser"""
+        body = '{"title": "Título"}'.encode('latin-1')
+
+        self.assertEqual(
+            self.parse(ORJSONParser(), body, 'latin-1'),
+            {'title': 'Título'},
+        )
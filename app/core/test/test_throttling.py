@@ -0,0 +1,215 @@
+"""
+Tests for the API throttles
+"""
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.throttling import CacheWindowStore, LocalBucketStore, get_store
+
+POST_URL = reverse('post:post-list')
+ASYNC_LIST_URL = reverse('post:async-post-list')
+TOKEN_URL = reverse('user:token')
+ASYNC_TOKEN_URL = reverse('user:async-token')
+
+LOCAL_STORE = {
+    'BACKEND': 'core.throttling.LocalBucketStore',
+    'CACHE': 'default',
+    'MAX_KEYS': 100,
+}
+CACHE_STORE = {**LOCAL_STORE, 'BACKEND': 'core.throttling.CacheWindowStore'}
+
+
+def throttle_rates(read = '2/min', write = '1/min', login = '2/min'):
+    """Return REST_FRAMEWORK with the given throttle rates"""
+    return {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'read': read, 'write': write, 'login': login},
+    }
+
+
+class LocalBucketStoreTests(SimpleTestCase):
+    """Test the in-process token buckets"""
+
+    def setUp(self):
+        self.store = LocalBucketStore(LOCAL_STORE)
+
+    @patch('core.throttling.time.monotonic', return_value = 100.0)
+    def test_bucket_refills_over_time(self, monotonic):
+        """Test an empty bucket gains a token per period / capacity"""
+        self.assertEqual(self.store.consume('key', 2, 60), (True, 0))
+        self.assertEqual(self.store.consume('key', 2, 60), (True, 0))
+        self.assertEqual(self.store.consume('key', 2, 60), (False, 30))
+
+        monotonic.return_value = 130.0
+        self.assertEqual(self.store.consume('key', 2, 60), (True, 0))
+        self.assertFalse(self.store.consume('key', 2, 60)[0])
+
+    def test_least_recently_used_dropped(self):
+        """Test buckets beyond MAX_KEYS are forgotten, oldest first"""
+        store = LocalBucketStore({**LOCAL_STORE, 'MAX_KEYS': 2})
+        for key in ('a', 'b', 'a', 'c'):
+            store.consume(key, 1, 60)
+
+        self.assertEqual(list(store._buckets), ['a', 'c'])
+
+
+class CacheWindowStoreTests(SimpleTestCase):
+    """Test the shared cache window counters"""
+
+    def setUp(self):
+        self.store = CacheWindowStore(CACHE_STORE)
+        self.store.clear()
+
+    @patch('core.throttling.time.time', return_value = 1000.0)
+    def test_counts_per_period(self, now):
+        """Test a client gets capacity requests per period"""
+        self.assertEqual(self.store.consume('key', 2, 60), (True, 0))
+        self.assertEqual(self.store.consume('key', 2, 60), (True, 0))
+        self.assertEqual(self.store.consume('key', 2, 60), (False, 20))
+
+        now.return_value = 1020.0
+        self.assertEqual(self.store.consume('key', 2, 60), (True, 0))
+
+    def test_clear_keeps_other_cache_entries(self):
+        """Test clearing drops the counters but not the rest of the cache"""
+        self.store.cache.set('other', 'kept')
+        self.store.consume('key', 1, 60)
+
+        self.store.clear()
+
+        self.assertEqual(self.store.cache.get('other'), 'kept')
+        self.assertTrue(self.store.consume('key', 1, 60)[0])
+
+    def test_single_round_trip_once_counting(self):
+        """Test a counted key costs one cache call per request"""
+        self.store.consume('key', 5, 60)
+
+        with patch.object(self.store.cache, 'add') as add:
+            with patch.object(
+                self.store.cache,
+                'incr',
+                wraps = self.store.cache.incr,
+            ) as incr:
+                self.store.consume('key', 5, 60)
+
+        add.assert_not_called()
+        self.assertEqual(incr.call_count, 1)
+
+
+@override_settings(
+    REST_FRAMEWORK = throttle_rates(),
+    THROTTLE_STORE = LOCAL_STORE,
+    ASYNC_ORM_THREAD_SENSITIVE = True,
+)
+class ThrottledApiTests(TestCase):
+    """Test the API enforces the read, write and login budgets"""
+
+    def setUp(self):
+        get_store().clear()
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+        self.client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        token = Token.objects.create(user = user)
+        client.credentials(HTTP_AUTHORIZATION = f'Token {token.key}')
+        return client
+
+    def test_read_budget(self):
+        """Test reads past the budget get 429 with Retry-After"""
+        for _ in range(2):
+            self.assertEqual(self.client.get(POST_URL).status_code, status.HTTP_200_OK)
+
+        res = self.client.get(POST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res['Retry-After'], '30')
+
+    def test_budgets_are_per_user(self):
+        """Test one user's reads leave another's budget alone"""
+        other = get_user_model().objects.create_user(
+            email = 'other@example.com',
+            password = 'testpassword123',
+        )
+        for _ in range(3):
+            self.client.get(POST_URL)
+
+        res = self.client_for(other).get(POST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_writes_have_own_budget(self):
+        """Test writes draw on the write budget, not the read budget"""
+        for _ in range(2):
+            self.client.get(POST_URL)
+
+        first = self.client.post(POST_URL, {})
+        second = self.client.post(POST_URL, {})
+
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_login_budget(self):
+        """Test token requests are limited per IP address"""
+        payload = {'email': 'user@example.com', 'password': 'wrongpassword'}
+        for _ in range(2):
+            self.client.post(TOKEN_URL, payload)
+
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_login_budget_ignores_forwarded_for(self):
+        """Test rotating X-Forwarded-For does not reset the login budget"""
+        payload = {'email': 'user@example.com', 'password': 'wrongpassword'}
+        for n in range(2):
+            self.client.post(TOKEN_URL, payload, HTTP_X_FORWARDED_FOR = f'10.0.0.{n}')
+
+        res = self.client.post(TOKEN_URL, payload, HTTP_X_FORWARDED_FOR = '10.0.0.9')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_async_views_share_budgets(self):
+        """Test the async views draw on the same budgets"""
+        self.client.get(POST_URL)
+        self.client.get(ASYNC_LIST_URL)
+        payload = {'email': 'user@example.com', 'password': 'wrongpassword'}
+        for _ in range(2):
+            self.client.post(TOKEN_URL, payload)
+
+        read = self.client.get(ASYNC_LIST_URL)
+        login = self.client.post(ASYNC_TOKEN_URL, payload, format = 'json')
+
+        self.assertEqual(read.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', read)
+        self.assertEqual(login.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(THROTTLE_STORE = CACHE_STORE)
+    def test_cache_store(self):
+        """Test the shared cache store enforces the budgets too"""
+        get_store().clear()
+        for _ in range(2):
+            self.client.get(POST_URL)
+
+        res = self.client.get(POST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK = throttle_rates(read = None))
+    def test_empty_rate_disables_budget(self):
+        """Test a scope without a rate is not throttled"""
+        for _ in range(3):
+            res = self.client.get(POST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
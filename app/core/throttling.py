@@ -0,0 +1,174 @@
+"""
+Throttles with a pluggable store.
+
+Each client gets one budget per scope, keyed by user when authenticated
+and by IP address otherwise. The store is named by
+THROTTLE_STORE['BACKEND']. LocalBucketStore keeps token buckets in process
+and suits a single node: a bucket holds up to N tokens for a rate of
+'N/period', refills at N per period, and every request takes a token.
+CacheWindowStore keeps fixed-window counters in a shared cache for a
+cluster, which the cache's atomic incr can keep without a lock.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class LocalBucketStore:
+    """Thread-safe in-process token buckets, least recently used dropped first"""
+
+    def __init__(self, options):
+        self.max_keys = options['MAX_KEYS']
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, period):
+        """Take a token; return whether one was left and the wait for the next"""
+        rate = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + max(now - updated, 0) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last = False)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheWindowStore:
+    """Fixed-window counters in a shared cache, one per client and period.
+
+    Not a token bucket: the counter for the current period is bumped with
+    the cache's atomic incr, one round trip per request, and only the first
+    request of a period also adds the key. A client gets N requests per
+    period, so up to 2N may pass around a period boundary, N at the end of
+    one window and N at the start of the next.
+    """
+
+    def __init__(self, options):
+        self.cache = caches[options['CACHE']]
+        self.max_keys = options['MAX_KEYS']
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, period):
+        """Count a request; return whether it is allowed and the wait for the next"""
+        now = time.time()
+        window = int(now // period)
+        window_key = f'{key}:{window}'
+        try:
+            count = self.cache.incr(window_key)
+        except ValueError:
+            if self.cache.add(window_key, 1, period + 1):
+                count = 1
+            else:
+                count = self.cache.incr(window_key)
+        with self._lock:
+            self._keys[window_key] = None
+            self._keys.move_to_end(window_key)
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last = False)
+        allowed = count <= capacity
+        return allowed, 0 if allowed else (window + 1) * period - now
+
+    def clear(self):
+        """Drop the counters this process used; the cache is shared, so only those"""
+        with self._lock:
+            keys = list(self._keys)
+            self._keys.clear()
+        self.cache.delete_many(keys)
+
+
+_store = None
+
+
+def get_store():
+    """Return the bucket store configured by THROTTLE_STORE"""
+    global _store
+    if _store is None:
+        options = settings.THROTTLE_STORE
+        _store = import_string(options['BACKEND'])(options)
+    return _store
+
+
+def _reset_store(setting, **kwargs):
+    global _store
+    if setting == 'THROTTLE_STORE':
+        _store = None
+
+
+setting_changed.connect(_reset_store)
+
+
+class BucketThrottle(SimpleRateThrottle):
+    """Throttle a scope with a token bucket per user or IP address"""
+
+    def __init__(self):
+        if getattr(self, 'scope', None):
+            super().__init__()
+
+    def get_rate(self):
+        # Read the rates per request so settings changes take effect.
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def get_cache_key(self, request, view):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            ident = f'user:{user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return f'throttle:{self.scope}:{ident}'
+
+    def allow_request(self, request, view):
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+        allowed, self.wait_time = get_store().consume(
+            self.get_cache_key(request, view),
+            self.num_requests,
+            self.duration,
+        )
+        return allowed
+
+    def wait(self):
+        return self.wait_time
+
+
+class ReadWriteThrottle(BucketThrottle):
+    """Budget safe methods under the read scope and the rest under write"""
+
+    def allow_request(self, request, view):
+        self.scope = 'read' if request.method in SAFE_METHODS else 'write'
+        return super().allow_request(request, view)
+
+
+class LoginThrottle(BucketThrottle):
+    """Budget login attempts per IP address"""
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return f'throttle:{self.scope}:ip:{self.get_ident(request)}'
+
+
+def check_throttle(throttle, request, view = None):
+    """Raise Throttled when throttle refuses request, as APIView does"""
+    if not throttle.allow_request(request, view):
+        raise Throttled(throttle.wait())
@@ -1,3 +1,19 @@
-from django.shortcuts import render
+"""
+Views for core services
+"""
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
 
-# Create your views here.
+from core import metrics as request_metrics
+
+
+@require_safe
+def metrics(request):
+    """Serve request metrics in the Prometheus text format"""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(
+        request_metrics.render(),
+        content_type = 'text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,36 @@
+"""
+Gunicorn settings for serving the API in production.
+
+Serves the ASGI application on uvicorn workers by default::
+
+    gunicorn -c gunicorn.conf.py app.asgi:application
+
+An async worker keeps a slow client's connection on its event loop instead
+of blocking the worker for the whole request. To serve WSGI instead, use
+threaded workers so a slow client only holds one thread::
+
+    GUNICORN_WORKER_CLASS=gthread gunicorn -c gunicorn.conf.py app.wsgi:application
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS',
+    multiprocessing.cpu_count() * 2 + 1,
+))
+worker_class = os.environ.get(
+    'GUNICORN_WORKER_CLASS',
+    'uvicorn.workers.UvicornWorker',
+)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then so slow leaks cannot build up.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
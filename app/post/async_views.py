@@ -0,0 +1,77 @@
+"""
+Async read views for posts, meant for the ASGI deployment
+"""
+from django.http import HttpResponseNotAllowed
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from core.async_utils import error_response, render_json, run_sync
+from core.authentication import CachedTokenAuthentication
+from core.middleware import serialization_timer
+from core.models import Post
+from core.throttling import ReadWriteThrottle, check_throttle
+from post.pagination import PostCursorPagination
+from post.serializers import (
+    PostSerializer,
+    authors_prefetch,
+    post_rows,
+    serialize_post_rows,
+)
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def _authenticate(request):
+    """Return the user owning the request's token, within their budget"""
+    result = CachedTokenAuthentication().authenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    request.user = result[0]
+    check_throttle(ReadWriteThrottle(), request)
+    return result[0]
+
+
+def _user_posts(user):
+    return Post.objects.filter(user = user).prefetch_related(authors_prefetch())
+
+
+def _list_page(request):
+    user = _authenticate(request)
+    paginator = PostCursorPagination()
+    rows = paginator.paginate_queryset(post_rows(_user_posts(user)), request)
+    with serialization_timer(request):
+        return paginator, serialize_post_rows(rows)
+
+
+def _get_post(request, pk):
+    post = _user_posts(_authenticate(request)).filter(pk = pk).first()
+    if post is None:
+        raise exceptions.NotFound()
+    return post
+
+
+async def post_list(request):
+    """List the authenticated user's posts"""
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    request = Request(request)
+    try:
+        paginator, data = await run_sync(_list_page, request)
+    except exceptions.APIException as exc:
+        return error_response(exc)
+    return render_json(paginator.get_paginated_response(data).data)
+
+
+async def post_detail(request, pk):
+    """Retrieve one of the authenticated user's posts"""
+    if request.method not in SAFE_METHODS:
+        return HttpResponseNotAllowed(SAFE_METHODS)
+    request = Request(request)
+    try:
+        post = await run_sync(_get_post, request, pk)
+    except exceptions.APIException as exc:
+        return error_response(exc)
+    # Authors are prefetched, so serializing needs no further queries.
+    with serialization_timer(request):
+        data = PostSerializer(post).data
+    return render_json(data)
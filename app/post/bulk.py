@@ -0,0 +1,118 @@
+"""
+Bulk write helpers for post APIs
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+
+from core.models import Post
+from post import search, snapshots
+from post.cache import invalidate_public_posts
+from post.serializers import author_key, authors_prefetch, resolve_authors
+
+PostAuthor = Post.authors.through
+
+
+def _author_pairs(user, author_groups):
+    """Return (post id, author id) pairs linking each post to its authors"""
+    authors = resolve_authors(
+        user,
+        [author for group in author_groups.values() for author in group],
+    )
+    pairs = {}
+    for post_id, group in author_groups.items():
+        pairs.update(
+            ((post_id, authors[author_key(author)].id), None) for author in group
+        )
+    return list(pairs)
+
+
+def _author_links(user, author_groups):
+    """Return through rows linking each post id to its resolved authors"""
+    return [
+        PostAuthor(post_id = post_id, author_id = author_id)
+        for post_id, author_id in _author_pairs(user, author_groups)
+    ]
+
+
+def _replace_author_links(user, author_groups):
+    """Make each post's links match its authors, writing only the delta"""
+    wanted = set(_author_pairs(user, author_groups))
+    current = {
+        (post_id, author_id): link_id
+        for link_id, post_id, author_id in PostAuthor.objects.filter(
+            post_id__in = author_groups,
+        ).values_list('id', 'post_id', 'author_id')
+    }
+    stale = [link_id for pair, link_id in current.items() if pair not in wanted]
+    if stale:
+        PostAuthor.objects.filter(id__in = stale).delete()
+    PostAuthor.objects.bulk_create([
+        PostAuthor(post_id = post_id, author_id = author_id)
+        for post_id, author_id in sorted(wanted.difference(current))
+    ])
+
+
+def load_posts(ids):
+    """Return the posts with ids, in the same order, with their authors"""
+    posts = Post.objects.filter(id__in = ids).prefetch_related(authors_prefetch()).in_bulk()
+    return [posts[post_id] for post_id in ids]
+
+
+@transaction.atomic
+def create_posts(user, items):
+    """Create posts for validated items and return them in item order"""
+    author_groups = [item.pop('authors', []) for item in items]
+    posts = Post.objects.bulk_create([Post(user = user, **item) for item in items])
+    if not connection.features.can_return_rows_from_bulk_insert:
+        # Slugs are unique per user, so they identify the new rows.
+        ids = dict(Post.objects.filter(
+            user = user,
+            slug__in = [post.slug for post in posts],
+        ).values_list('slug', 'id'))
+        for post in posts:
+            post.id = ids[post.slug]
+
+    author_groups = {
+        post.id: group for post, group in zip(posts, author_groups) if group
+    }
+    PostAuthor.objects.bulk_create(_author_links(user, author_groups))
+    snapshots.refresh_snapshots(author_groups)
+    search.index_posts(post.id for post in posts)
+    get_user_model().objects.bump_content_version(user.pk)
+    invalidate_public_posts(post.slug for post in posts)
+    return load_posts([post.id for post in posts])
+
+
+@transaction.atomic
+def update_posts(user, posts, items):
+    """Apply validated partial items to posts and return them refreshed"""
+    slugs = [post.slug for post in posts]
+    fields = set()
+    author_groups = {}
+    for post, item in zip(posts, items):
+        authors = item.pop('authors', None)
+        if authors is not None:
+            author_groups[post.id] = authors
+        for attr, value in item.items():
+            setattr(post, attr, value)
+            fields.add(attr)
+
+    if fields:
+        Post.objects.bulk_update(posts, fields)
+    if author_groups:
+        _replace_author_links(user, author_groups)
+        snapshots.refresh_snapshots(author_groups)
+    search.index_posts(post.id for post in posts)
+    get_user_model().objects.bump_content_version(user.pk)
+    invalidate_public_posts(slugs + [post.slug for post in posts])
+    return load_posts([post.id for post in posts])
+
+
+@transaction.atomic
+def delete_posts(user, ids):
+    """Delete the user's posts with ids and return the ids deleted"""
+    posts = Post.objects.filter(user = user, id__in = ids)
+    deleted = dict(posts.values_list('id', 'slug'))
+    posts.delete()
+    invalidate_public_posts(deleted.values())
+    return set(deleted)
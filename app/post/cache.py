@@ -0,0 +1,20 @@
+"""
+Cache helpers for public posts
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def public_post_key(slug):
+    """Return the cache key holding the public payload of a slug"""
+    digest = hashlib.sha1(slug.encode('utf-8')).hexdigest()
+    return f'post:public:{digest}'
+
+
+def invalidate_public_posts(slugs):
+    """Drop the cached payloads of slugs once the transaction commits"""
+    keys = [public_post_key(slug) for slug in set(slugs)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,43 @@
+"""
+Check the denormalized author snapshots of every post against the author tables
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from post import snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        'Report posts whose authors_snapshot is missing or differs from their '
+        'authors, and optionally rebuild them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type = int, default = snapshots.BATCH_SIZE)
+        parser.add_argument(
+            '--fix',
+            action = 'store_true',
+            help = 'rebuild the snapshots found stale',
+        )
+
+    def handle(self, *args, batch_size, fix, **options):
+        stale = []
+        for batch in snapshots.post_id_batches(batch_size):
+            with transaction.atomic():
+                found = snapshots.stale_snapshots(batch)
+                if fix and found:
+                    snapshots.refresh_snapshots(found, batch_size)
+            stale.extend(found)
+
+        if not stale:
+            self.stdout.write(self.style.SUCCESS('All author snapshots are consistent.'))
+            return
+        shown = ', '.join(str(post_id) for post_id in stale[:20])
+        more = f' and {len(stale) - 20} more' if len(stale) > 20 else ''
+        if fix:
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt {len(stale)} stale author snapshots: {shown}{more}.'
+            ))
+            return
+        raise CommandError(f'{len(stale)} stale author snapshots: {shown}{more}.')
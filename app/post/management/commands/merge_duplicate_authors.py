@@ -0,0 +1,37 @@
+"""
+Merge each user's authors that share a name and link
+"""
+from django.core.management.base import BaseCommand
+
+from core.authors import merge_duplicate_authors
+from core.models import Author, Post
+from post import search, snapshots
+from post.cache import invalidate_public_posts
+
+
+def refresh_merged_posts(post_ids):
+    """Rebuild what the merge bypassed for the posts whose links changed"""
+    snapshots.refresh_snapshots(post_ids)
+    search.index_posts(post_ids)
+    invalidate_public_posts(
+        Post.objects.filter(id__in = post_ids).values_list('slug', flat = True)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Merge duplicate authors into the oldest of each user\'s name and link, '
+        'rewriting their post links batch by batch.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type = int, default = 500)
+
+    def handle(self, *args, batch_size, **options):
+        merged = merge_duplicate_authors(
+            Author,
+            Post.authors.through,
+            batch_size,
+            on_merge = refresh_merged_posts,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Merged {merged} duplicate authors.'))
@@ -0,0 +1,32 @@
+"""
+Rebuild the denormalized author snapshots of every post
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Post
+from post import snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuild Post.authors_snapshot from the author tables, batch by batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type = int, default = snapshots.BATCH_SIZE)
+        parser.add_argument(
+            '--missing',
+            action = 'store_true',
+            help = 'only build snapshots that were never built',
+        )
+
+    def handle(self, *args, batch_size, missing, **options):
+        queryset = Post.objects.all()
+        if missing:
+            queryset = queryset.filter(authors_snapshot__isnull = True)
+        rebuilt = 0
+        for batch in snapshots.post_id_batches(batch_size, queryset):
+            # Each batch commits on its own, so the tables are never locked long.
+            with transaction.atomic():
+                snapshots.refresh_snapshots(batch, batch_size)
+            rebuilt += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} author snapshots.'))
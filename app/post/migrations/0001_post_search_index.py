@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from post.search import get_backend
+
+
+def create_search_index(apps, schema_editor):
+    backend = get_backend(schema_editor.connection.vendor)
+    with schema_editor.connection.cursor() as cursor:
+        backend.create_schema(cursor)
+        backend.rebuild(cursor)
+
+
+def drop_search_index(apps, schema_editor):
+    backend = get_backend(schema_editor.connection.vendor)
+    with schema_editor.connection.cursor() as cursor:
+        backend.drop_schema(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_user_content_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
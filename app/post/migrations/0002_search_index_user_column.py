@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from post.search import get_backend
+
+
+def index_user_column(apps, schema_editor):
+    # The FTS5 table kept user_id UNINDEXED; columns cannot be altered, so
+    # the table is created again and filled from the posts.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    backend = get_backend('sqlite')
+    with schema_editor.connection.cursor() as cursor:
+        backend.drop_schema(cursor)
+        backend.create_schema(cursor)
+        backend.rebuild(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0001_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_user_column, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+"""
+Mixins for post API views
+"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """Answer list and detail requests with 304 when nothing changed.
+
+    Validators come from the user's content version, which is bumped on
+    every write to their posts or authors, so a matching If-None-Match is
+    answered before the queryset is evaluated or anything is serialized.
+    """
+
+    def get_validators(self, request):
+        """Return the ETag and Last-Modified timestamp for the request"""
+        version, modified_at = get_user_model().objects.filter(
+            pk = request.user.pk
+        ).values_list('content_version', 'content_modified_at').get()
+        raw = ':'.join([
+            str(request.user.pk),
+            str(version),
+            request.get_full_path(),
+            request.accepted_media_type or '',
+        ])
+        etag = quote_etag(hashlib.sha1(raw.encode('utf-8')).hexdigest())
+        return etag, int(modified_at.timestamp())
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Run handler unless the client already has the current content"""
+        etag, last_modified = self.get_validators(request)
+        response = get_conditional_response(
+            request,
+            etag = etag,
+            last_modified = last_modified,
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,175 @@
+"""
+Pagination classes for post APIs
+"""
+import json
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    Cursor,
+    CursorPagination,
+    _reverse_ordering,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class BaseCursorPagination(CursorPagination):
+    """Keyset pagination with a client page size capped by the server"""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class PostCursorPagination(BaseCursorPagination):
+    """Paginate posts newest first"""
+    ordering = '-id'
+
+
+class KeysetCursorPagination(BaseCursorPagination):
+    """Keyset pagination seeking on every field of a unique ordering.
+
+    CursorPagination seeks on the first ordering field alone and skips
+    rows sharing its value with an offset, which grows with the ties. The
+    cursor here holds the values of all the ordering fields, so each page
+    is a range filter and no rows are skipped, however many share a value.
+    """
+
+    def _get_position_from_instance(self, instance, ordering):
+        fields = [field.lstrip('-') for field in ordering]
+        if isinstance(instance, dict):
+            return json.dumps([instance[field] for field in fields])
+        return json.dumps([getattr(instance, field) for field in fields])
+
+    def _seek(self, position, reverse):
+        """Return the filter for the rows after position in the ordering"""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            values = None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        fields = [field.lstrip('-') for field in self.ordering]
+        clauses = []
+        for n, order in enumerate(self.ordering):
+            lookup = 'lt' if order.startswith('-') != reverse else 'gt'
+            clauses.append(Q(
+                **dict(zip(fields[:n], values[:n])),
+                **{f'{fields[n]}__{lookup}': values[n]},
+            ))
+        return reduce(or_, clauses)
+
+    def paginate_queryset(self, queryset, request, view = None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor is not None else None
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _link(self, instance, reverse):
+        if instance is None:
+            # An empty page keeps the position it was asked from.
+            position = self.cursor.position
+        else:
+            position = self._get_position_from_instance(instance, self.ordering)
+        return self.encode_cursor(Cursor(offset = 0, reverse = reverse, position = position))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._link(self.page[-1] if self.page else None, reverse = False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._link(self.page[0] if self.page else None, reverse = True)
+
+
+class AuthorCursorPagination(KeysetCursorPagination):
+    """Paginate authors by name, seeking on the name and id together"""
+    ordering = ('-name', 'id')
+
+
+class SearchPagination(BasePagination):
+    """Page through ranked search results.
+
+    Ranked results have no stable key to seek on, so pages are numbered and
+    the offset is applied inside the full-text index rather than to posts.
+    """
+    page_size = BaseCursorPagination.page_size
+    page_size_query_param = BaseCursorPagination.page_size_query_param
+    max_page_size = BaseCursorPagination.max_page_size
+    page_query_param = 'page'
+
+    def _positive_int(self, request, name, default, cutoff = None):
+        try:
+            value = int(request.query_params[name])
+        except (KeyError, ValueError):
+            return default
+        if value < 1:
+            return default
+        return min(value, cutoff) if cutoff else value
+
+    def paginate_search(self, search, request):
+        """Return one page of ids from search(limit, offset)"""
+        self.request = request
+        self.page_size = self._positive_int(
+            request,
+            self.page_size_query_param,
+            self.page_size,
+            self.max_page_size,
+        )
+        self.page = self._positive_int(request, self.page_query_param, 1)
+        ids = search(self.page_size + 1, (self.page - 1) * self.page_size)
+        self.has_next = len(ids) > self.page_size
+        return ids[:self.page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page + 1)
+
+    def get_previous_link(self):
+        if self.page == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page - 1)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
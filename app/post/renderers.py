@@ -0,0 +1,19 @@
+"""
+Renderers for post APIs
+"""
+from core.renderers import ORJSONRenderer
+
+
+class NDJSONRenderer(ORJSONRenderer):
+    """Render a list as newline-delimited JSON, one object per line"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type = None, renderer_context = None):
+        if not isinstance(data, list):
+            data = [data]
+        return b''.join(self.render_line(item) for item in data)
+
+    def render_line(self, item):
+        """Render a single object followed by a newline"""
+        return super().render(item) + b'\n'
@@ -0,0 +1,224 @@
+"""
+Full-text search over posts.
+
+Each post has one search document holding its title, description and author
+names. On SQLite the documents live in an FTS5 virtual table; on PostgreSQL
+in a table of tsvectors with a GIN index. Other backends fall back to
+icontains lookups. Documents are kept in sync by the handlers in
+post.signals, and by the bulk helpers, which bypass model signals.
+"""
+import re
+from itertools import islice
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+
+from core.models import Author, Post
+
+TABLE = 'post_search_index'
+
+# Posts indexed per statement by index_posts.
+INDEX_BATCH_SIZE = 500
+
+
+def _tables():
+    """Return the quoted table names used by the document query"""
+    quote = connection.ops.quote_name
+    return {
+        'index': quote(TABLE),
+        'post': quote(Post._meta.db_table),
+        'author': quote(Author._meta.db_table),
+        'post_author': quote(Post.authors.through._meta.db_table),
+    }
+
+
+class SQLiteSearchBackend:
+    """FTS5 documents keyed by post id, ranked with bm25.
+
+    The user id is an indexed column, so the MATCH itself narrows the
+    documents to one user's instead of filtering every user's matches.
+    """
+
+    def create_schema(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE {TABLE} USING fts5('
+            'title, description, authors, user_id, '
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def drop_schema(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+    def index_sql(self, where):
+        return (
+            'REPLACE INTO {index} (rowid, user_id, title, description, authors) '
+            'SELECT p.id, p.user_id, p.title, p.description, '
+            "(SELECT group_concat(a.name, ' ') FROM {post_author} pa "
+            'JOIN {author} a ON a.id = pa.author_id WHERE pa.post_id = p.id) '
+            'FROM {post} p ' + where
+        ).format(**_tables())
+
+    def index(self, cursor, post_ids):
+        cursor.executemany(
+            self.index_sql('WHERE p.id = %s'),
+            [[post_id] for post_id in post_ids],
+        )
+
+    def rebuild(self, cursor):
+        cursor.execute(f'DELETE FROM {TABLE}')
+        cursor.execute(self.index_sql(''))
+
+    def remove(self, cursor, post_ids):
+        cursor.executemany(
+            f'DELETE FROM {TABLE} WHERE rowid = %s',
+            [[post_id] for post_id in post_ids],
+        )
+
+    def match_expression(self, query, user_id):
+        """Turn free text into an FTS5 query of the user matching every word prefix"""
+        words = re.findall(r'\w+', query)
+        if not words:
+            return ''
+        terms = ' '.join(f'"{word}"*' for word in words)
+        return f'user_id : "{int(user_id)}" AND {{title description authors}} : ({terms})'
+
+    def search(self, cursor, user_id, query, limit, offset):
+        expression = self.match_expression(query, user_id)
+        if not expression:
+            return []
+        cursor.execute(
+            f'SELECT rowid FROM {TABLE} '
+            f'WHERE {TABLE} MATCH %s '
+            f'ORDER BY bm25({TABLE}, 3.0, 1.0, 2.0, 0.0), rowid DESC '
+            'LIMIT %s OFFSET %s',
+            [expression, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    """Weighted tsvector documents with a GIN index, ranked with ts_rank"""
+
+    def create_schema(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE {TABLE} ('
+            'post_id bigint PRIMARY KEY, '
+            'user_id bigint NOT NULL, '
+            'document tsvector NOT NULL)'
+        )
+        cursor.execute(
+            f'CREATE INDEX {TABLE}_document ON {TABLE} USING GIN (document)'
+        )
+        cursor.execute(f'CREATE INDEX {TABLE}_user ON {TABLE} (user_id)')
+
+    def drop_schema(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+    def index_sql(self, where):
+        return (
+            'INSERT INTO {index} (post_id, user_id, document) '
+            'SELECT p.id, p.user_id, '
+            "setweight(to_tsvector('english', p.title), 'A') || "
+            "setweight(to_tsvector('english', coalesce(("
+            "SELECT string_agg(a.name, ' ') FROM {post_author} pa "
+            'JOIN {author} a ON a.id = pa.author_id WHERE pa.post_id = p.id'
+            "), '')), 'B') || "
+            "setweight(to_tsvector('english', p.description), 'C') "
+            'FROM {post} p ' + where + ' '
+            'ON CONFLICT (post_id) DO UPDATE SET '
+            'user_id = EXCLUDED.user_id, document = EXCLUDED.document'
+        ).format(**_tables())
+
+    def index(self, cursor, post_ids):
+        cursor.execute(self.index_sql('WHERE p.id = ANY(%s)'), [list(post_ids)])
+
+    def rebuild(self, cursor):
+        cursor.execute(f'TRUNCATE {TABLE}')
+        cursor.execute(self.index_sql(''))
+
+    def remove(self, cursor, post_ids):
+        cursor.execute(
+            f'DELETE FROM {TABLE} WHERE post_id = ANY(%s)',
+            [list(post_ids)],
+        )
+
+    def search(self, cursor, user_id, query, limit, offset):
+        cursor.execute(
+            f'SELECT post_id FROM {TABLE}, '
+            "plainto_tsquery('english', %s) query "
+            'WHERE user_id = %s AND document @@ query '
+            'ORDER BY ts_rank(document, query) DESC, post_id DESC '
+            'LIMIT %s OFFSET %s',
+            [query, user_id, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+class FallbackSearchBackend:
+    """Unindexed icontains matching for backends without full-text search"""
+
+    def create_schema(self, cursor):
+        pass
+
+    drop_schema = rebuild = create_schema
+
+    def index(self, cursor, post_ids):
+        pass
+
+    remove = index
+
+    def search(self, cursor, user_id, query, limit, offset):
+        posts = Post.objects.filter(user_id = user_id)
+        for word in re.findall(r'\w+', query):
+            posts = posts.filter(
+                Q(title__icontains = word)
+                | Q(description__icontains = word)
+                | Q(authors__name__icontains = word)
+            )
+        ids = posts.order_by('-id').values_list('id', flat = True).distinct()
+        return list(ids[offset:offset + limit])
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_backend(vendor = None):
+    """Return the search backend for a database vendor"""
+    return BACKENDS.get(vendor or connection.vendor, FallbackSearchBackend)()
+
+
+def _batches(post_ids, batch_size):
+    """Yield lists of at most batch_size of post_ids, streaming querysets"""
+    if isinstance(post_ids, QuerySet):
+        post_ids = post_ids.iterator(chunk_size = batch_size)
+    post_ids = iter(post_ids)
+    while True:
+        batch = list(islice(post_ids, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def index_posts(post_ids, batch_size = INDEX_BATCH_SIZE):
+    """Rebuild the search documents of posts, batch_size posts at a time"""
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        for batch in _batches(post_ids, batch_size):
+            backend.index(cursor, batch)
+
+
+def remove_posts(post_ids, batch_size = INDEX_BATCH_SIZE):
+    """Drop the search documents of deleted posts, batch_size posts at a time"""
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        for batch in _batches(post_ids, batch_size):
+            backend.remove(cursor, batch)
+
+
+def search_post_ids(user, query, limit, offset = 0):
+    """Return ids of the user's posts matching query, best match first"""
+    with connection.cursor() as cursor:
+        return get_backend().search(cursor, user.pk, query, limit, offset)
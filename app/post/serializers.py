@@ -1,8 +1,94 @@
 """
 Serializers for post APIs
 """
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch
 from rest_framework import serializers
+from core.authors import author_identity
 from core.models import Post, Author
+from post.cache import invalidate_public_posts
+
+AUTHOR_FIELDS = ('name', 'link', 'profile_picture', 'description')
+
+
+def author_key(author):
+    """Return the identity of an author payload or instance"""
+    if isinstance(author, Author):
+        return author_identity(author.name, author.link)
+    return author_identity(author.get('name'), author.get('link'))
+
+
+def resolve_authors(user, authors):
+    """Map each author payload key to the user's author with that identity.
+
+    Existing authors are loaded with one query and missing ones are inserted
+    with a single bulk_create, regardless of how many authors are given.
+    An existing author whose other fields differ from its payload is
+    updated in place, for the fields the payload has; the last payload of
+    an identity wins.
+    """
+    if any(not author.get('name') or not author.get('link') for author in authors):
+        # Partial updates skip the nested required fields; these two are
+        # what identifies an author.
+        raise serializers.ValidationError(
+            {'authors': ['Each author needs a name and a link.']}
+        )
+    payloads = {author_key(author): author for author in authors}
+    if not payloads:
+        return {}
+
+    def lookup(keys):
+        return {
+            author.identity: author
+            for author in Author.objects.filter(user = user, identity__in = keys)
+        }
+
+    found = lookup(payloads)
+    for key, author in found.items():
+        # Fields left out of a partial payload keep their stored value.
+        changed = [
+            field for field in AUTHOR_FIELDS
+            if field in payloads[key] and getattr(author, field) != payloads[key][field]
+        ]
+        if changed:
+            for field in changed:
+                setattr(author, field, payloads[key].get(field))
+            author.save(update_fields = changed)
+            invalidate_public_posts(author.post_set.values_list('slug', flat = True))
+
+    missing = [key for key in payloads if key not in found]
+    if missing:
+        # A concurrent request may insert the same identity first; the
+        # unique constraint keeps one row and the lookup finds it.
+        Author.objects.bulk_create(
+            [
+                Author(
+                    user = user,
+                    identity = key,
+                    **{
+                        field: payloads[key].get(
+                            field,
+                            Author._meta.get_field(field).get_default(),
+                        )
+                        for field in AUTHOR_FIELDS
+                    },
+                )
+                for key in missing
+            ],
+            ignore_conflicts = True,
+        )
+        found.update(lookup(missing))
+
+    unwritten = [payloads[key]['name'] for key in payloads if key not in found]
+    if unwritten:
+        raise serializers.ValidationError(
+            {'authors': [f'Could not save author: {", ".join(unwritten)}.']}
+        )
+    return {key: found[key] for key in payloads}
+
 
 class AuthorSerializer(serializers.ModelSerializer):
     """Serializer for authors"""
@@ -18,6 +104,40 @@ class AuthorSerializer(serializers.ModelSerializer):
             ]
         read_only_fields = ['id']
 
+    def validate(self, attrs):
+        """Check the name and link do not match another author of the user"""
+        if self.parent is not None:
+            # Nested authors are matched to existing ones by identity.
+            return attrs
+        identity = author_key({
+            'name': attrs.get('name', getattr(self.instance, 'name', None)),
+            'link': attrs.get('link', getattr(self.instance, 'link', None)),
+        })
+        authors = Author.objects.filter(
+            user = self.context['request'].user,
+            identity = identity,
+        )
+        if self.instance is not None:
+            authors = authors.exclude(pk = self.instance.pk)
+        if authors.exists():
+            raise serializers.ValidationError(
+                'You already have an author with this name and link.'
+            )
+        return attrs
+
+
+class AuthorCountSerializer(AuthorSerializer):
+    """Serializer for authors annotated with their post counts"""
+    post_count = serializers.IntegerField(read_only = True)
+    last_post_id = serializers.IntegerField(read_only = True, allow_null = True)
+
+    class Meta(AuthorSerializer.Meta):
+        fields = AuthorSerializer.Meta.fields + ['post_count', 'last_post_id']
+        read_only_fields = AuthorSerializer.Meta.read_only_fields + [
+            'post_count',
+            'last_post_id',
+        ]
+
 class PostSerializer(serializers.ModelSerializer):
     """Serializer for post"""
 
@@ -28,35 +148,248 @@ class PostSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'description', 'img_description','slug', 'authors']
         read_only_fields = ['id']
 
+    def validate_slug(self, value):
+        """Check the slug is not used by another post of the user"""
+        posts = Post.objects.filter(
+            user = self.context['request'].user,
+            slug = value,
+        )
+        if self.instance is not None:
+            posts = posts.exclude(pk = self.instance.pk)
+        if posts.exists():
+            raise serializers.ValidationError(
+                'You already have a post with this slug.'
+            )
+        return value
+
     def _get_or_create_authors(self, authors, post):
         """Handle getting or creating authors as needed"""
         auth_user = self.context['request'].user
-        for author in authors:
-            author_obj, created = Author.objects.get_or_create(
-                user = auth_user,
-                **author
-            )
-            post.authors.add(author_obj)
-    
+        author_objs = resolve_authors(auth_user, authors)
+        if author_objs:
+            post.authors.add(*author_objs.values())
+
+    def _set_authors(self, authors, post):
+        """Link post to exactly the given authors.
+
+        set() diffs against the current links, so only added and removed
+        authors are written and an unchanged list writes nothing.
+        """
+        auth_user = self.context['request'].user
+        post.authors.set(resolve_authors(auth_user, authors).values())
+
+    @transaction.atomic
     def create(self, validated_data):
         """Create a new post"""
         authors = validated_data.pop('authors',[])
         post = Post.objects.create(**validated_data)
 
         self._get_or_create_authors(authors, post)
+        invalidate_public_posts([post.slug])
 
         return post
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update a post"""
 
         authors = validated_data.pop('authors',None)
+        invalidate_public_posts([instance.slug, validated_data.get('slug', instance.slug)])
         if authors is not None:
-            instance.authors.clear()
-            self._get_or_create_authors(authors, instance)
+            self._set_authors(authors, instance)
         
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         
-        instance.save()
-        return instance
\ No newline at end of file
+        # The snapshot belongs to post.snapshots, and resolving the authors
+        # may have refreshed it in the database since instance was loaded.
+        instance.save(update_fields = [
+            field.name for field in Post._meta.concrete_fields
+            if not field.primary_key and field.name != 'authors_snapshot'
+        ])
+        return instance
+
+
+def authors_prefetch():
+    """Return the authors prefetch used wherever posts are serialized.
+
+    Authors are ordered by id so every read path renders them alike.
+    """
+    return Prefetch('authors', queryset = Author.objects.order_by('id'))
+
+
+POST_FIELDS = PostSerializer.Meta.fields
+POST_ROW_FIELDS = [field for field in POST_FIELDS if field != 'authors']
+POST_EXPANSIONS = ['authors']
+
+
+def _split(value):
+    return {part.strip() for part in value.split(',') if part.strip()}
+
+
+def query_flag(query_params, name):
+    """Return whether the boolean query parameter name is set"""
+    value = query_params.get(name, '').strip().lower()
+    if value in ('1', 'true', 'yes'):
+        return True
+    if value in ('', '0', 'false', 'no'):
+        return False
+    raise serializers.ValidationError({name: ['Expected 1 or 0.']})
+
+
+# Largest id a 64-bit integer column holds.
+MAX_ID = 2 ** 63 - 1
+
+
+def query_ids(query_params, name, limit = 100):
+    """Return the ids of the comma-separated query parameter name, if given"""
+    if name not in query_params:
+        return None
+    parts = _split(query_params[name])
+    # isdigit() alone also accepts digits like '²' that int() rejects.
+    if not parts or not all(
+        part.isascii() and part.isdigit() and int(part) <= MAX_ID
+        for part in parts
+    ):
+        raise serializers.ValidationError(
+            {name: ['Expected a comma-separated list of ids.']}
+        )
+    if len(parts) > limit:
+        raise serializers.ValidationError({name: [f'At most {limit} ids are allowed.']})
+    return sorted(int(part) for part in parts)
+
+
+def post_fieldset(query_params):
+    """Return the post fields and whether authors are expanded for a request.
+
+    ?fields=id,title narrows posts to the listed fields. A listed authors
+    field holds author ids unless ?expand=authors asks for full authors,
+    which also adds the field. Without ?fields posts are rendered whole.
+    """
+    expand = _split(query_params.get('expand', ''))
+    unknown = expand.difference(POST_EXPANSIONS)
+    if unknown:
+        raise serializers.ValidationError(
+            {'expand': [f'Unknown expansion: {", ".join(sorted(unknown))}.']}
+        )
+    if 'fields' not in query_params:
+        return POST_FIELDS, True
+
+    fields = _split(query_params['fields'])
+    if not fields:
+        raise serializers.ValidationError(
+            {'fields': ['Expected a comma-separated list of fields.']}
+        )
+    unknown = fields.difference(POST_FIELDS)
+    if unknown:
+        raise serializers.ValidationError(
+            {'fields': [f'Unknown field: {", ".join(sorted(unknown))}.']}
+        )
+    fields.update(expand)
+    return [field for field in POST_FIELDS if field in fields], 'authors' in expand
+
+
+def post_rows(queryset, fields = POST_FIELDS):
+    """Return queryset as the value rows serialize_post_rows expects.
+
+    Only the columns of fields are selected, plus the id, and the authors
+    snapshot when authors are wanted and POST_AUTHORS_SNAPSHOT is on.
+    """
+    columns = ['id', *(field for field in POST_ROW_FIELDS if field in fields)]
+    if 'authors' in fields and settings.POST_AUTHORS_SNAPSHOT:
+        columns.append('authors_snapshot')
+    return queryset.prefetch_related(None).values(*dict.fromkeys(columns))
+
+
+def filter_posts_by_authors(queryset, author_ids):
+    """Return the posts of queryset linked to any of author_ids.
+
+    The links are matched by an EXISTS on core_post_authors, which the
+    (post_id, author_id) unique index answers, so a post linked to several
+    of the authors is still returned once without a DISTINCT.
+    """
+    links = Post.authors.through.objects.filter(
+        post_id = OuterRef('pk'),
+        author_id__in = author_ids,
+    )
+    return queryset.filter(Exists(links))
+
+
+def _author_ids(post_ids):
+    links = Post.authors.through.objects.filter(
+        post_id__in = post_ids,
+    ).order_by('post_id', 'author_id').values_list('post_id', 'author_id')
+    authors = defaultdict(list)
+    for post_id, author_id in links:
+        authors[post_id].append(author_id)
+    return authors
+
+
+def authors_by_post(post_ids):
+    """Map each of post_ids to its authors as AuthorSerializer renders them"""
+    author_fields = AuthorSerializer.Meta.fields
+    links = Post.authors.through.objects.filter(
+        post_id__in = post_ids,
+    ).order_by('post_id', 'author_id').values_list(
+        'post_id',
+        *[f'author__{field}' for field in author_fields],
+    )
+    authors = defaultdict(list)
+    for post_id, *values in links:
+        authors[post_id].append(dict(zip(author_fields, values)))
+    return authors
+
+
+def _snapshot_authors(rows, expand_authors):
+    """Map the ids of rows with an authors snapshot to their authors"""
+    author_fields = AuthorSerializer.Meta.fields
+    authors = {}
+    for row in rows:
+        snapshot = row.get('authors_snapshot')
+        if snapshot is None:
+            continue
+        if expand_authors:
+            # Rebuilt in field order, which a jsonb column does not keep.
+            authors[row['id']] = [
+                {field: author[field] for field in author_fields}
+                for author in snapshot
+            ]
+        else:
+            authors[row['id']] = [author['id'] for author in snapshot]
+    return authors
+
+
+def serialize_post_rows(rows, fields = POST_FIELDS, expand_authors = True):
+    """Return the PostSerializer representation of post value rows.
+
+    Builds plain dicts from the rows and one query for all their authors,
+    skipping model instances and per-field dispatch. Every field is a
+    string or an id, which DRF renders as is, so the JSON is identical.
+    Posts are narrowed to fields; unexpanded authors are ids, read from
+    the link table alone. Authors come from the rows' snapshots where
+    they have one, and the query only covers the rest.
+    """
+    row_fields = [field for field in POST_ROW_FIELDS if field in fields]
+    authors = {}
+    if 'authors' in fields:
+        authors = _snapshot_authors(rows, expand_authors)
+        missing = [row['id'] for row in rows if row['id'] not in authors]
+        if missing:
+            load = authors_by_post if expand_authors else _author_ids
+            authors.update(load(missing))
+
+    data = []
+    for row in rows:
+        item = {field: row[field] for field in row_fields}
+        if 'authors' in fields:
+            item['authors'] = authors.get(row['id'], [])
+        data.append(item)
+    return data
+
+
+class PostBulkSerializer(PostSerializer):
+    """Serializer for one post of a bulk request"""
+
+    def validate_slug(self, value):
+        """Skip the per-post query; bulk requests check slugs per batch"""
+        return value
@@ -0,0 +1,86 @@
+"""
+Signal handlers keeping the post search index and author snapshots in sync
+"""
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from core.models import Author, Post
+from post import search, snapshots
+
+
+@receiver(post_save, sender = Post)
+def index_saved_post(sender, instance, raw = False, **kwargs):
+    if not raw:
+        search.index_posts([instance.pk])
+
+
+@receiver(post_delete, sender = Post)
+def remove_deleted_post(sender, instance, **kwargs):
+    search.remove_posts([instance.pk])
+
+
+@receiver(m2m_changed, sender = Post.authors.through)
+def index_posts_with_changed_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        search.index_posts([instance.pk])
+    elif action == 'post_clear':
+        search.index_posts(instance._linked_post_ids)
+    else:
+        search.index_posts(pk_set)
+
+
+@receiver(m2m_changed, sender = Post.authors.through)
+def remember_cleared_posts(sender, instance, action, reverse, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._linked_post_ids = list(
+            instance.post_set.values_list('id', flat = True)
+        )
+
+
+@receiver(post_save, sender = Author)
+def index_posts_of_saved_author(sender, instance, created, raw = False, **kwargs):
+    if not created and not raw:
+        search.index_posts(instance.post_set.values_list('id', flat = True))
+
+
+@receiver(pre_delete, sender = Author)
+def remember_posts_of_deleted_author(sender, instance, **kwargs):
+    instance._linked_post_ids = list(
+        instance.post_set.values_list('id', flat = True)
+    )
+
+
+@receiver(post_delete, sender = Author)
+def index_posts_of_deleted_author(sender, instance, **kwargs):
+    search.index_posts(getattr(instance, '_linked_post_ids', []))
+
+
+@receiver(m2m_changed, sender = Post.authors.through)
+def refresh_snapshots_of_changed_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        # Keep the instance current so saving it later does not revert it.
+        instance.authors_snapshot = snapshots.refresh_snapshots([instance.pk])[instance.pk]
+    elif action == 'post_clear':
+        snapshots.refresh_snapshots(instance._linked_post_ids)
+    else:
+        snapshots.refresh_snapshots(pk_set)
+
+
+@receiver(post_save, sender = Author)
+def refresh_snapshots_of_saved_author(sender, instance, created, raw = False, **kwargs):
+    if not created and not raw:
+        snapshots.refresh_snapshots(instance.post_set.values_list('id', flat = True))
+
+
+@receiver(post_delete, sender = Author)
+def refresh_snapshots_of_deleted_author(sender, instance, **kwargs):
+    snapshots.refresh_snapshots(getattr(instance, '_linked_post_ids', []))
@@ -0,0 +1,59 @@
+"""
+Denormalized author snapshots on posts.
+
+Post.authors_snapshot holds a post's authors as AuthorSerializer renders
+them, ordered by id, so post listings read a single table. Snapshots are
+refreshed in the transaction of the write that changes them: by the
+handlers in post.signals when authors are linked, unlinked, edited or
+deleted, and by the bulk helpers, which bypass model signals.
+"""
+from core.models import Post
+from post.serializers import authors_by_post
+
+BATCH_SIZE = 500
+
+
+def post_id_batches(batch_size = BATCH_SIZE, queryset = None):
+    """Yield the ids of every post, in batches of batch_size, by id"""
+    queryset = Post.objects.all() if queryset is None else queryset
+    last_id = 0
+    while True:
+        batch = list(
+            queryset.filter(id__gt = last_id).order_by('id').values_list(
+                'id',
+                flat = True,
+            )[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]
+
+
+def refresh_snapshots(post_ids, batch_size = BATCH_SIZE):
+    """Rebuild the author snapshots of the posts with post_ids.
+
+    Return the new snapshots by post id.
+    """
+    post_ids = list(dict.fromkeys(post_ids))
+    snapshots = {}
+    for start in range(0, len(post_ids), batch_size):
+        batch = post_ids[start:start + batch_size]
+        authors = authors_by_post(batch)
+        posts = [
+            Post(id = post_id, authors_snapshot = authors.get(post_id, []))
+            for post_id in batch
+        ]
+        Post.objects.bulk_update(posts, ['authors_snapshot'])
+        snapshots.update((post.id, post.authors_snapshot) for post in posts)
+    return snapshots
+
+
+def stale_snapshots(post_ids):
+    """Return the ids among post_ids whose snapshot is missing or outdated"""
+    authors = authors_by_post(post_ids)
+    stored = Post.objects.filter(id__in = post_ids).values_list('id', 'authors_snapshot')
+    return [
+        post_id for post_id, snapshot in stored
+        if snapshot != authors.get(post_id, [])
+    ]
@@ -0,0 +1,116 @@
+"""
+Tests for the async post read views
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Author, Post
+
+ASYNC_LIST_URL = reverse('post:async-post-list')
+POST_URL = reverse('post:post-list')
+
+
+def async_detail_url(post_id):
+    """Create and return an async post detail url"""
+    return reverse('post:async-post-detail', args = [post_id])
+
+
+def detail_url(post_id):
+    """Create and return a post detail url"""
+    return reverse('post:post-detail', args = [post_id])
+
+
+def create_post(user, **params):
+    """Create and return a sample post"""
+    defaults = {
+        'title' : 'Post Title',
+        'description' : 'Post description',
+        'img_description' : 'http://placehold.it',
+        'slug' : f'slug-test-{uuid.uuid4().hex}',
+    }
+    defaults.update(params)
+
+    return Post.objects.create(user = user, **defaults)
+
+
+@override_settings(ASYNC_ORM_THREAD_SENSITIVE = True)
+class AsyncPostAPITests(TestCase):
+    """Test the async post list and detail views"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+        token = Token.objects.create(user = self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION = f'Token {token.key}')
+
+    def test_auth_required(self):
+        """Test requests without a token are rejected like the sync views"""
+        res = APIClient().get(ASYNC_LIST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+        self.assertEqual(res.content, APIClient().get(POST_URL).content)
+
+    def test_list_matches_sync_view(self):
+        """Test the async list renders the same page as the sync list"""
+        for i in range(3):
+            post = create_post(user = self.user, title = f'Post {i}')
+            post.authors.add(Author.objects.create(
+                user = self.user,
+                name = f'Author {i}',
+                link = 'http://www.author.com',
+                profile_picture = 'http://www.profile.com',
+                description = 'Sample Test Description',
+            ))
+        other = get_user_model().objects.create_user(
+            email = 'other@example.com',
+            password = 'testpassword123',
+        )
+        create_post(user = other)
+
+        res = self.client.get(ASYNC_LIST_URL, {'page_size': 2})
+        sync_res = self.client.get(POST_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()['results']), 2)
+        self.assertEqual(res.json()['results'], sync_res.json()['results'])
+
+        res = self.client.get(res.json()['next'])
+        self.assertEqual(len(res.json()['results']), 1)
+
+    def test_detail_matches_sync_view(self):
+        """Test the async detail renders the same body as the sync detail"""
+        post = create_post(user = self.user)
+
+        res = self.client.get(async_detail_url(post.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.content, self.client.get(detail_url(post.id)).content)
+
+    def test_detail_of_other_user_not_found(self):
+        """Test other users' posts are not found"""
+        other = get_user_model().objects.create_user(
+            email = 'other@example.com',
+            password = 'testpassword123',
+        )
+        post = create_post(user = other)
+
+        res = self.client.get(async_detail_url(post.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_read_only(self):
+        """Test the async views only accept safe methods"""
+        res = self.client.post(ASYNC_LIST_URL, {'title': 'Post'})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
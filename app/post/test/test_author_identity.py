@@ -0,0 +1,215 @@
+"""
+Tests for identifying authors by their normalized name and link
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.authors import author_identity
+from core.models import Author, Post
+
+POST_URL = reverse('post:post-list')
+
+
+def post_detail_url(post_id):
+    """Create and return a post detail url"""
+    return reverse('post:post-detail', args = [post_id])
+
+
+def author_detail_url(author_id):
+    """Create and return an author detail url"""
+    return reverse('post:author-detail', args = [author_id])
+
+
+def author_payload(name, link = 'http://www.author.com', **fields):
+    """Return an author payload"""
+    payload = {
+        'name' : name,
+        'link' : link,
+        'profile_picture' : 'http://www.profile.com',
+        'description' : 'Sample Test Description',
+    }
+    payload.update(fields)
+    return payload
+
+
+class AuthorIdentityTests(SimpleTestCase):
+    """Test the normalization behind author identities"""
+
+    def test_equivalent_names_and_links_match(self):
+        """Test case, spacing, scheme, www. and trailing slashes are ignored"""
+        identity = author_identity('Ann Lee', 'http://www.author.com/about')
+        for name, link in [
+            ('ann  lee', 'https://author.com/about/'),
+            (' ANN LEE ', 'http://WWW.Author.com:80/about'),
+        ]:
+            self.assertEqual(author_identity(name, link), identity)
+
+    def test_different_names_or_links_differ(self):
+        """Test other names, paths, queries and ports are other authors"""
+        identity = author_identity('Ann', 'http://author.com/a')
+        for name, link in [
+            ('Anne', 'http://author.com/a'),
+            ('Ann', 'http://author.com/b'),
+            ('Ann', 'http://author.com/a?page=2'),
+            ('Ann', 'http://author.com:8080/a'),
+        ]:
+            self.assertNotEqual(author_identity(name, link), identity)
+
+
+class AuthorIdentityAPITests(TestCase):
+    """Test posts and the authors API match authors by identity"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_post(self, *authors):
+        res = self.client.post(POST_URL, {
+            'title' : 'Post Title',
+            'description' : 'Post description',
+            'img_description' : 'http://placehold.it',
+            'slug' : 'post',
+            'authors' : list(authors),
+        }, format = 'json')
+        return Post.objects.get(id = res.data['id'])
+
+    def test_changed_details_update_author_in_place(self):
+        """Test an author sent with new details is updated, not duplicated"""
+        post = self.create_post(author_payload('Ann'))
+        author = Author.objects.get(user = self.user)
+
+        res = self.client.patch(post_detail_url(post.id), {
+            'authors': [author_payload(
+                'ann',
+                'https://author.com/',
+                description = 'New description',
+            )],
+        }, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Author.objects.filter(user = self.user).count(), 1)
+        author.refresh_from_db()
+        self.assertEqual(author.name, 'ann')
+        self.assertEqual(author.description, 'New description')
+        self.assertEqual(res.data['authors'][0]['id'], author.id)
+        self.assertEqual(res.data['authors'][0]['description'], 'New description')
+
+    def test_author_updated_in_place_refreshes_snapshot(self):
+        """Test an in-place author change shows in the stored post snapshot"""
+        post = self.create_post(author_payload('Ann', description = 'old'))
+
+        self.client.patch(post_detail_url(post.id), {
+            'authors': [author_payload('Ann', description = 'new')],
+        }, format = 'json')
+
+        post.refresh_from_db()
+        self.assertEqual(post.authors_snapshot[0]['description'], 'new')
+        res = self.client.get(POST_URL)
+        self.assertEqual(res.data['results'][0]['authors'][0]['description'], 'new')
+        res = self.client.get(post_detail_url(post.id))
+        self.assertEqual(res.data['authors'][0]['description'], 'new')
+
+    def test_partial_author_keeps_fields_not_sent(self):
+        """Test an existing author sent without some fields keeps them"""
+        post = self.create_post(author_payload('Ann', description = 'kept'))
+
+        res = self.client.patch(post_detail_url(post.id), {
+            'authors': [{'name': 'Ann', 'link': 'http://www.author.com'}],
+        }, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        author = Author.objects.get(user = self.user)
+        self.assertEqual(author.description, 'kept')
+        self.assertEqual(author.profile_picture, 'http://www.profile.com')
+
+    def test_same_name_other_link_is_another_author(self):
+        """Test authors sharing a name but not a link stay apart"""
+        post = self.create_post(
+            author_payload('Ann', 'http://ann.com'),
+            author_payload('Ann', 'http://other.com'),
+        )
+
+        self.assertEqual(post.authors.count(), 2)
+
+    def test_author_update_rejects_identity_of_another(self):
+        """Test renaming an author onto another author's identity fails"""
+        self.create_post(author_payload('Ann'), author_payload('Bob'))
+        bob = Author.objects.get(name = 'Bob')
+
+        res = self.client.patch(author_detail_url(bob.id), {'name': 'ANN'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        bob.refresh_from_db()
+        self.assertEqual(bob.name, 'Bob')
+
+        res = self.client.patch(author_detail_url(bob.id), {'description': 'Other'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class MergeDuplicateAuthorsTests(TransactionTestCase):
+    """Test the command merging authors created before identities were unique"""
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes('core')
+        executor.migrate([('core', '0010_author_identity')])
+        self.addCleanup(self.migrate_latest)
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+
+    def migrate_latest(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.latest)
+
+    def create_author(self, name, link = 'http://www.author.com'):
+        return Author.objects.create(user = self.user, name = name, link = link)
+
+    def create_post(self, slug, *authors):
+        post = Post.objects.create(
+            user = self.user,
+            title = 'Post Title',
+            description = 'Post description',
+            img_description = 'http://placehold.it',
+            slug = slug,
+        )
+        post.authors.add(*authors)
+        return post
+
+    def test_merge_rewrites_links_to_oldest_author(self):
+        """Test duplicates are deleted and their posts link the oldest author"""
+        ann = self.create_author('Ann')
+        copies = [self.create_author('ann', 'https://author.com/') for _ in range(2)]
+        bob = self.create_author('Bob')
+        both = self.create_post('both', ann, copies[0], bob)
+        copy = self.create_post('copy', copies[0], copies[1])
+
+        out = StringIO()
+        call_command('merge_duplicate_authors', batch_size = 1, stdout = out)
+
+        self.assertIn('Merged 2 duplicate authors.', out.getvalue())
+        self.assertEqual(
+            set(Author.objects.values_list('id', flat = True)),
+            {ann.id, bob.id},
+        )
+        self.assertEqual(
+            sorted(both.authors.values_list('id', flat = True)),
+            [ann.id, bob.id],
+        )
+        self.assertEqual(list(copy.authors.values_list('id', flat = True)), [ann.id])
+        copy.refresh_from_db()
+        self.assertEqual([author['id'] for author in copy.authors_snapshot], [ann.id])
@@ -9,7 +9,7 @@ from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Author
+from core.models import Author, Post
 from post.serializers import AuthorSerializer
 
 AUTHORS_URL = reverse('post:author-list')
@@ -64,7 +64,7 @@ class PrivateAuthorsAPITests(TestCase):
         authors = Author.objects.all().order_by('-name')
         serializer = AuthorSerializer(authors, many = True)
         # self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data['results'])
 
     def test_authors_limited_to_user(self):
         """Test list of authors is limited to authenticated users"""
@@ -86,9 +86,9 @@ class PrivateAuthorsAPITests(TestCase):
 
         res = self.client.get(AUTHORS_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['name'], author.name)
-        self.assertEqual(res.data[0]['id'], author.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['name'], author.name)
+        self.assertEqual(res.data['results'][0]['id'], author.id)
         
 
     def test_update_author(self):
@@ -128,4 +128,121 @@ class PrivateAuthorsAPITests(TestCase):
         authors = Author.objects.filter(user = self.user)
         self.assertFalse(authors.exists())
 
+    def test_list_authors_paginated_by_name_and_id(self):
+        """Test authors sharing a name are paged without gaps or repeats"""
+        authors = [
+            Author.objects.create(
+                user = self.user,
+                name = name,
+                link = f'http://www.author{n}.com',
+                profile_picture = 'http://www.profile.com',
+                description = 'Sample Test Description',
+            )
+            for n, name in enumerate(['Ana', 'Zoe', 'Ana', 'Ana', 'Bob'])
+        ]
+
+        seen = []
+        res = self.client.get(AUTHORS_URL, {'page_size': 2})
+        while True:
+            self.assertLessEqual(len(res.data['results']), 2)
+            seen.extend(a['id'] for a in res.data['results'])
+            if not res.data['next']:
+                break
+            res = self.client.get(res.data['next'])
+
+        expected = sorted(authors, key = lambda a: a.id)
+        expected = sorted(expected, key = lambda a: a.name, reverse = True)
+        self.assertEqual(seen, [a.id for a in expected])
+
+    def test_list_authors_pages_back_through_ties(self):
+        """Test previous links return the same pages without an offset"""
+        for n in range(5):
+            Author.objects.create(
+                user = self.user,
+                name = 'Ana',
+                link = f'http://www.author{n}.com',
+            )
+
+        pages = [self.client.get(AUTHORS_URL, {'page_size': 2})]
+        while pages[-1].data['next']:
+            with self.assertNumQueries(2):
+                pages.append(self.client.get(pages[-1].data['next']))
+        res = pages[-1]
+        for page in reversed(pages[:-1]):
+            res = self.client.get(res.data['previous'])
+            self.assertEqual(res.data['results'], page.data['results'])
+
+        self.assertEqual([len(page.data['results']) for page in pages], [2, 2, 1])
+        self.assertIsNone(res.data['previous'])
+
+    def test_list_authors_invalid_cursor(self):
+        """Test a cursor not holding a name and an id is not found"""
+        res = self.client.get(AUTHORS_URL, {'cursor': 'cD1BbmE='})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def create_authors_with_posts(self):
+        """Create authors linked to none, one and two posts"""
+        authors = [
+            Author.objects.create(
+                user = self.user,
+                name = name,
+                link = f'http://www.{name}.com',
+                profile_picture = 'http://www.profile.com',
+                description = 'Sample Test Description',
+            )
+            for name in ['ana', 'bob', 'cy']
+        ]
+        posts = [
+            Post.objects.create(
+                user = self.user,
+                title = f'Post {n}',
+                description = 'Sample description',
+                img_description = 'http://placehold.it',
+                slug = f'post-{n}',
+            )
+            for n in range(2)
+        ]
+        posts[0].authors.add(authors[1], authors[2])
+        posts[1].authors.add(authors[2])
+        return authors, posts
+
+    def test_list_authors_with_counts(self):
+        """Test ?with_counts=1 adds post counts in the page query"""
+        (ana, bob, cy), posts = self.create_authors_with_posts()
+
+        # Content version and the annotated page of authors.
+        with self.assertNumQueries(2):
+            res = self.client.get(AUTHORS_URL, {'with_counts': 1})
 
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        counts = {
+            author['id']: (author['post_count'], author['last_post_id'])
+            for author in res.data['results']
+        }
+        self.assertEqual(counts, {
+            ana.id: (0, None),
+            bob.id: (1, posts[0].id),
+            cy.id: (2, posts[1].id),
+        })
+        res = self.client.get(AUTHORS_URL)
+        self.assertNotIn('post_count', res.data['results'][0])
+
+    def test_list_assigned_authors_only(self):
+        """Test ?assigned_only=1 leaves out authors without posts"""
+        (ana, bob, cy), posts = self.create_authors_with_posts()
+
+        res = self.client.get(AUTHORS_URL, {'assigned_only': 1, 'page_size': 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['id'] for a in res.data['results']], [cy.id])
+        res = self.client.get(res.data['next'])
+        self.assertEqual([a['id'] for a in res.data['results']], [bob.id])
+        self.assertIsNone(res.data['next'])
+
+    def test_list_authors_rejects_bad_flags(self):
+        """Test flags other than 1 or 0 are rejected"""
+        res = self.client.get(AUTHORS_URL, {'with_counts': 'maybe'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('with_counts', res.data)
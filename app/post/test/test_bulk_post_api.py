@@ -0,0 +1,305 @@
+"""
+Tests for the bulk post API
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Author, Post
+
+BULK_URL = reverse('post:post-bulk')
+
+
+def create_post(user, **params):
+    """Create and return a sample post"""
+    defaults = {
+        'title' : 'Post Title',
+        'description' : 'Post description',
+        'img_description' : 'http://placehold.it',
+        'slug' : 'slug-test',
+    }
+    defaults.update(params)
+    return Post.objects.create(user = user, **defaults)
+
+def post_payload(index, **params):
+    """Return a post payload with a unique slug"""
+    payload = {
+        'title' : f'Post {index}',
+        'description' : 'Post description',
+        'img_description' : 'http://placehold.it',
+        'slug' : f'post-{index}',
+    }
+    payload.update(params)
+    return payload
+
+def author_payload(name):
+    """Return an author payload"""
+    return {
+        'name' : name,
+        'link' : 'http://www.author.com',
+        'profile_picture' : 'http://www.profile.com',
+        'description' : 'Sample Test Description',
+    }
+
+
+class BulkPostAPITests(TestCase):
+    """Test bulk create, update and delete of posts"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create(self):
+        """Test creating many posts with shared authors"""
+        payload = [
+            post_payload(i, authors = [author_payload('Shared'), author_payload(f'A{i}')])
+            for i in range(5)
+        ]
+
+        res = self.client.post(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data['results']), 5)
+        for item, result in zip(payload, res.data['results']):
+            self.assertEqual(result['status'], status.HTTP_201_CREATED)
+            self.assertEqual(result['data']['slug'], item['slug'])
+            post = Post.objects.get(id = result['data']['id'], user = self.user)
+            self.assertEqual(
+                sorted(post.authors.values_list('name', flat = True)),
+                sorted(a['name'] for a in item['authors']),
+            )
+        self.assertEqual(Author.objects.filter(user = self.user).count(), 6)
+
+    def test_bulk_create_query_count_constant(self):
+        """Test the number of queries does not grow with the batch"""
+        def count_queries(offset, count):
+            payload = [
+                post_payload(i, authors = [author_payload(f'A{i}')])
+                for i in range(offset, offset + count)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(BULK_URL, payload, format = 'json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_queries(0, 2), count_queries(10, 50))
+
+    def test_bulk_create_invalid_item_rolls_back(self):
+        """Test one invalid item fails the whole batch with per-item results"""
+        payload = [post_payload(0), post_payload(1, title = ''), post_payload(2)]
+
+        res = self.client.post(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        statuses = [result['status'] for result in res.data['results']]
+        self.assertEqual(statuses, [424, 400, 424])
+        self.assertIn('title', res.data['results'][1]['errors'])
+        self.assertFalse(Post.objects.filter(user = self.user).exists())
+
+    def test_bulk_create_duplicate_slugs(self):
+        """Test slugs must be unique within the batch and the account"""
+        create_post(user = self.user, slug = 'taken')
+        payload = [post_payload(0, slug = 'taken'), post_payload(1), post_payload(2, slug = 'post-1')]
+
+        res = self.client.post(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        statuses = [result['status'] for result in res.data['results']]
+        self.assertEqual(statuses, [400, 424, 400])
+
+    def test_bulk_create_requires_list(self):
+        """Test the payload must be a non-empty list"""
+        res = self.client.post(BULK_URL, post_payload(0), format = 'json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.post(BULK_URL, [], format = 'json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(POST_BULK_MAX_ITEMS = 2)
+    def test_bulk_create_limit(self):
+        """Test batches above the configured size are rejected"""
+        payload = [post_payload(i) for i in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Post.objects.exists())
+
+    def test_bulk_update(self):
+        """Test partially updating many posts"""
+        post1 = create_post(user = self.user, slug = 'one')
+        post2 = create_post(user = self.user, slug = 'two')
+        old_author = Author.objects.create(user = self.user, **author_payload('Old'))
+        post2.authors.add(old_author)
+        payload = [
+            {'id': post1.id, 'title': 'New Title'},
+            {'id': post2.id, 'slug': 'one-more', 'authors': [author_payload('New')]},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        post1.refresh_from_db()
+        post2.refresh_from_db()
+        self.assertEqual(post1.title, 'New Title')
+        self.assertEqual(post1.slug, 'one')
+        self.assertEqual(post2.slug, 'one-more')
+        self.assertEqual(list(post2.authors.values_list('name', flat = True)), ['New'])
+        self.assertEqual(res.data['results'][1]['data']['authors'][0]['name'], 'New')
+
+    def test_bulk_update_partial_author_keeps_fields_not_sent(self):
+        """Test bulk updates leave out author fields that were not sent"""
+        post = create_post(user = self.user)
+        author = Author.objects.create(user = self.user, **author_payload('Ann'))
+        payload = [{
+            'id': post.id,
+            'authors': [{'name': author.name, 'link': author.link}],
+        }]
+
+        res = self.client.patch(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(post.authors.all()), [author])
+        description = author.description
+        author.refresh_from_db()
+        self.assertEqual(author.description, description)
+
+    def test_bulk_update_writes_author_delta(self):
+        """Test bulk updates only write the author links that changed"""
+        post = create_post(user = self.user)
+        kept = Author.objects.create(user = self.user, **author_payload('Kept'))
+        dropped = Author.objects.create(user = self.user, **author_payload('Dropped'))
+        post.authors.add(kept, dropped)
+        kept_link = Post.authors.through.objects.get(author = kept)
+        payload = [{'id': post.id, 'authors': [author_payload('Kept'), author_payload('New')]}]
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.patch(BULK_URL, payload, format = 'json')
+            writes = [
+                query['sql'].split()[0] for query in queries
+                if query['sql'].startswith(('INSERT', 'DELETE'))
+                and 'core_post_authors' in query['sql']
+            ]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(writes, ['DELETE', 'INSERT'])
+        self.assertTrue(Post.authors.through.objects.filter(id = kept_link.id).exists())
+        self.assertEqual(
+            set(post.authors.values_list('name', flat = True)),
+            {'Kept', 'New'},
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(BULK_URL, payload, format = 'json')
+            writes = [
+                query['sql'] for query in queries
+                if query['sql'].startswith(('INSERT', 'DELETE'))
+                and 'core_post_authors' in query['sql']
+            ]
+
+        self.assertEqual(writes, [])
+
+    def test_bulk_update_missing_and_foreign_posts(self):
+        """Test unknown ids and other users' posts are reported as not found"""
+        post = create_post(user = self.user)
+        other = create_post(
+            user = get_user_model().objects.create_user(email = 'other@example.com'),
+        )
+        payload = [
+            {'id': post.id, 'title': 'New Title'},
+            {'id': other.id, 'title': 'Hacked'},
+            {'id': other.id + 1000, 'title': 'Unknown'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        statuses = [result['status'] for result in res.data['results']]
+        self.assertEqual(statuses, [424, 404, 404])
+        other.refresh_from_db()
+        post.refresh_from_db()
+        self.assertEqual(other.title, 'Post Title')
+        self.assertEqual(post.title, 'Post Title')
+
+    def test_bulk_update_rejects_invalid_ids(self):
+        """Test ids other than ints are reported per item"""
+        post = create_post(user = self.user)
+        payload = [
+            {'id': post.id, 'title': 'New Title'},
+            {'id': [post.id], 'title': 'List'},
+            {'id': 'abc', 'title': 'Text'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        statuses = [result['status'] for result in res.data['results']]
+        self.assertEqual(statuses, [424, 400, 400])
+        self.assertIn('id', res.data['results'][1]['errors'])
+        post.refresh_from_db()
+        self.assertEqual(post.title, 'Post Title')
+
+    def test_bulk_update_requires_ids(self):
+        """Test items without an id are reported as missing it"""
+        post = create_post(user = self.user)
+        payload = [
+            {'id': post.id, 'title': 'New Title'},
+            {'title': 'No id'},
+        ]
+
+        res = self.client.patch(BULK_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['results'][1], {
+            'status': status.HTTP_400_BAD_REQUEST,
+            'errors': {'id': ['This field is required.']},
+        })
+        post.refresh_from_db()
+        self.assertEqual(post.title, 'Post Title')
+
+    def test_bulk_update_slug_conflict(self):
+        """Test an update cannot take a slug used by another post"""
+        post1 = create_post(user = self.user, slug = 'one')
+        create_post(user = self.user, slug = 'two')
+
+        res = self.client.patch(BULK_URL, [{'id': post1.id, 'slug': 'two'}], format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('slug', res.data['results'][0]['errors'])
+
+    def test_bulk_delete(self):
+        """Test deleting many posts by id"""
+        post1 = create_post(user = self.user, slug = 'one')
+        post2 = create_post(user = self.user, slug = 'two')
+        other = create_post(
+            user = get_user_model().objects.create_user(email = 'other@example.com'),
+        )
+
+        res = self.client.delete(
+            BULK_URL,
+            {'ids': [post1.id, post2.id, other.id]},
+            format = 'json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        statuses = [result['status'] for result in res.data['results']]
+        self.assertEqual(statuses, [204, 204, 404])
+        self.assertFalse(Post.objects.filter(user = self.user).exists())
+        self.assertTrue(Post.objects.filter(id = other.id).exists())
+
+    def test_bulk_delete_requires_ids(self):
+        """Test deleting requires a list of integer ids"""
+        res = self.client.delete(BULK_URL, {'ids': ['a']}, format = 'json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.delete(BULK_URL, {}, format = 'json')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
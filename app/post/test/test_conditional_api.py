@@ -0,0 +1,130 @@
+"""
+Tests for conditional requests on the post APIs
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Author, Post
+
+POST_URL = reverse('post:post-list')
+AUTHORS_URL = reverse('post:author-list')
+
+
+def detail_url(post_id):
+    """Create and return a post detail url"""
+    return reverse('post:post-detail', args = [post_id])
+
+def create_post(user, **params):
+    """Create and return a sample post"""
+    defaults = {
+        'title' : 'Post Title',
+        'description' : 'Post description',
+        'img_description' : 'http://placehold.it',
+        'slug' : 'slug-test',
+    }
+    defaults.update(params)
+    return Post.objects.create(user = user, **defaults)
+
+def create_user(email = 'user@example.com', password = 'testpassword123'):
+    """Create and return a new user"""
+    return get_user_model().objects.create_user(email = email, password = password)
+
+
+class ConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified handling"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_list_sets_validators(self):
+        """Test list responses carry an ETag and Last-Modified"""
+        create_post(user = self.user)
+
+        res = self.client.get(POST_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', res)
+
+    def test_matching_etag_not_modified_before_serializing(self):
+        """Test a matching If-None-Match returns 304 after one query"""
+        create_post(user = self.user)
+        etag = self.client.get(POST_URL)['ETag']
+
+        with self.assertNumQueries(1):
+            res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH = etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+        self.assertEqual(res.content, b'')
+
+    def test_detail_not_modified(self):
+        """Test post detail honours If-None-Match"""
+        post = create_post(user = self.user)
+        etag = self.client.get(detail_url(post.id))['ETag']
+
+        res = self.client.get(detail_url(post.id), HTTP_IF_NONE_MATCH = etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_write_changes_etag(self):
+        """Test creating, updating and deleting posts change the ETag"""
+        etags = {self.client.get(POST_URL)['ETag']}
+
+        res = self.client.post(POST_URL, {
+            'title' : 'Sample Title',
+            'description' : 'Sample Description',
+            'img_description' : 'http://placehold.png',
+            'slug' : 'new-slug',
+        })
+        etags.add(self.client.get(POST_URL)['ETag'])
+        self.client.patch(detail_url(res.data['id']), {'title': 'New Title'})
+        etags.add(self.client.get(POST_URL)['ETag'])
+        self.client.delete(detail_url(res.data['id']))
+        etags.add(self.client.get(POST_URL)['ETag'])
+
+        self.assertEqual(len(etags), 4)
+
+    def test_author_change_invalidates_posts(self):
+        """Test editing an author changes the post list ETag"""
+        author = Author.objects.create(
+            user = self.user,
+            name = 'Raul',
+            link = 'http://www.raul.com',
+            profile_picture = 'http://www.profile.com',
+            description = 'Sample Test Description Raul',
+        )
+        create_post(user = self.user).authors.add(author)
+        etag = self.client.get(POST_URL)['ETag']
+
+        self.client.patch(
+            reverse('post:author-detail', args = [author.id]),
+            {'name': 'Jesus'},
+        )
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH = etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['authors'][0]['name'], 'Jesus')
+
+    def test_etag_depends_on_query(self):
+        """Test different pages of a list get different ETags"""
+        res1 = self.client.get(POST_URL)
+        res2 = self.client.get(POST_URL, {'page_size': 1})
+        res3 = self.client.get(AUTHORS_URL)
+
+        self.assertEqual(len({res1['ETag'], res2['ETag'], res3['ETag']}), 3)
+
+    def test_other_user_writes_keep_etag(self):
+        """Test another user's writes do not invalidate the list"""
+        etag = self.client.get(POST_URL)['ETag']
+
+        create_post(user = create_user(email = 'other@example.com'))
+        res = self.client.get(POST_URL, HTTP_IF_NONE_MATCH = etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,145 @@
+"""
+Tests for the post export API
+"""
+import gc
+import json
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Author, Post
+from post.serializers import PostSerializer
+from post.snapshots import refresh_snapshots
+
+EXPORT_URL = reverse('post:post-export')
+
+
+def create_posts(user, count, offset = 0):
+    """Create count posts sharing one new author"""
+    slugs = [f'post-{i}' for i in range(offset, offset + count)]
+    Post.objects.bulk_create([
+        Post(
+            user = user,
+            title = f'Post {slug}',
+            description = 'Post description ' * 10,
+            img_description = 'http://placehold.it',
+            slug = slug,
+        )
+        for slug in slugs
+    ])
+    author = Author.objects.create(
+        user = user,
+        name = f'Author {offset}',
+        link = 'http://www.author.com',
+        profile_picture = 'http://www.profile.com',
+        description = 'Sample Test Description',
+    )
+    post_ids = Post.objects.filter(user = user, slug__in = slugs).values_list('id', flat = True)
+    Post.authors.through.objects.bulk_create([
+        Post.authors.through(post_id = post_id, author_id = author.id)
+        for post_id in post_ids
+    ])
+    refresh_snapshots(post_ids)
+
+
+@override_settings(POST_EXPORT_CHUNK_SIZE = 50)
+class ExportPostAPITests(TestCase):
+    """Test streaming posts as NDJSON"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def read_lines(self, res):
+        return [
+            json.loads(line)
+            for line in b''.join(res.streaming_content).splitlines()
+        ]
+
+    def test_export_ndjson(self):
+        """Test every post is streamed as one JSON object per line"""
+        create_posts(self.user, 120)
+        create_posts(
+            get_user_model().objects.create_user(email = 'other@example.com'),
+            3,
+        )
+
+        res = self.client.get(EXPORT_URL, {'format': 'ndjson'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertTrue(res.streaming)
+        posts = Post.objects.filter(user = self.user).order_by('-id')
+        expected = json.loads(json.dumps(PostSerializer(posts, many = True).data))
+        self.assertEqual(self.read_lines(res), expected)
+
+    def test_export_without_format(self):
+        """Test NDJSON is also served without the format parameter"""
+        create_posts(self.user, 2)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(self.read_lines(res)), 2)
+
+    @override_settings(POST_AUTHORS_SNAPSHOT = False)
+    def test_export_queries_per_chunk(self):
+        """Test authors are loaded once per chunk, not once per post"""
+        create_posts(self.user, 120)
+
+        # Posts read with a chunked cursor plus one authors query per chunk.
+        with self.assertNumQueries(4):
+            res = self.client.get(EXPORT_URL)
+            lines = self.read_lines(res)
+
+        self.assertEqual(len(lines), 120)
+
+    def test_export_reads_authors_snapshots(self):
+        """Test posts are exported with their authors from one table"""
+        create_posts(self.user, 120)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(EXPORT_URL)
+            lines = self.read_lines(res)
+
+        self.assertEqual(len(lines), 120)
+        self.assertEqual(lines[0]['authors'][0]['name'], 'Author 0')
+
+    def test_export_memory_flat(self):
+        """Test peak memory does not grow with the number of posts"""
+        def peak_memory():
+            res = self.client.get(EXPORT_URL)
+            # Chunks must be freed as soon as they are sent, not by the GC.
+            gc.disable()
+            tracemalloc.start()
+            try:
+                for _ in res.streaming_content:
+                    pass
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+                gc.enable()
+
+        create_posts(self.user, 200)
+        small = peak_memory()
+        create_posts(self.user, 1800, offset = 200)
+        large = peak_memory()
+
+        self.assertLess(large, small * 2)
+
+    def test_export_auth_required(self):
+        """Test exporting requires authentication"""
+        self.client.force_authenticate(None)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
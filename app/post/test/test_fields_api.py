@@ -0,0 +1,121 @@
+"""
+Tests for sparse fieldsets and author expansion on the post API
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Author, Post
+
+POST_URL = reverse('post:post-list')
+
+
+def detail_url(post_id):
+    """Create and return a post detail url"""
+    return reverse('post:post-detail', args = [post_id])
+
+
+class SparseFieldsAPITests(TestCase):
+    """Test ?fields= and ?expand= narrow queries and payloads"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(
+            user = self.user,
+            title = 'Post Title',
+            description = 'Post description',
+            img_description = 'http://placehold.it',
+            slug = 'post-title',
+        )
+        self.author = Author.objects.create(
+            user = self.user,
+            name = 'Author',
+            link = 'http://www.author.com',
+            profile_picture = 'http://www.profile.com',
+            description = 'Sample Test Description',
+        )
+        self.post.authors.add(self.author)
+
+    def get_capturing(self, url, params):
+        """Return the response and the SQL of the post queries it ran"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+            sql = [
+                query['sql'] for query in queries
+                if 'core_post' in query['sql'] and 'core_user' not in query['sql']
+            ]
+        return res, sql
+
+    def test_fields_narrow_output_and_query(self):
+        """Test only the listed fields are selected and rendered"""
+        res, sql = self.get_capturing(POST_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [{'id': self.post.id, 'title': 'Post Title'}])
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('description', sql[0])
+
+    def test_authors_field_holds_ids(self):
+        """Test unexpanded authors are ids read without joining authors"""
+        res, sql = self.get_capturing(POST_URL, {'fields': 'slug,authors'})
+
+        self.assertEqual(res.data['results'], [
+            {'slug': 'post-title', 'authors': [self.author.id]},
+        ])
+        self.assertFalse(any('core_author"' in query for query in sql))
+
+    def test_expand_authors(self):
+        """Test expand=authors embeds full authors in a narrowed post"""
+        res = self.client.get(detail_url(self.post.id), {
+            'fields': 'title',
+            'expand': 'authors',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data), ['title', 'authors'])
+        self.assertEqual(res.data['authors'][0]['name'], 'Author')
+
+    def test_without_fields_post_is_whole(self):
+        """Test posts are rendered whole when no fields are asked for"""
+        res = self.client.get(detail_url(self.post.id))
+
+        self.assertEqual(
+            list(res.data),
+            ['id', 'title', 'description', 'img_description', 'slug', 'authors'],
+        )
+        self.assertEqual(res.data['authors'][0]['name'], 'Author')
+
+    def test_unknown_field_rejected(self):
+        """Test unknown fields and expansions are a bad request"""
+        for params in ({'fields': 'title,secret'}, {'expand': 'user'}, {'fields': ','}):
+            res = self.client.get(POST_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detail_of_other_user_not_found(self):
+        """Test narrowed detail requests still only see the user's posts"""
+        other = get_user_model().objects.create_user(
+            email = 'other@example.com',
+            password = 'testpassword123',
+        )
+        self.client.force_authenticate(other)
+
+        res = self.client.get(detail_url(self.post.id), {'fields': 'title'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_detail_with_non_numeric_id_not_found(self):
+        """Test a detail request for an id that is not a number is a 404"""
+        res = self.client.get(detail_url('abc'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
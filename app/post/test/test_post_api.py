@@ -1,16 +1,25 @@
 """
 Tests for post APIs
 """
+import uuid
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.signals import m2m_changed
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 
 from core.models import Author, Post
-from post.serializers import PostSerializer
+from post import search
+from post.pagination import PostCursorPagination
+from post.serializers import PostSerializer, authors_prefetch
 
 POST_URL = reverse('post:post-list')
 
@@ -24,7 +33,7 @@ def create_post(user, **params):
         'title' : 'Post Title',
         'description' : 'Post description',
         'img_description' :  'http://placehold.it',
-        'slug' : 'slug-test',
+        'slug' : f'slug-test-{uuid.uuid4().hex}',
     }
     defaults.update(params)
 
@@ -35,6 +44,18 @@ def create_user(**params):
     """Create and return a new user"""
     return get_user_model().objects.create_user(**params)
 
+def author_payloads(count):
+    """Create and return a list of author payloads"""
+    return [
+        {
+            'name' : f'Author {i}',
+            'link' : f'http://www.author{i}.com',
+            'profile_picture' : 'http://www.profile.com',
+            'description' : 'Sample Test Description',
+        }
+        for i in range(count)
+    ]
+
 class PublicPostAPITest(TestCase):
     """Test unauthenticated API requests"""
 
@@ -68,7 +89,7 @@ class PrivatePostAPITests(TestCase):
         posts = Post.objects.all().order_by('-id')
         serializer = PostSerializer(posts, many = True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_post_list_limited_to_user(self):
         """Test list of posts if limited to authenticated users."""
@@ -81,7 +102,7 @@ class PrivatePostAPITests(TestCase):
         posts = Post.objects.filter(user = self.user)
         serializer = PostSerializer(posts, many = True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)   
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_post_detail(self):
         """Test get post detail"""
@@ -337,6 +358,29 @@ class PrivatePostAPITests(TestCase):
         self.assertIn(author2, post.authors.all())
         self.assertNotIn(author1, post.authors.all())
 
+    def test_update_post_with_partial_new_author(self):
+        """Test a PATCH may create an author from its name and link only"""
+        post = create_post(user = self.user)
+        payload = {'authors': [{'name': 'Ann', 'link': 'http://ann.com'}]}
+
+        res = self.client.patch(detail_url(post.id), payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        author = post.authors.get()
+        self.assertEqual(author.name, 'Ann')
+        self.assertEqual(author.description, '')
+
+    def test_update_post_author_without_link_rejected(self):
+        """Test a PATCH author without the fields identifying it is a 400"""
+        post = create_post(user = self.user)
+        payload = {'authors': [{'name': 'Ann'}]}
+
+        res = self.client.patch(detail_url(post.id), payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('authors', res.data)
+        self.assertFalse(post.authors.exists())
+
     def test_clear_authors(self):
         """Test clearing a post author list"""
         author = Author.objects.create(
@@ -356,4 +400,322 @@ class PrivatePostAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(post.authors.count(), 0)
-        
\ No newline at end of file
+        
+    def test_list_posts_query_count_constant(self):
+        """Test listing posts does not issue one query per post"""
+        def create_posts_with_authors(count):
+            start = Post.objects.count()
+            for i in range(start, start + count):
+                post = create_post(user = self.user, title = f'Post {i}')
+                post.authors.add(Author.objects.create(
+                    user = self.user,
+                    name = f'Author {i}',
+                    link = 'http://www.author.com',
+                    profile_picture = 'http://www.profile.com',
+                    description = 'Sample Test Description',
+                ))
+
+        # Content version and posts, whose authors come from their snapshots.
+        create_posts_with_authors(2)
+        with self.assertNumQueries(2):
+            res = self.client.get(POST_URL)
+        self.assertEqual(len(res.data['results']), 2)
+
+        create_posts_with_authors(10)
+        with self.assertNumQueries(2):
+            res = self.client.get(POST_URL)
+        self.assertEqual(len(res.data['results']), 12)
+        self.assertEqual(len(res.data['results'][0]['authors']), 1)
+
+    def test_retrieve_post_reads_authors_snapshot(self):
+        """Test retrieving a post reads its authors without a join"""
+        post = create_post(user = self.user)
+        for i in range(5):
+            post.authors.add(Author.objects.create(
+                user = self.user,
+                name = f'Author {i}',
+                link = 'http://www.author.com',
+                profile_picture = 'http://www.profile.com',
+                description = 'Sample Test Description',
+            ))
+
+        with self.assertNumQueries(2):
+            res = self.client.get(detail_url(post.id))
+        self.assertEqual(len(res.data['authors']), 5)
+
+    def test_list_posts_renders_like_serializer(self):
+        """Test the row-based list renders the same JSON as PostSerializer"""
+        authors = [
+            Author.objects.create(
+                user = self.user,
+                name = f'Autor ñ {i}',
+                link = 'http://www.author.com',
+                profile_picture = 'http://www.profile.com',
+                description = 'Descripción',
+            )
+            for i in range(3)
+        ]
+        create_post(user = self.user, title = 'Sin autores')
+        post = create_post(user = self.user, title = 'Título')
+        post.authors.add(authors[2], authors[0])
+        create_post(user = self.user).authors.add(authors[1])
+
+        res = self.client.get(POST_URL, HTTP_ACCEPT = 'application/json')
+
+        posts = Post.objects.filter(user = self.user).prefetch_related(
+            authors_prefetch()
+        ).order_by('-id')
+        expected = JSONRenderer().render(PostSerializer(posts, many = True).data)
+        self.assertIn(b'"results":' + expected, res.content)
+
+    def test_list_posts_paginated_by_cursor(self):
+        """Test posts are paginated newest first with a cursor"""
+        posts = [create_post(user = self.user, title = f'Post {i}') for i in range(5)]
+
+        res = self.client.get(POST_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [p['id'] for p in res.data['results']],
+            [posts[4].id, posts[3].id],
+        )
+        self.assertIsNone(res.data['previous'])
+        self.assertIn('cursor=', res.data['next'])
+
+        seen = []
+        url = res.data['next']
+        while url:
+            res = self.client.get(url)
+            seen.extend(p['id'] for p in res.data['results'])
+            url = res.data['next']
+        self.assertEqual(seen, [posts[2].id, posts[1].id, posts[0].id])
+
+    def test_list_posts_page_size_capped(self):
+        """Test the requested page size cannot exceed the server maximum"""
+        for i in range(3):
+            create_post(user = self.user, title = f'Post {i}')
+
+        with patch.object(PostCursorPagination, 'max_page_size', 2):
+            res = self.client.get(POST_URL, {'page_size': 50})
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_create_post_with_many_authors_query_count(self):
+        """Test new authors are created in bulk when creating a post"""
+        payload = {
+            'title' : 'Sample Title',
+            'description' : 'Sample Description',
+            'img_description' : 'http://placehold.png',
+            'slug' : 'slug-test',
+            'authors' : author_payloads(50),
+        }
+        # Backends that cannot return ids from a bulk insert re-read them.
+        refetch = 0 if connection.features.can_return_rows_from_bulk_insert else 1
+
+        # Slug check, savepoint, post insert, content version bump, search
+        # index, author lookup, author insert, M2M lookup and insert, search
+        # index, authors snapshot read and write, release and the authors
+        # read for the response.
+        with self.assertNumQueries(14 + refetch):
+            res = self.client.post(POST_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        post = Post.objects.get(id = res.data['id'])
+        self.assertEqual(post.authors.count(), 50)
+        self.assertEqual(Author.objects.filter(user = self.user).count(), 50)
+
+    def test_create_post_with_existing_authors_query_count(self):
+        """Test existing authors are resolved with a single lookup"""
+        authors = author_payloads(50)
+        for author in authors:
+            Author.objects.create(user = self.user, **author)
+        payload = {
+            'title' : 'Sample Title',
+            'description' : 'Sample Description',
+            'img_description' : 'http://placehold.png',
+            'slug' : 'slug-test',
+            'authors' : authors + authors[:5],
+        }
+
+        with self.assertNumQueries(13):
+            res = self.client.post(POST_URL, payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data['authors']), 50)
+        self.assertEqual(Author.objects.filter(user = self.user).count(), 50)
+
+    def test_update_post_authors_query_count(self):
+        """Test replacing post authors does not query per author"""
+        post = create_post(user = self.user)
+        payload = {'authors' : author_payloads(50)}
+        refetch = 0 if connection.features.can_return_rows_from_bulk_insert else 1
+
+        # Post and authors lookup, savepoint, author lookup, author insert,
+        # current authors, M2M lookup, insert, search index and authors
+        # snapshot read and write, post update, content version bump, search
+        # index, release and the authors read for the response.
+        with self.assertNumQueries(16 + refetch):
+            res = self.client.patch(detail_url(post.id), payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(post.authors.count(), 50)
+
+    def author_link_writes(self, payload, post):
+        """Patch post with payload and return the M2M writes and signals"""
+        actions = []
+
+        def record(sender, action, **kwargs):
+            actions.append(action)
+
+        m2m_changed.connect(record, sender = Post.authors.through)
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.patch(detail_url(post.id), payload, format = 'json')
+                writes = [
+                    query['sql'].split()[0] for query in queries
+                    if 'core_post_authors' in query['sql']
+                    and search.TABLE not in query['sql']
+                    and not query['sql'].startswith('SELECT')
+                ]
+        finally:
+            m2m_changed.disconnect(record, sender = Post.authors.through)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return writes, actions
+
+    def test_unchanged_authors_not_rewritten(self):
+        """Test sending the current authors writes no M2M rows"""
+        post = create_post(user = self.user)
+        payload = {'authors' : author_payloads(3)}
+        self.client.patch(detail_url(post.id), payload, format = 'json')
+        link_ids = list(Post.authors.through.objects.values_list('id', flat = True))
+
+        writes, actions = self.author_link_writes(payload, post)
+
+        self.assertEqual(writes, [])
+        self.assertEqual(actions, [])
+        self.assertEqual(
+            list(Post.authors.through.objects.values_list('id', flat = True)),
+            link_ids,
+        )
+
+    def test_changed_authors_write_delta(self):
+        """Test only removed and added authors are written"""
+        post = create_post(user = self.user)
+        authors = author_payloads(3)
+        self.client.patch(detail_url(post.id), {'authors' : authors[:2]}, format = 'json')
+        kept = Post.authors.through.objects.get(author__name = 'Author 0')
+
+        writes, actions = self.author_link_writes({'authors' : [authors[0], authors[2]]}, post)
+
+        self.assertEqual(writes, ['DELETE', 'INSERT'])
+        self.assertEqual(actions, ['pre_remove', 'post_remove', 'pre_add', 'post_add'])
+        self.assertEqual(
+            set(post.authors.values_list('name', flat = True)),
+            {'Author 0', 'Author 2'},
+        )
+        self.assertTrue(Post.authors.through.objects.filter(id = kept.id).exists())
+
+    def test_create_post_authors_rolled_back_on_error(self):
+        """Test a failing author insert leaves no post behind"""
+        payload = {
+            'title' : 'Sample Title',
+            'description' : 'Sample Description',
+            'img_description' : 'http://placehold.png',
+            'slug' : 'slug-test',
+            'authors' : author_payloads(3),
+        }
+
+        with patch(
+            'post.serializers.Author.objects.bulk_create',
+            side_effect = RuntimeError,
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.post(POST_URL, payload, format = 'json')
+
+        self.assertFalse(Post.objects.filter(user = self.user).exists())
+
+    def test_create_post_duplicate_slug_error(self):
+        """Test creating a post with a slug the user already has fails"""
+        create_post(user = self.user, slug = 'taken-slug')
+        payload = {
+            'title' : 'Sample Title',
+            'description' : 'Sample Description',
+            'img_description' : 'http://placehold.png',
+            'slug' : 'taken-slug',
+        }
+
+        res = self.client.post(POST_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('slug', res.data)
+        self.assertEqual(Post.objects.filter(user = self.user).count(), 1)
+
+    def test_slug_unique_per_user_only(self):
+        """Test different users can use the same slug"""
+        other_user = create_user(email = 'other@example.com', password = 'test123')
+        create_post(user = other_user, slug = 'shared-slug')
+        payload = {
+            'title' : 'Sample Title',
+            'description' : 'Sample Description',
+            'img_description' : 'http://placehold.png',
+            'slug' : 'shared-slug',
+        }
+
+        res = self.client.post(POST_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_update_post_keeps_own_slug(self):
+        """Test updating a post with its current slug is allowed"""
+        post = create_post(user = self.user, slug = 'own-slug')
+        payload = {
+            'title' : 'New Title',
+            'description' : post.description,
+            'img_description' : post.img_description,
+            'slug' : 'own-slug',
+        }
+
+        res = self.client.put(detail_url(post.id), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_filter_posts_by_authors(self):
+        """Test ?authors= lists each post of any given author once"""
+        ann, bob, cy = (
+            Author.objects.create(user = self.user, **payload)
+            for payload in author_payloads(3)
+        )
+        both = create_post(user = self.user)
+        both.authors.add(ann, bob)
+        only_bob = create_post(user = self.user)
+        only_bob.authors.add(bob)
+        create_post(user = self.user).authors.add(cy)
+        create_post(user = self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(POST_URL, {'authors': f'{ann.id},{bob.id}'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [post['id'] for post in res.data['results']],
+            [only_bob.id, both.id],
+        )
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('DISTINCT', queries[-1]['sql'])
+        self.assertIn('EXISTS', queries[-1]['sql'])
+
+    def test_filter_posts_by_authors_rejects_bad_ids(self):
+        """Test ?authors= must be a list of ids"""
+        for value in ['', 'one', '1,-2', '\u00b2', '99999999999999999999999']:
+            res = self.client.get(POST_URL, {'authors': value})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('authors', res.data)
+
+    def test_filter_posts_by_authors_rejected_with_search(self):
+        """Test ?authors= cannot be combined with a search query"""
+        res = self.client.get(POST_URL, {'authors': '1', 'q': 'Post'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('authors', res.data)
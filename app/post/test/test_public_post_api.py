@@ -0,0 +1,165 @@
+"""
+Tests for the public post API
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Author, Post
+from post.serializers import PostSerializer
+
+LOCMEM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'public-post-tests',
+    }
+}
+
+
+def public_url(slug):
+    """Create and return a public post url"""
+    return reverse('post:public-post', args = [slug])
+
+def post_url(post_id):
+    """Create and return a private post detail url"""
+    return reverse('post:post-detail', args = [post_id])
+
+def author_url(author_id):
+    """Create and return an author detail url"""
+    return reverse('post:author-detail', args = [author_id])
+
+def create_post(user, **params):
+    """Create and return a sample post"""
+    defaults = {
+        'title' : 'Post Title',
+        'description' : 'Post description',
+        'img_description' : 'http://placehold.it',
+        'slug' : 'public-slug',
+    }
+    defaults.update(params)
+    return Post.objects.create(user = user, **defaults)
+
+def create_user(email = 'user@example.com', password = 'testpassword123'):
+    """Create and return a new user"""
+    return get_user_model().objects.create_user(email = email, password = password)
+
+
+@override_settings(CACHES = LOCMEM_CACHES)
+class PublicPostAPITests(TestCase):
+    """Test anonymous post retrieval by slug"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+
+    def test_retrieve_post_by_slug(self):
+        """Test a post can be read by slug without authentication"""
+        post = create_post(user = self.user)
+        author = Author.objects.create(
+            user = self.user,
+            name = 'Raul',
+            link = 'http://www.raul.com',
+            profile_picture = 'http://www.profile.com',
+            description = 'Sample Test Description Raul',
+        )
+        post.authors.add(author)
+
+        res = self.client.get(public_url(post.slug))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, PostSerializer(post).data)
+
+    def test_unknown_slug_not_found(self):
+        """Test an unknown slug returns 404"""
+        res = self.client.get(public_url('missing'))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_shared_slug_returns_oldest_post(self):
+        """Test the oldest post wins when users share a slug"""
+        post = create_post(user = self.user, title = 'First')
+        create_post(user = create_user(email = 'other@example.com'), title = 'Second')
+
+        res = self.client.get(public_url('public-slug'))
+
+        self.assertEqual(res.data['id'], post.id)
+
+    def test_cached_post_served_without_queries(self):
+        """Test a cached post is served without touching the database"""
+        post = create_post(user = self.user)
+        self.client.get(public_url(post.slug))
+
+        with self.assertNumQueries(0):
+            res = self.client.get(public_url(post.slug))
+
+        self.assertEqual(res.data['title'], post.title)
+
+
+@override_settings(CACHES = LOCMEM_CACHES)
+class PublicPostInvalidationTests(TestCase):
+    """Test writes drop the cached public posts"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_update_post_invalidates_cache(self):
+        """Test updating a post refreshes its public payload"""
+        post = create_post(user = self.user)
+        self.client.get(public_url(post.slug))
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.client.patch(post_url(post.id), {'title': 'New Title'})
+        res = self.client.get(public_url(post.slug))
+
+        self.assertEqual(res.data['title'], 'New Title')
+
+    def test_update_slug_invalidates_old_slug(self):
+        """Test changing a slug stops serving the post under the old one"""
+        post = create_post(user = self.user)
+        self.client.get(public_url(post.slug))
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.client.patch(post_url(post.id), {'slug': 'new-slug'})
+
+        res = self.client.get(public_url('public-slug'))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.get(public_url('new-slug'))
+        self.assertEqual(res.data['id'], post.id)
+
+    def test_delete_post_invalidates_cache(self):
+        """Test deleting a post removes it from the public endpoint"""
+        post = create_post(user = self.user)
+        self.client.get(public_url(post.slug))
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.client.delete(post_url(post.id))
+        res = self.client.get(public_url(post.slug))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_update_author_invalidates_cache(self):
+        """Test editing an author refreshes the posts embedding it"""
+        post = create_post(user = self.user)
+        author = Author.objects.create(
+            user = self.user,
+            name = 'Raul',
+            link = 'http://www.raul.com',
+            profile_picture = 'http://www.profile.com',
+            description = 'Sample Test Description Raul',
+        )
+        post.authors.add(author)
+        self.client.get(public_url(post.slug))
+
+        with self.captureOnCommitCallbacks(execute = True):
+            self.client.patch(author_url(author.id), {'name': 'Jesus'})
+        res = self.client.get(public_url(post.slug))
+
+        self.assertEqual(res.data['authors'][0]['name'], 'Jesus')
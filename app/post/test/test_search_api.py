@@ -0,0 +1,189 @@
+"""
+Tests for searching posts
+"""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Author, Post
+from post import search
+
+POST_URL = reverse('post:post-list')
+BULK_URL = reverse('post:post-bulk')
+
+
+def detail_url(post_id):
+    """Create and return a post detail url"""
+    return reverse('post:post-detail', args = [post_id])
+
+
+def create_post(user, **params):
+    """Create and return a sample post"""
+    defaults = {
+        'title' : 'Post Title',
+        'description' : 'Post description',
+        'img_description' : 'http://placehold.it',
+        'slug' : f'slug-test-{uuid.uuid4().hex}',
+    }
+    defaults.update(params)
+
+    return Post.objects.create(user = user, **defaults)
+
+
+def create_author(user, name):
+    """Create and return a sample author"""
+    return Author.objects.create(
+        user = user,
+        name = name,
+        link = 'http://www.author.com',
+        profile_picture = 'http://www.profile.com',
+        description = 'Sample Test Description',
+    )
+
+
+class SearchPostAPITests(TestCase):
+    """Test full-text search on the post list"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, query, **params):
+        return self.client.get(POST_URL, {'q': query, **params})
+
+    def result_ids(self, res):
+        return [post['id'] for post in res.data['results']]
+
+    def test_search_ranks_title_matches_first(self):
+        """Test a title match outranks a description match"""
+        in_description = create_post(
+            user = self.user,
+            title = 'Weekly notes',
+            description = 'Some thoughts on django performance',
+        )
+        in_title = create_post(
+            user = self.user,
+            title = 'Django performance',
+            description = 'Notes',
+        )
+        create_post(user = self.user, title = 'Cooking', description = 'Pasta')
+
+        res = self.search('django perf')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.result_ids(res), [in_title.id, in_description.id])
+
+    def test_search_matches_author_names(self):
+        """Test posts are found by the names of their authors"""
+        post = create_post(user = self.user)
+        post.authors.add(create_author(self.user, 'Ada Lovelace'))
+        create_post(user = self.user)
+
+        res = self.search('lovelace')
+
+        self.assertEqual(self.result_ids(res), [post.id])
+
+    def test_search_limited_to_user(self):
+        """Test other users' posts are never returned"""
+        other = get_user_model().objects.create_user(
+            email = 'other@example.com',
+            password = 'testpassword123',
+        )
+        create_post(user = other, title = 'Django tips')
+        post = create_post(user = self.user, title = 'Django tricks')
+
+        res = self.search('django')
+
+        self.assertEqual(self.result_ids(res), [post.id])
+
+    def test_search_user_id_not_matched_as_text(self):
+        """Test a query of the user's id only matches posts containing it"""
+        create_post(user = self.user, title = 'Django')
+        post = create_post(user = self.user, title = f'Issue {self.user.pk}')
+
+        res = self.search(str(self.user.pk))
+
+        self.assertEqual(self.result_ids(res), [post.id])
+
+    def test_search_without_words(self):
+        """Test a query without searchable words matches nothing"""
+        create_post(user = self.user)
+
+        res = self.search('"*')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [])
+
+    def test_search_follows_updates(self):
+        """Test the index follows edits, author renames and deletes"""
+        post = create_post(user = self.user, title = 'Draft')
+        author = create_author(self.user, 'Grace Hopper')
+        post.authors.add(author)
+
+        self.client.patch(detail_url(post.id), {'title': 'Compilers'})
+        self.assertEqual(self.result_ids(self.search('compilers')), [post.id])
+        self.assertEqual(self.result_ids(self.search('draft')), [])
+
+        author.name = 'Admiral Hopper'
+        author.save()
+        self.assertEqual(self.result_ids(self.search('admiral')), [post.id])
+
+        author.delete()
+        self.assertEqual(self.result_ids(self.search('hopper')), [])
+
+        post.delete()
+        self.assertEqual(self.result_ids(self.search('compilers')), [])
+
+    def test_search_follows_bulk_writes(self):
+        """Test bulk create and update keep the index in sync"""
+        res = self.client.post(BULK_URL, [{
+            'title': 'Bulk loaded',
+            'description': 'Post description',
+            'img_description': 'http://placehold.it',
+            'slug': 'bulk-loaded',
+            'authors': [],
+        }], format = 'json')
+        post_id = res.data['results'][0]['data']['id']
+        self.assertEqual(self.result_ids(self.search('bulk')), [post_id])
+
+        self.client.patch(BULK_URL, [
+            {'id': post_id, 'title': 'Renamed'},
+        ], format = 'json')
+        self.assertEqual(self.result_ids(self.search('renamed')), [post_id])
+        self.assertEqual(self.result_ids(self.search('bulk')), [])
+
+    def test_search_pagination(self):
+        """Test search results are paged by number"""
+        posts = [create_post(user = self.user, title = 'Django') for i in range(3)]
+
+        res = self.search('django', page_size = 2)
+
+        self.assertEqual(self.result_ids(res), [posts[2].id, posts[1].id])
+        self.assertIsNone(res.data['previous'])
+        res = self.client.get(res.data['next'])
+        self.assertEqual(self.result_ids(res), [posts[0].id])
+        self.assertIsNone(res.data['next'])
+        self.assertIsNotNone(res.data['previous'])
+
+    def test_index_posts_in_batches(self):
+        """Test posts indexed batch by batch from a queryset are all found"""
+        posts = [create_post(user = self.user, title = 'Django') for i in range(5)]
+        search.remove_posts(post.id for post in posts)
+        self.assertEqual(self.result_ids(self.search('django')), [])
+
+        search.index_posts(
+            Post.objects.filter(user = self.user).values_list('id', flat = True),
+            batch_size = 2,
+        )
+
+        res = self.search('django', page_size = 10)
+        self.assertEqual(self.result_ids(res), [post.id for post in reversed(posts)])
@@ -0,0 +1,149 @@
+"""
+Tests for the denormalized post author snapshots
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Author, Post
+from post.serializers import AuthorSerializer
+
+POST_URL = reverse('post:post-list')
+BULK_URL = reverse('post:post-bulk')
+
+
+def post_detail_url(post_id):
+    """Create and return a post detail url"""
+    return reverse('post:post-detail', args = [post_id])
+
+
+def author_detail_url(author_id):
+    """Create and return an author detail url"""
+    return reverse('post:author-detail', args = [author_id])
+
+
+def author_payload(name):
+    """Return an author payload"""
+    return {
+        'name' : name,
+        'link' : 'http://www.author.com',
+        'profile_picture' : 'http://www.profile.com',
+        'description' : 'Sample Test Description',
+    }
+
+
+def post_payload(slug, *author_names):
+    """Return a post payload with the named authors"""
+    return {
+        'title' : 'Post Title',
+        'description' : 'Post description',
+        'img_description' : 'http://placehold.it',
+        'slug' : slug,
+        'authors' : [author_payload(name) for name in author_names],
+    }
+
+
+class AuthorSnapshotTests(TestCase):
+    """Test snapshots follow every change to a post's authors"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email = 'user@example.com',
+            password = 'testpassword123',
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_post(self, slug, *author_names):
+        res = self.client.post(POST_URL, post_payload(slug, *author_names), format = 'json')
+        return Post.objects.get(id = res.data['id'])
+
+    def snapshot_names(self, post):
+        post.refresh_from_db()
+        return [author['name'] for author in post.authors_snapshot]
+
+    def expected_snapshot(self, post):
+        return AuthorSerializer(post.authors.order_by('id'), many = True).data
+
+    def test_snapshot_follows_post_writes(self):
+        """Test creating and updating a post keeps its snapshot current"""
+        post = self.create_post('post', 'Ann', 'Bob')
+        self.assertEqual(self.snapshot_names(post), ['Ann', 'Bob'])
+        self.assertEqual(post.authors_snapshot, self.expected_snapshot(post))
+
+        self.client.patch(post_detail_url(post.id), {
+            'authors': [author_payload('Bob'), author_payload('Cy')],
+        }, format = 'json')
+        self.assertEqual(self.snapshot_names(post), ['Bob', 'Cy'])
+
+        self.client.patch(post_detail_url(post.id), {'authors': []}, format = 'json')
+        self.assertEqual(self.snapshot_names(post), [])
+
+    def test_snapshot_follows_author_edits(self):
+        """Test editing or deleting an author updates its posts' snapshots"""
+        first = self.create_post('first', 'Ann', 'Bob')
+        second = self.create_post('second', 'Ann')
+        ann = Author.objects.get(name = 'Ann')
+
+        self.client.patch(author_detail_url(ann.id), {'name': 'Anne'})
+        self.assertEqual(self.snapshot_names(first), ['Anne', 'Bob'])
+        self.assertEqual(self.snapshot_names(second), ['Anne'])
+
+        self.client.delete(author_detail_url(ann.id))
+        self.assertEqual(self.snapshot_names(first), ['Bob'])
+        self.assertEqual(self.snapshot_names(second), [])
+
+    def test_snapshot_follows_bulk_writes(self):
+        """Test bulk creates and updates refresh the snapshots they touch"""
+        res = self.client.post(BULK_URL, [
+            post_payload('one', 'Ann'),
+            post_payload('two'),
+        ], format = 'json')
+        one, two = (Post.objects.get(id = item['data']['id']) for item in res.data['results'])
+        self.assertEqual(self.snapshot_names(one), ['Ann'])
+        self.assertEqual(self.snapshot_names(two), [])
+
+        self.client.patch(BULK_URL, [
+            {'id': one.id, 'authors': [author_payload('Bob')]},
+        ], format = 'json')
+        self.assertEqual(self.snapshot_names(one), ['Bob'])
+
+    def test_missing_snapshot_read_from_author_tables(self):
+        """Test posts without a snapshot still list their authors"""
+        post = self.create_post('post', 'Ann')
+        with_snapshot = self.client.get(POST_URL).content
+        Post.objects.filter(id = post.id).update(authors_snapshot = None)
+
+        res = self.client.get(post_detail_url(post.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['authors'][0]['name'], 'Ann')
+        self.assertEqual(self.client.get(POST_URL).content, with_snapshot)
+
+    def test_check_and_rebuild_commands(self):
+        """Test the checker reports stale snapshots and the rebuild fixes them"""
+        stale = self.create_post('stale', 'Ann')
+        missing = self.create_post('missing', 'Bob')
+        self.create_post('current', 'Cy')
+        Post.objects.filter(id = stale.id).update(authors_snapshot = [])
+        Post.objects.filter(id = missing.id).update(authors_snapshot = None)
+
+        with self.assertRaisesMessage(CommandError, f'2 stale author snapshots: {stale.id}, {missing.id}.'):
+            call_command('check_author_snapshots', batch_size = 2)
+
+        out = StringIO()
+        call_command('rebuild_author_snapshots', missing = True, stdout = out)
+        self.assertIn('Rebuilt 1 author snapshots.', out.getvalue())
+        self.assertEqual(self.snapshot_names(missing), ['Bob'])
+
+        call_command('check_author_snapshots', fix = True, stdout = StringIO())
+        self.assertEqual(self.snapshot_names(stale), ['Ann'])
+        out = StringIO()
+        call_command('check_author_snapshots', stdout = out)
+        self.assertIn('All author snapshots are consistent.', out.getvalue())
@@ -5,7 +5,7 @@ from django.urls import (
     path, include
 )
 from rest_framework.routers import DefaultRouter
-from post import views
+from post import async_views, views
 
 router = DefaultRouter()
 router.register('posts', views.PostViewSet)
@@ -14,5 +14,12 @@ router.register('authors', views.AuthorViewSet)
 app_name = 'post'
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router.urls)),
+    path('public/<str:slug>/', views.PublicPostView.as_view(), name = 'public-post'),
+    path('async/posts/', async_views.post_list, name = 'async-post-list'),
+    path(
+        'async/posts/<int:pk>/',
+        async_views.post_detail,
+        name = 'async-post-detail',
+    ),
 ]
\ No newline at end of file
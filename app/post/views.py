@@ -1,30 +1,366 @@
 """
 Views for post APIs
 """
-from rest_framework import viewsets, mixins
-from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import generics, status, viewsets, mixins
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 
+from core.authentication import CachedTokenAuthentication
+from core.middleware import serialization_timer
 from core.models import Post, Author
-from post import serializers
+from post import bulk, search, serializers
+from post.cache import invalidate_public_posts, public_post_key
+from post.mixins import ConditionalGetMixin
+from post.pagination import (
+    AuthorCursorPagination,
+    PostCursorPagination,
+    SearchPagination,
+)
+from post.renderers import NDJSONRenderer
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """View for manage post APIs."""
     serializer_class = serializers.PostSerializer
     queryset = Post.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = PostCursorPagination
 
     def get_queryset(self):
-        """Retrieve posts fot authenticated user."""
-        return self.queryset.filter(user = self.request.user).order_by('-id')
+        """Retrieve posts fot authenticated user.
+
+        Lists and exports keep only the posts of ?authors=1,2,3. Searches
+        page through ranked ids, so _search rejects ?authors= with ?q=
+        rather than return short pages or ignore it.
+        """
+        queryset = self.queryset.filter(
+            user = self.request.user
+        ).prefetch_related(serializers.authors_prefetch()).order_by('-id')
+        if self.action == 'export' or (
+            self.action == 'list' and 'q' not in self.request.query_params
+        ):
+            author_ids = serializers.query_ids(self.request.query_params, 'authors')
+            if author_ids is not None:
+                queryset = serializers.filter_posts_by_authors(queryset, author_ids)
+        return queryset
     
+    def list(self, request, *args, **kwargs):
+        """List posts, or search them when a q parameter is given."""
+        if 'q' in request.query_params:
+            return self.conditional_response(self._search, request)
+        return self.conditional_response(self._list, request)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a post, narrowed by the fields and expand parameters."""
+        return self.conditional_response(self._retrieve, request, *args, **kwargs)
+
+    def get_fieldset(self):
+        """Return the post fields and author expansion the request asks for"""
+        return serializers.post_fieldset(self.request.query_params)
+
+    def get_rows(self, queryset):
+        """Return value rows of queryset holding only the requested fields"""
+        return serializers.post_rows(queryset, self.get_fieldset()[0])
+
+    def serialize_rows(self, rows):
+        """Return post rows rendered with only the requested fields"""
+        with serialization_timer(self.request):
+            return serializers.serialize_post_rows(rows, *self.get_fieldset())
+
+    def _retrieve(self, request, pk = None):
+        """Return one of the user's posts built from a value row"""
+        row = generics.get_object_or_404(self.get_rows(self.get_queryset()), pk = pk)
+        return Response(self.serialize_rows([row])[0])
+
+    def _list(self, request):
+        """Return a page of the user's posts built from value rows"""
+        rows = self.paginate_queryset(self.get_rows(self.get_queryset()))
+        return self.get_paginated_response(self.serialize_rows(rows))
+
+    def _search(self, request):
+        """Return a page of the user's posts ranked against q"""
+        if 'authors' in request.query_params:
+            raise ValidationError(
+                {'authors': ['Cannot be combined with a search query.']}
+            )
+        paginator = SearchPagination()
+        ids = paginator.paginate_search(
+            lambda limit, offset: search.search_post_ids(
+                request.user,
+                request.query_params['q'],
+                limit,
+                offset,
+            ),
+            request,
+        )
+        rows = {
+            row['id']: row
+            for row in self.get_rows(self.get_queryset().filter(id__in = ids))
+        }
+        data = self.serialize_rows([rows[i] for i in ids if i in rows])
+        return paginator.get_paginated_response(data)
+
     def perform_create(self, serializer):
         """Create a new post"""
         serializer.save(user = self.request.user)
 
+    def perform_destroy(self, instance):
+        """Delete a post and drop its public cache entry"""
+        instance.delete()
+        invalidate_public_posts([instance.slug])
+
+    @action(detail = False, methods = ['get'], renderer_classes = [NDJSONRenderer])
+    def export(self, request):
+        """Stream every post of the user as newline-delimited JSON."""
+        queryset = self.get_rows(self.get_queryset())
+        renderer = request.accepted_renderer
+        return StreamingHttpResponse(
+            self._export_lines(queryset, renderer, settings.POST_EXPORT_CHUNK_SIZE),
+            content_type = renderer.media_type,
+        )
+
+    def _export_lines(self, rows, renderer, chunk_size):
+        """Yield rendered posts, loading rows and authors chunk by chunk"""
+        chunk = []
+        for row in rows.iterator(chunk_size = chunk_size):
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield self._export_chunk(chunk, renderer)
+                chunk = []
+        if chunk:
+            yield self._export_chunk(chunk, renderer)
+
+    def _export_chunk(self, rows, renderer):
+        """Render one chunk of post rows after loading their authors"""
+        return b''.join(
+            renderer.render_line(item)
+            for item in self.serialize_rows(rows)
+        )
+
+    @action(detail = False, methods = ['post', 'patch', 'delete'], url_path = 'bulk')
+    def bulk(self, request):
+        """Create, update or delete many posts in a single transaction."""
+        handlers = {
+            'POST': self._bulk_create,
+            'PATCH': self._bulk_update,
+            'DELETE': self._bulk_delete,
+        }
+        return handlers[request.method](request)
+
+    def _bulk_list(self, data, name):
+        """Validate the size of a bulk payload list and return it"""
+        if not isinstance(data, list) or not data:
+            raise ValidationError({name: ['Expected a non-empty list.']})
+        limit = settings.POST_BULK_MAX_ITEMS
+        if len(data) > limit:
+            raise ValidationError({name: [f'At most {limit} items are allowed.']})
+        return data
+
+    def _bulk_failure(self, results):
+        """Return a 400 with per-item results if any item failed, else None"""
+        if all(result is None for result in results):
+            return None
+        return Response(
+            {'results': [
+                result or {'status': status.HTTP_424_FAILED_DEPENDENCY}
+                for result in results
+            ]},
+            status = status.HTTP_400_BAD_REQUEST,
+        )
+
+    def _check_bulk_slugs(self, serializers_, results, exclude_ids = ()):
+        """Record an error for items whose final slug would not be unique"""
+        slugs = {}
+        for index, serializer in enumerate(serializers_):
+            if results[index] is None:
+                instance = serializer.instance
+                default = instance.slug if instance is not None else None
+                slugs[index] = serializer.validated_data.get('slug', default)
+
+        taken = set(
+            Post.objects.filter(
+                user = self.request.user,
+                slug__in = set(slugs.values()),
+            ).exclude(
+                id__in = exclude_ids
+            ).values_list('slug', flat = True)
+        )
+        seen = set()
+        for index, slug in slugs.items():
+            if slug in taken or slug in seen:
+                results[index] = {
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': {'slug': ['You already have a post with this slug.']},
+                }
+            seen.add(slug)
+
+    def _bulk_create(self, request):
+        items = self._bulk_list(request.data, 'non_field_errors')
+        context = self.get_serializer_context()
+        serializers_ = [
+            serializers.PostBulkSerializer(data = item, context = context)
+            for item in items
+        ]
+        results = [
+            None if serializer.is_valid() else {
+                'status': status.HTTP_400_BAD_REQUEST,
+                'errors': serializer.errors,
+            }
+            for serializer in serializers_
+        ]
+        self._check_bulk_slugs(serializers_, results)
+        failed = self._bulk_failure(results)
+        if failed is not None:
+            return failed
+
+        try:
+            posts = bulk.create_posts(
+                request.user,
+                [serializer.validated_data for serializer in serializers_],
+            )
+        except IntegrityError:
+            return Response(
+                {'detail': 'A concurrent write conflicted with this batch.'},
+                status = status.HTTP_409_CONFLICT,
+            )
+        with serialization_timer(request):
+            data = serializers.PostSerializer(posts, many = True).data
+        return Response(
+            {'results': [
+                {'status': status.HTTP_201_CREATED, 'data': item} for item in data
+            ]},
+            status = status.HTTP_201_CREATED,
+        )
+
+    def _bulk_update(self, request):
+        items = self._bulk_list(request.data, 'non_field_errors')
+        ids = [
+            item.get('id') if isinstance(item, dict) else None
+            for item in items
+        ]
+        # Missing ids and ids other than ints are reported per item and
+        # never queried.
+        id_errors = [
+            None if isinstance(post_id, int) and not isinstance(post_id, bool)
+            else 'This field is required.' if post_id is None
+            else 'Expected a post id.'
+            for post_id in ids
+        ]
+        valid_ids = [
+            post_id for post_id, error in zip(ids, id_errors) if error is None
+        ]
+        posts = Post.objects.filter(user = request.user).in_bulk(valid_ids)
+        context = self.get_serializer_context()
+        serializers_ = []
+        results = []
+        seen = set()
+        for post_id, id_error, item in zip(ids, id_errors, items):
+            serializer = serializers.PostBulkSerializer(
+                None if id_error else posts.get(post_id),
+                data = item,
+                partial = True,
+                context = context,
+            )
+            serializers_.append(serializer)
+            if id_error:
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': {'id': [id_error]},
+                })
+            elif post_id not in posts:
+                results.append({
+                    'status': status.HTTP_404_NOT_FOUND,
+                    'errors': {'id': ['Not found.']},
+                })
+            elif post_id in seen:
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': {'id': ['Duplicate id in batch.']},
+                })
+            elif not serializer.is_valid():
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': serializer.errors,
+                })
+            else:
+                results.append(None)
+            if not id_error:
+                seen.add(post_id)
+        self._check_bulk_slugs(serializers_, results, exclude_ids = valid_ids)
+        failed = self._bulk_failure(results)
+        if failed is not None:
+            return failed
+
+        try:
+            updated = bulk.update_posts(
+                request.user,
+                [serializer.instance for serializer in serializers_],
+                [serializer.validated_data for serializer in serializers_],
+            )
+        except IntegrityError:
+            return Response(
+                {'detail': 'A concurrent write conflicted with this batch.'},
+                status = status.HTTP_409_CONFLICT,
+            )
+        with serialization_timer(request):
+            data = serializers.PostSerializer(updated, many = True).data
+        return Response({'results': [
+            {'status': status.HTTP_200_OK, 'data': item} for item in data
+        ]})
+
+    def _bulk_delete(self, request):
+        data = request.data if isinstance(request.data, dict) else {}
+        ids = self._bulk_list(data.get('ids'), 'ids')
+        if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise ValidationError({'ids': ['Expected a list of post ids.']})
+
+        deleted = bulk.delete_posts(request.user, ids)
+        return Response({'results': [
+            {
+                'id': post_id,
+                'status': (
+                    status.HTTP_204_NO_CONTENT if post_id in deleted
+                    else status.HTTP_404_NOT_FOUND
+                ),
+            }
+            for post_id in ids
+        ]})
+
+
+class PublicPostView(generics.RetrieveAPIView):
+    """Retrieve a post by slug without authentication."""
+    serializer_class = serializers.PostSerializer
+    queryset = Post.objects.all()
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def retrieve(self, request, *args, **kwargs):
+        """Serve the post from the cache, loading it on a miss."""
+        slug = self.kwargs['slug']
+        key = public_post_key(slug)
+        data = cache.get(key)
+        if data is None:
+            # Slugs are unique per user; the oldest post owns a shared slug.
+            post = self.queryset.filter(
+                slug = slug
+            ).prefetch_related(serializers.authors_prefetch()).order_by('id').first()
+            if post is None:
+                raise Http404
+            data = self.get_serializer(post).data
+            cache.set(key, data, settings.PUBLIC_POST_CACHE_TIMEOUT)
+        return Response(data)
+
 
 class AuthorViewSet(
+        ConditionalGetMixin,
         mixins.DestroyModelMixin,
                  mixins.UpdateModelMixin,
                  mixins.ListModelMixin,
@@ -32,9 +368,54 @@ class AuthorViewSet(
     """Manage authors in database"""
     serializer_class = serializers.AuthorSerializer
     queryset = Author.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = AuthorCursorPagination
 
     def get_queryset(self):
-        """Filter queryset to authenticated user."""
-        return self.queryset.filter(user = self.request.user).order_by('-name')
\ No newline at end of file
+        """Filter queryset to authenticated user.
+
+        On lists ?assigned_only=1 keeps the authors of at least one post and
+        ?with_counts=1 adds post_count and last_post_id. Both are correlated
+        subqueries on the author's links, so they run for the page's rows
+        only, through the author_id index, inside the page query.
+        """
+        queryset = self.queryset.filter(user = self.request.user)
+        if self.action == 'list':
+            links = Post.authors.through.objects.filter(
+                author_id = OuterRef('pk'),
+            ).order_by().values('author_id')
+            if serializers.query_flag(self.request.query_params, 'assigned_only'):
+                queryset = queryset.filter(Exists(links))
+            if serializers.query_flag(self.request.query_params, 'with_counts'):
+                queryset = queryset.annotate(
+                    post_count = Coalesce(
+                        Subquery(links.annotate(count = Count('post_id')).values('count')),
+                        0,
+                    ),
+                    last_post_id = Subquery(
+                        links.annotate(last = Max('post_id')).values('last')
+                    ),
+                )
+        return queryset.order_by('-name', 'id')
+
+    def get_serializer_class(self):
+        """Return the counting serializer for lists asking ?with_counts=1"""
+        if self.action == 'list' and serializers.query_flag(
+            self.request.query_params,
+            'with_counts',
+        ):
+            return serializers.AuthorCountSerializer
+        return self.serializer_class
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Update an author, with its posts' snapshots, and drop their cache"""
+        author = serializer.save()
+        invalidate_public_posts(author.post_set.values_list('slug', flat = True))
+
+    def perform_destroy(self, instance):
+        """Delete an author and drop the cached posts embedding it"""
+        slugs = list(instance.post_set.values_list('slug', flat = True))
+        instance.delete()
+        invalidate_public_posts(slugs)
@@ -0,0 +1,43 @@
+"""
+Async views for the user API, meant for the ASGI deployment
+"""
+from django.http import HttpResponseNotAllowed
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.async_utils import error_response, render_json, run_sync
+from core.throttling import LoginThrottle, check_throttle
+from user.serializers import AuthTokenSerializer
+
+
+def _obtain_token(request):
+    check_throttle(LoginThrottle(), request)
+    serializer = AuthTokenSerializer(data = request.data, context = {'request': request})
+    serializer.is_valid(raise_exception = True)
+    token, created = Token.objects.get_or_create(user = serializer.validated_data['user'])
+    return {'token': token.key}
+
+
+async def create_token(request):
+    """Create a token for valid credentials without blocking the event loop.
+
+    The password check waits on the hashing pool from a worker thread, so
+    a burst of logins leaves the loop free to serve other requests.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    request = Request(
+        request,
+        parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+    )
+    try:
+        data = await run_sync(_obtain_token, request)
+    except exceptions.APIException as exc:
+        return error_response(exc)
+    return render_json(data)
+
+
+# Token requests carry credentials, not a session, like the DRF views.
+create_token.csrf_exempt = True
@@ -0,0 +1,170 @@
+"""
+Batched deletion of accounts.
+
+Deleting a user through the ORM makes the collector load every post,
+author and author link of the user and send signals for each of them.
+Instead an AccountDeletion records the request, the user is deactivated
+and their content is deleted with plain DELETE statements, batch_size rows
+per transaction. Each batch records its progress on the deletion and the
+rows left are found again by user, so an interrupted deletion resumes
+where it stopped. The search documents and public post cache entries the
+skipped signals would have dropped are dropped batch by batch.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import AccountDeletion, Author, Post
+from post import search, snapshots
+from post.cache import invalidate_public_posts
+
+logger = logging.getLogger(__name__)
+
+PostAuthor = Post.authors.through
+
+
+def request_deletion(user, start = True):
+    """Deactivate user and return their unfinished deletion, creating it.
+
+    Unless start is false, the deletion starts once the transaction commits.
+    """
+    with transaction.atomic():
+        # Serializes concurrent requests of the same user.
+        get_user_model().objects.select_for_update().filter(pk = user.pk).exists()
+        deletion = AccountDeletion.objects.filter(
+            user_id = user.pk,
+        ).exclude(status = AccountDeletion.DONE).first()
+        if deletion is None:
+            deletion = AccountDeletion.objects.create(
+                user_id = user.pk,
+                posts_total = Post.objects.filter(user = user).count(),
+                authors_total = Author.objects.filter(user = user).count(),
+            )
+        user.is_active = False
+        user.save(update_fields = ['is_active'])
+        if start:
+            transaction.on_commit(lambda: start_deletion(deletion.pk))
+    return deletion
+
+
+def start_deletion(deletion_id):
+    """Run a deletion, in a background thread if so configured"""
+    if not settings.ACCOUNT_DELETION_IN_BACKGROUND:
+        run_deletion(deletion_id)
+        return
+    threading.Thread(
+        target = _run_in_background,
+        args = (deletion_id,),
+        name = f'account-deletion-{deletion_id}',
+        daemon = True,
+    ).start()
+
+
+def _run_in_background(deletion_id):
+    try:
+        run_deletion(deletion_id)
+    except Exception:
+        logger.exception('Account deletion %s failed', deletion_id)
+    finally:
+        connections.close_all()
+
+
+def _delete_rows(model, column, ids):
+    """Delete the rows of model whose column is in ids, skipping the collector"""
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(column)} IN ({placeholders})',
+            list(ids),
+        )
+        return cursor.rowcount
+
+
+def _record(deletion, **changes):
+    AccountDeletion.objects.filter(pk = deletion.pk).update(
+        updated_at = timezone.now(),
+        **changes,
+    )
+
+
+def _delete_post_batch(deletion, batch_size):
+    """Delete one batch of the user's posts; return False when none are left"""
+    with transaction.atomic():
+        posts = list(
+            Post.objects.filter(user_id = deletion.user_id).order_by('id').values_list(
+                'id',
+                'slug',
+            )[:batch_size]
+        )
+        if not posts:
+            return False
+        post_ids = [post_id for post_id, slug in posts]
+        _delete_rows(PostAuthor, 'post_id', post_ids)
+        search.remove_posts(post_ids)
+        deleted = _delete_rows(Post, 'id', post_ids)
+        invalidate_public_posts(slug for post_id, slug in posts)
+        _record(deletion, posts_deleted = F('posts_deleted') + deleted)
+    return True
+
+
+def _delete_author_batch(deletion, batch_size):
+    """Delete one batch of the user's authors; return False when none are left"""
+    with transaction.atomic():
+        author_ids = list(
+            Author.objects.filter(user_id = deletion.user_id).order_by('id').values_list(
+                'id',
+                flat = True,
+            )[:batch_size]
+        )
+        if not author_ids:
+            return False
+        # The user's posts are gone; links left belong to other users' posts.
+        post_ids = list(PostAuthor.objects.filter(
+            author_id__in = author_ids,
+        ).values_list('post_id', flat = True).distinct())
+        _delete_rows(PostAuthor, 'author_id', author_ids)
+        deleted = _delete_rows(Author, 'id', author_ids)
+        if post_ids:
+            snapshots.refresh_snapshots(post_ids)
+            search.index_posts(post_ids)
+            invalidate_public_posts(
+                Post.objects.filter(id__in = post_ids).values_list('slug', flat = True)
+            )
+        _record(deletion, authors_deleted = F('authors_deleted') + deleted)
+    return True
+
+
+def run_deletion(deletion_id, batch_size = None, progress = None):
+    """Delete the posts, authors and then the user of a deletion.
+
+    progress, if given, is called with the refreshed deletion after every
+    batch. A failure marks the deletion failed and is raised again; running
+    it again resumes with the rows that are left. Return the deletion.
+    """
+    batch_size = batch_size or settings.ACCOUNT_DELETION_BATCH_SIZE
+    deletion = AccountDeletion.objects.get(pk = deletion_id)
+    if deletion.status == AccountDeletion.DONE:
+        return deletion
+    _record(deletion, status = AccountDeletion.RUNNING, error = '')
+    try:
+        for delete_batch in (_delete_post_batch, _delete_author_batch):
+            while delete_batch(deletion, batch_size):
+                if progress is not None:
+                    deletion.refresh_from_db()
+                    progress(deletion)
+        with transaction.atomic():
+            # Only tokens and permission links are left for the collector.
+            get_user_model().objects.filter(pk = deletion.user_id).delete()
+            _record(deletion, status = AccountDeletion.DONE, finished_at = timezone.now())
+    except Exception as exc:
+        _record(deletion, status = AccountDeletion.FAILED, error = repr(exc))
+        raise
+    deletion.refresh_from_db()
+    return deletion
@@ -0,0 +1,60 @@
+"""
+Delete accounts batch by batch, or resume the deletions left unfinished
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import AccountDeletion
+from user import deletion
+
+
+class Command(BaseCommand):
+    help = (
+        'Run every unfinished account deletion, e.g. after a worker stopped, '
+        'or delete the accounts of the given emails.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('emails', nargs = '*', help = 'accounts to delete')
+        parser.add_argument(
+            '--batch-size',
+            type = int,
+            default = settings.ACCOUNT_DELETION_BATCH_SIZE,
+        )
+
+    def report(self, account_deletion):
+        self.stdout.write(
+            f'User {account_deletion.user_id}: '
+            f'{account_deletion.posts_deleted}/{account_deletion.posts_total} posts, '
+            f'{account_deletion.authors_deleted}/{account_deletion.authors_total} authors'
+        )
+
+    def handle(self, *args, emails, batch_size, **options):
+        users = get_user_model().objects.filter(email__in = emails)
+        missing = set(emails).difference(user.email for user in users)
+        if missing:
+            raise CommandError(f'No user with email: {", ".join(sorted(missing))}.')
+        for user in users:
+            deletion.request_deletion(user, start = False)
+
+        failed = 0
+        unfinished = AccountDeletion.objects.exclude(
+            status = AccountDeletion.DONE,
+        ).order_by('created_at')
+        for account_deletion in unfinished:
+            try:
+                account_deletion = deletion.run_deletion(
+                    account_deletion.pk,
+                    batch_size,
+                    progress = self.report,
+                )
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'User {account_deletion.user_id} failed: {exc!r}')
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f'Deleted user {account_deletion.user_id}.'
+            ))
+        if failed:
+            raise CommandError(f'{failed} account deletions failed.')
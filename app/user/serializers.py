@@ -8,6 +8,8 @@ from django.contrib.auth import (
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
+from core.models import AccountDeletion
+
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer the user object"""
@@ -25,14 +27,22 @@ class UserSerializer(serializers.ModelSerializer):
         """Create and return a user with encrypted password"""
         return get_user_model().objects.create_user(**validated_data)
     def update(self, instance, validated_data):
-        """Update and return user. """
+        """Update and return user, saving only the fields sent.
+
+        instance may be the cached copy of the user, whose other columns,
+        like content_version or is_active, can be stale.
+        """
         password =  validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        fields = list(validated_data)
         if password:
-            user.set_password(password)
-            user.save()
-        
-        return user
+            instance.set_password(password)
+            fields.append('password')
+        if fields:
+            instance.save(update_fields = fields)
+
+        return instance
 
 class AuthTokenSerializer(serializers.Serializer):
     """Serializer for the user auth token"""
@@ -58,4 +68,23 @@ class AuthTokenSerializer(serializers.Serializer):
             raise serializers.ValidationError(msg, code = 'authorization')
 
         attrs['user'] = user
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class AccountDeletionSerializer(serializers.ModelSerializer):
+    """Serializer for the progress of an account deletion"""
+
+    class Meta:
+        model = AccountDeletion
+        fields = [
+            'id',
+            'status',
+            'posts_total',
+            'posts_deleted',
+            'authors_total',
+            'authors_deleted',
+            'created_at',
+            'updated_at',
+            'finished_at',
+        ]
+        read_only_fields = fields
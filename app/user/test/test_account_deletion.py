@@ -0,0 +1,129 @@
+"""
+Tests for the batched deletion of accounts
+"""
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import AccountDeletion, Author, Post
+from user import deletion
+
+ME_URL = reverse('user:me')
+
+
+def create_user(email):
+    """Create and return a new user"""
+    return get_user_model().objects.create_user(email = email, password = 'testpassword123')
+
+
+def create_posts(user, count, authors = ()):
+    """Create count posts of user, each linked to authors"""
+    posts = []
+    for n in range(count):
+        post = Post.objects.create(
+            user = user,
+            title = f'Post {n}',
+            description = 'Sample description',
+            img_description = 'http://placehold.it',
+            slug = f'post-{n}',
+        )
+        post.authors.add(*authors)
+        posts.append(post)
+    return posts
+
+
+def create_author(user, name):
+    """Create and return an author of user"""
+    return Author.objects.create(
+        user = user,
+        name = name,
+        link = f'http://www.{name}.com',
+        profile_picture = 'http://www.profile.com',
+        description = 'Sample description',
+    )
+
+
+@override_settings(ACCOUNT_DELETION_IN_BACKGROUND = False)
+class AccountDeletionTests(TestCase):
+    """Test deleting accounts batch by batch"""
+
+    def setUp(self):
+        self.user = create_user('user@example.com')
+        self.other = create_user('other@example.com')
+        self.authors = [create_author(self.user, name) for name in ['ann', 'bob']]
+        create_posts(self.user, 5, self.authors)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_delete_me_deletes_account(self):
+        """Test DELETE on me answers 202 and deletes the user and content"""
+        other_posts = create_posts(self.other, 2, [create_author(self.other, 'cy')])
+
+        with self.captureOnCommitCallbacks(execute = True):
+            res = self.client.delete(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['posts_total'], 5)
+        self.assertEqual(res.data['authors_total'], 2)
+        self.assertFalse(get_user_model().objects.filter(pk = self.user.pk).exists())
+        self.assertFalse(Post.objects.filter(user_id = self.user.pk).exists())
+        self.assertFalse(Author.objects.filter(user_id = self.user.pk).exists())
+        self.assertFalse(Post.authors.through.objects.filter(
+            author_id__in = [author.id for author in self.authors],
+        ).exists())
+        self.assertEqual(other_posts[0].authors.count(), 1)
+
+        progress = APIClient().get(res.data['url'])
+        self.assertEqual(progress.status_code, status.HTTP_200_OK)
+        self.assertEqual(progress.data['status'], AccountDeletion.DONE)
+        self.assertEqual(progress.data['posts_deleted'], 5)
+        self.assertEqual(progress.data['authors_deleted'], 2)
+
+    def test_deletion_runs_in_batches(self):
+        """Test posts and authors are deleted batch_size at a time"""
+        account_deletion = deletion.request_deletion(self.user, start = False)
+        seen = []
+
+        deletion.run_deletion(
+            account_deletion.pk,
+            batch_size = 2,
+            progress = lambda d: seen.append((d.posts_deleted, d.authors_deleted)),
+        )
+
+        self.assertEqual(seen, [(2, 0), (4, 0), (5, 0), (5, 2)])
+
+    def test_interrupted_deletion_resumes(self):
+        """Test a failed deletion keeps its progress and the command finishes it"""
+        account_deletion = deletion.request_deletion(self.user, start = False)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+
+        with patch.object(deletion, '_delete_author_batch', side_effect = RuntimeError('stop')):
+            with self.assertRaises(RuntimeError):
+                deletion.run_deletion(account_deletion.pk, batch_size = 2)
+
+        account_deletion.refresh_from_db()
+        self.assertEqual(account_deletion.status, AccountDeletion.FAILED)
+        self.assertEqual(account_deletion.posts_deleted, 5)
+        self.assertEqual(Author.objects.filter(user = self.user).count(), 2)
+
+        out = StringIO()
+        call_command('delete_accounts', batch_size = 2, stdout = out)
+
+        self.assertIn(f'Deleted user {self.user.pk}.', out.getvalue())
+        account_deletion.refresh_from_db()
+        self.assertEqual(account_deletion.status, AccountDeletion.DONE)
+        self.assertEqual(account_deletion.authors_deleted, 2)
+        self.assertFalse(get_user_model().objects.filter(pk = self.user.pk).exists())
+
+    def test_command_rejects_unknown_email(self):
+        """Test the command names the emails it cannot find"""
+        with self.assertRaisesMessage(CommandError, 'No user with email: nobody@example.com.'):
+            call_command('delete_accounts', 'nobody@example.com')
@@ -2,7 +2,7 @@
 Tests for the user API
 """
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -12,6 +12,7 @@ from rest_framework import status
 
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
+ASYNC_TOKEN_URL = reverse('user:async-token')
 ME_URL = reverse('user:me')
 
 
@@ -177,3 +178,38 @@ class PrivateUserAPITests(TestCase):
         self.assertEqual(self.user.name, payload['name'])
         self.assertTrue(self.user.check_password(payload['password']))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class AsyncTokenApiTests(TestCase):
+    """Test the async token endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.payload = {
+            'email': 'test@example.com',
+            'password': 'testpassword123',
+        }
+        create_user(**self.payload)
+
+    @override_settings(ASYNC_ORM_THREAD_SENSITIVE = True)
+    def test_create_token(self):
+        """Test the same token is returned as by the sync endpoint"""
+        res = self.client.post(ASYNC_TOKEN_URL, self.payload, format = 'json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.json()['token'],
+            self.client.post(TOKEN_URL, self.payload).data['token'],
+        )
+
+    @override_settings(ASYNC_ORM_THREAD_SENSITIVE = True)
+    def test_create_token_bad_credentials(self):
+        """Test bad credentials get the serializer's errors"""
+        res = self.client.post(ASYNC_TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'badpassword',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('non_field_errors', res.json())
+        self.assertNotIn('token', res.json())
@@ -2,7 +2,7 @@
 URL mapping for the user API
 """
 from django.urls import path
-from user import views
+from user import async_views, views
 
 
 app_name = 'user'
@@ -11,4 +11,10 @@ urlpatterns = [
     path('create/',views.CreateUserView.as_view(), name = 'create'),
     path('token/',views.CreateTokenView.as_view(), name = 'token'),
     path('me/', views.ManageUserView.as_view(), name = 'me'),
+    path(
+        'deletions/<uuid:pk>/',
+        views.AccountDeletionView.as_view(),
+        name = 'deletion',
+    ),
+    path('async/token/', async_views.create_token, name = 'async-token'),
 ]
\ No newline at end of file
@@ -1,13 +1,21 @@
 """
 Views for the user API
 """
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from rest_framework.settings import api_settings
 
+from core.authentication import CachedTokenAuthentication
+from core.models import AccountDeletion
+from core.throttling import LoginThrottle
+
+from user import deletion
 from user.serializers import (
     UserSerializer, 
-    AuthTokenSerializer
+    AuthTokenSerializer,
+    AccountDeletionSerializer,
 )
 
 class CreateUserView(generics.CreateAPIView):
@@ -17,13 +25,35 @@ class CreateUserView(generics.CreateAPIView):
 class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [LoginThrottle]
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(generics.RetrieveUpdateDestroyAPIView):
     """Manage the authenticated user"""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return the authenticated user. """
-        return self.request.user
\ No newline at end of file
+        return self.request.user
+
+    def destroy(self, request, *args, **kwargs):
+        """Deactivate the user and delete their account in the background.
+
+        Answers 202 with the deletion, whose progress is served at its URL.
+        """
+        account_deletion = deletion.request_deletion(self.get_object())
+        data = AccountDeletionSerializer(account_deletion).data
+        data['url'] = reverse(
+            'user:deletion',
+            args = [account_deletion.pk],
+            request = request,
+        )
+        return Response(data, status = status.HTTP_202_ACCEPTED)
+
+class AccountDeletionView(generics.RetrieveAPIView):
+    """Report the progress of an account deletion, found by its UUID"""
+    serializer_class = AccountDeletionSerializer
+    queryset = AccountDeletion.objects.all()
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]